@@ -0,0 +1,197 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import contextvars
+import functools
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from pydantic import Field, PrivateAttr
+
+from semantic_kernel.agents.open_ai.run_polling_options import RunPollingOptions
+
+###################################################################
+# Polling options for AzureAIAgent that adapt the run status      #
+# polling interval instead of sleeping a fixed interval before    #
+# every status call. A new run is first polled when it is         #
+# expected to be done, based on the durations observed for        #
+# earlier runs, and polls back off exponentially once it takes    #
+# longer than expected. After tool outputs are submitted the run  #
+# is polled again almost immediately.                             #
+###################################################################
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# The statuses in which the agent keeps polling a run
+PENDING_RUN_STATUSES = ("queued", "in_progress", "cancelling")
+
+# The (thread id, run id) of the run the current task created or submitted tool outputs to. The agent polls in a
+# task of its own on Python 3.11 (asyncio.wait_for), which starts with a copy of the context of the caller.
+_current_run: contextvars.ContextVar[tuple[str, str] | None] = contextvars.ContextVar("_current_run", default=None)
+
+
+@dataclass
+class _PollingEpisode:
+    """The polling of a single run until it leaves the pending states."""
+
+    started_at: float
+    last_poll_at: float
+    last_interval: float
+    after_tool_submission: bool = False
+    overdue_polls: int = 0
+
+    @property
+    def duration(self) -> float:
+        """The estimated run duration: midway between the last pending status and the final status call."""
+        return self.last_poll_at + self.last_interval / 2 - self.started_at
+
+
+class AdaptivePollingOptions(RunPollingOptions):
+    """Run polling options that adapt the polling interval to the observed run durations.
+
+    The agent polls a run in episodes: one after the run is created and one after every tool output
+    submission. The first status call of a run episode sleeps until the run is likely done: the
+    exponential moving average of the durations of the previous run episodes minus their mean
+    deviation, or `first_polling_interval` before any run was observed. Once that estimate is
+    exceeded, or before any run was observed, the interval grows by `polling_backoff_factor` with
+    every call. All intervals are kept between `first_polling_interval` and `run_polling_backoff`.
+
+    Episodes after a tool output submission are first polled after `first_polling_interval`, then
+    back off the same way, and do not feed the run duration estimate. The polling options only see
+    the status calls, so the runs are observed through the client: call `watch_client` with it.
+
+    Episodes of a watched client are tracked per run, by thread and run id, and end with the first
+    status call that returns a status other than a pending one. Without a watched client they are
+    tracked per asyncio task and every episode is treated as a run episode. Concurrent runs of the
+    same agent do not mix up their timings, while they still share the duration estimate.
+    """
+
+    first_polling_interval: timedelta = Field(default=timedelta(milliseconds=50))
+    polling_backoff_factor: float = Field(default=1.5, ge=1.0)
+    duration_smoothing: float = Field(default=0.3, gt=0.0, le=1.0)
+    expected_run_duration: float | None = None
+    run_duration_deviation: float = 0.0
+    status_calls: int = 0
+    observed_runs: int = 0
+
+    _episodes: dict[Any, _PollingEpisode] = PrivateAttr(default_factory=dict)
+    _tool_submissions: set[tuple[str, str]] = PrivateAttr(default_factory=set)
+
+    def watch_client(self, client: Any) -> None:
+        """Observe the runs of a client: which run is polled, when it is done and when tool outputs are submitted.
+
+        Args:
+            client: The AIProjectClient (or a stand-in) the agent creates and polls its runs with.
+        """
+        agents = client.agents
+        if getattr(agents.get_run, "__adaptive_polling__", None) is self:
+            return
+
+        def watch(method: Any, on_run: Any) -> Any:
+            @functools.wraps(method)
+            async def watched(*args: Any, **kwargs: Any) -> Any:
+                run = await method(*args, **kwargs)
+                on_run((run.thread_id, run.id), run.status)
+                return run
+
+            watched.__adaptive_polling__ = self  # type: ignore[attr-defined]
+            return watched
+
+        agents.create_run = watch(agents.create_run, self._on_run_created)
+        agents.get_run = watch(agents.get_run, self._on_run_status)
+        agents.submit_tool_outputs_to_run = watch(agents.submit_tool_outputs_to_run, self._on_tool_outputs_submitted)
+
+    def get_polling_interval(self, iteration_count: int) -> timedelta:
+        """Get the polling interval for the given iteration count of the current run."""
+        now = time.monotonic()
+        self.status_calls += 1
+        key = _current_run.get() or asyncio.current_task()
+        episode = self._episodes.get(key) if key is not None else None
+
+        if iteration_count == 0 or episode is None:
+            if episode is not None and not episode.after_tool_submission:
+                self._record(episode)
+            after_tool_submission = key in self._tool_submissions
+            if after_tool_submission:
+                self._tool_submissions.discard(key)
+            interval = self._clamp(0.0 if after_tool_submission else self._earliest_completion())
+            if key is not None:
+                if isinstance(key, asyncio.Task) and key not in self._episodes:
+                    key.add_done_callback(self._on_task_done)
+                self._episodes[key] = _PollingEpisode(
+                    started_at=now,
+                    last_poll_at=now,
+                    last_interval=interval,
+                    after_tool_submission=after_tool_submission,
+                )
+            return timedelta(seconds=interval)
+
+        minimum = self.first_polling_interval.total_seconds()
+        elapsed = now - episode.started_at
+        if self.expected_run_duration is None or episode.after_tool_submission:
+            # Nothing observed yet, or the rest of a run after its tools: poll at geometrically growing elapsed times
+            interval = elapsed * (self.polling_backoff_factor - 1)
+        elif (remaining := self._earliest_completion() - elapsed) > minimum:
+            # Sleep until the run is expected to be done
+            interval = remaining
+        else:
+            # Overdue: back off in steps of the typical deviation from the expected duration
+            interval = max(minimum, self.run_duration_deviation) * self.polling_backoff_factor**episode.overdue_polls
+            episode.overdue_polls += 1
+        interval = self._clamp(interval)
+
+        episode.last_poll_at = now
+        episode.last_interval = interval
+        return timedelta(seconds=interval)
+
+    def _earliest_completion(self) -> float:
+        """The elapsed time at which a run is likely to be done: one mean deviation before the expected duration."""
+        if self.expected_run_duration is None:
+            return 0.0
+        return self.expected_run_duration - self.run_duration_deviation
+
+    def _clamp(self, interval: float) -> float:
+        """Keep an interval between `first_polling_interval` and `run_polling_backoff`."""
+        minimum = self.first_polling_interval.total_seconds()
+        return min(max(interval, minimum), max(self.run_polling_backoff.total_seconds(), minimum))
+
+    def _on_run_created(self, key: tuple[str, str], status: str) -> None:
+        """Make a new run the current run of the task that polls it."""
+        _current_run.set(key)
+
+    def _on_run_status(self, key: tuple[str, str], status: str) -> None:
+        """End the episode of a run once its status is no longer pending."""
+        if status in PENDING_RUN_STATUSES:
+            return
+        episode = self._episodes.pop(key, None)
+        if episode is not None and not episode.after_tool_submission:
+            self._record(episode)
+
+    def _on_tool_outputs_submitted(self, key: tuple[str, str], status: str) -> None:
+        """Poll the run right away in its next episode."""
+        _current_run.set(key)
+        self._tool_submissions.add(key)
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        """Record the last episode of a finished task."""
+        episode = self._episodes.pop(task, None)
+        if episode is None or episode.after_tool_submission:
+            return
+        if not task.cancelled() and task.exception() is None:
+            self._record(episode)
+
+    def _record(self, episode: _PollingEpisode) -> None:
+        """Fold the duration of a finished episode into the expected run duration."""
+        duration = episode.duration
+        if self.expected_run_duration is None:
+            self.expected_run_duration = duration
+        else:
+            alpha = self.duration_smoothing
+            deviation = abs(duration - self.expected_run_duration)
+            self.run_duration_deviation = alpha * deviation + (1 - alpha) * self.run_duration_deviation
+            self.expected_run_duration = alpha * duration + (1 - alpha) * self.expected_run_duration
+        self.observed_runs += 1
+        logger.debug(f"Observed run duration {duration:.3f}s, expecting {self.expected_run_duration:.3f}s")
@@ -0,0 +1,243 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any
+
+from azure.ai.projects.aio import AIProjectClient
+from azure.ai.projects.models import Agent
+
+###################################################################
+# A pool that removes the control-plane round trips from the      #
+# start of a conversation. Agent definitions are keyed by a hash  #
+# of their content and stored in the agent metadata, so they are  #
+# found again and reused by later processes instead of being      #
+# created and deleted every time. Threads are created ahead of    #
+# time in the background, and released threads are deleted lazily #
+# by the same background task.                                    #
+###################################################################
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+DEFINITION_HASH_KEY = "definition_hash"
+
+
+def _to_jsonable(value: Any) -> Any:
+    """Convert SDK models (tools, tool resources) into plain JSON values."""
+    if hasattr(value, "as_dict"):
+        return value.as_dict()
+    if isinstance(value, dict):
+        return {str(key): _to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(item) for item in value]
+    return value
+
+
+def definition_hash(
+    model: str, instructions: str | None = None, tools: Any = None, tool_resources: Any = None, **kwargs: Any
+) -> str:
+    """Compute the content hash of an agent definition.
+
+    Args:
+        model: The model deployment name.
+        instructions: The agent instructions.
+        tools: The tool definitions.
+        tool_resources: The tool resources.
+        kwargs: Other `create_agent` arguments that change the behavior, e.g. name or temperature.
+
+    Returns:
+        The hex digest identifying the definition.
+    """
+    content = {
+        "model": model,
+        "instructions": instructions or "",
+        "tools": _to_jsonable(tools or []),
+        "tool_resources": _to_jsonable(tool_resources or {}),
+        **{key: _to_jsonable(value) for key, value in kwargs.items() if value is not None},
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class AzureAIAgentPool:
+    """Reuses agent definitions and hands out prewarmed threads.
+
+    Definitions are never deleted by the pool, they are meant to be shared by every process that
+    uses the same project. Threads hold conversation state and are therefore never reused: a
+    released thread is queued and deleted in the background.
+
+    Prewarming starts when the pool is entered, and an acquisition made while it runs waits for the
+    prewarmed thread rather than creating another one.
+
+    Args:
+        client: The AzureAI Project client.
+        min_threads: The number of prewarmed threads to keep ready.
+        refill: Whether to prewarm new threads as threads are acquired. A process that runs a single
+            conversation only needs the initial ones, refilling would create threads that are never used.
+    """
+
+    def __init__(self, client: AIProjectClient, min_threads: int = 2, refill: bool = True) -> None:
+        self.client = client
+        self.min_threads = min_threads
+        self.refill = refill
+        self.control_plane_calls = 0
+        self._definitions: dict[str, Agent] = {}
+        self._definition_locks: dict[str, asyncio.Lock] = {}
+        self._indexed = False
+        self._ready_threads: asyncio.Queue[str] = asyncio.Queue()
+        self._released_threads: asyncio.Queue[str] = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+        # Set once the background task has prewarmed a thread or finished (or failed) prewarming
+        self._prewarm_progress = asyncio.Event()
+        self._maintenance: asyncio.Task | None = None
+
+    async def __aenter__(self) -> "AzureAIAgentPool":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_details: Any) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """Start prewarming threads and deleting released threads in the background."""
+        if self._maintenance is None:
+            self._maintenance = asyncio.create_task(self._maintain())
+
+    async def get_definition(
+        self,
+        model: str,
+        instructions: str | None = None,
+        tools: Any = None,
+        tool_resources: Any = None,
+        **kwargs: Any,
+    ) -> Agent:
+        """Get an agent definition with the given content, creating it only if no process has done so yet.
+
+        Args:
+            model: The model deployment name.
+            instructions: The agent instructions.
+            tools: The tool definitions.
+            tool_resources: The tool resources.
+            kwargs: Other `create_agent` arguments, e.g. name.
+
+        Returns:
+            The agent definition.
+        """
+        key = definition_hash(model, instructions, tools, tool_resources, **kwargs)
+        if (definition := self._definitions.get(key)) is not None:
+            return definition
+
+        async with self._definition_locks.setdefault(key, asyncio.Lock()):
+            if key in self._definitions:
+                return self._definitions[key]
+            if not self._indexed:
+                await self._index_definitions()
+            if key not in self._definitions:
+                self.control_plane_calls += 1
+                metadata = {**(kwargs.pop("metadata", None) or {}), DEFINITION_HASH_KEY: key}
+                self._definitions[key] = await self.client.agents.create_agent(
+                    model=model,
+                    instructions=instructions,
+                    tools=tools,
+                    tool_resources=tool_resources,
+                    metadata=metadata,
+                    **kwargs,
+                )
+                logger.info(f"Created agent definition {self._definitions[key].id} for hash {key[:12]}")
+        return self._definitions[key]
+
+    async def _index_definitions(self) -> None:
+        """Index the existing agent definitions by their content hash, keeping the oldest per hash."""
+        after: str | None = None
+        while True:
+            self.control_plane_calls += 1
+            page = await self.client.agents.list_agents(limit=100, order="asc", after=after)
+            for definition in page.data:
+                key = (definition.metadata or {}).get(DEFINITION_HASH_KEY)
+                if key:
+                    self._definitions.setdefault(key, definition)
+            if not page.has_more or not page.data:
+                break
+            after = page.last_id
+        self._indexed = True
+
+    async def acquire_thread(self) -> str:
+        """Get a new, empty thread, from the prewarmed threads when one is ready.
+
+        Returns:
+            The thread id.
+        """
+        self.start()
+        if self._ready_threads.empty() and self._maintenance is not None and not self._prewarm_progress.is_set():
+            # The background task is creating a thread already, wait for it rather than creating another one
+            await self._prewarm_progress.wait()
+        try:
+            thread_id = self._ready_threads.get_nowait()
+        except asyncio.QueueEmpty:
+            thread_id = await self._create_thread()
+        if self.refill:
+            self._wakeup.set()
+        return thread_id
+
+    def release_thread(self, thread_id: str) -> None:
+        """Hand back a thread at the end of a conversation, it is deleted in the background.
+
+        Args:
+            thread_id: The thread id.
+        """
+        self._released_threads.put_nowait(thread_id)
+        self._wakeup.set()
+
+    async def close(self, delete_prewarmed: bool = True) -> None:
+        """Stop the background task and delete the released (and prewarmed) threads.
+
+        Args:
+            delete_prewarmed: Whether to delete the threads that were prewarmed but never used.
+        """
+        if self._maintenance is not None:
+            self._maintenance.cancel()
+            try:
+                await self._maintenance
+            except asyncio.CancelledError:
+                pass
+            self._maintenance = None
+
+        if delete_prewarmed:
+            while not self._ready_threads.empty():
+                self._released_threads.put_nowait(self._ready_threads.get_nowait())
+        await self._delete_released_threads()
+
+    async def _create_thread(self) -> str:
+        self.control_plane_calls += 1
+        thread = await self.client.agents.create_thread()
+        return thread.id
+
+    async def _delete_released_threads(self) -> None:
+        while not self._released_threads.empty():
+            thread_id = self._released_threads.get_nowait()
+            self.control_plane_calls += 1
+            try:
+                await self.client.agents.delete_thread(thread_id)
+            except Exception as ex:
+                logger.warning(f"Failed to delete thread {thread_id}: {ex}")
+
+    async def _maintain(self) -> None:
+        """Refill the prewarmed threads and delete released threads whenever the pool is touched."""
+        prewarm = True
+        while True:
+            self._prewarm_progress.clear()
+            try:
+                while prewarm and self._ready_threads.qsize() < self.min_threads:
+                    self._ready_threads.put_nowait(await self._create_thread())
+                    self._prewarm_progress.set()
+            except Exception as ex:
+                logger.warning(f"Agent pool prewarming failed: {ex}")
+            self._prewarm_progress.set()
+            prewarm = self.refill
+            try:
+                await self._delete_released_threads()
+            except Exception as ex:
+                logger.warning(f"Agent pool maintenance failed: {ex}")
+            self._wakeup.clear()
+            await self._wakeup.wait()
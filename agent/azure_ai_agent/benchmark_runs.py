@@ -0,0 +1,102 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from semantic_kernel.agents.azure_ai import AzureAIAgent
+from semantic_kernel.agents.open_ai.run_polling_options import RunPollingOptions
+from semantic_kernel.contents.chat_message_content import ChatMessageContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from adaptive_polling import AdaptivePollingOptions
+from local_agents_service import LocalAgentsOperations, LocalProjectClient, LocalReply
+from step1_azure_ai_agent import MenuPlugin
+
+###################################################################
+# The following script compares how AzureAIAgent waits for runs   #
+# on the menu conversation of step1: fixed interval polling (the  #
+# default), adaptive polling and streamed runs. The agents service #
+# is replaced by a local stand-in with simulated model latency,   #
+# so the latency per turn and the number of run status calls can  #
+# be measured without an Azure AI project.                        #
+###################################################################
+
+MODES = ("fixed-polling", "adaptive-polling", "streaming")
+
+USER_INPUTS = [
+    "Hello",
+    "What is the special soup?",
+    "How much does that cost?",
+    "Thank you",
+]
+
+
+def _menu_host(context: list[tuple[str, str]]) -> LocalReply:
+    """Answer like the step1 menu host: call the menu plugin when needed, then answer with its output."""
+    if context and context[-1][0] == "tool":
+        return f"Here you go: {context[-1][1].strip()}"
+    user_input = next((text for role, text in reversed(context) if role == "user"), "").lower()
+    if "special" in user_input:
+        return [("menu-get_specials", "{}")]
+    if "cost" in user_input or "price" in user_input:
+        return [("menu-get_item_price", '{"menu_item": "Clam Chowder"}')]
+    return "Hello! Ask me anything about the menu."
+
+
+async def run_mode(mode: str, **latency: float) -> dict[str, Any]:
+    """Run the menu conversation once and collect the latency metrics."""
+    service = LocalAgentsOperations(responder=_menu_host, **latency)
+    client = LocalProjectClient(service)
+    definition = await client.agents.create_agent(model="local", name="Host", instructions="Answer questions.")
+    polling_options = AdaptivePollingOptions() if mode == "adaptive-polling" else RunPollingOptions()
+    if isinstance(polling_options, AdaptivePollingOptions):
+        polling_options.watch_client(client)
+    agent = AzureAIAgent(client=client, definition=definition, polling_options=polling_options)
+    agent.kernel.add_plugin(MenuPlugin(), plugin_name="menu")
+    thread = await client.agents.create_thread()
+
+    first_output: list[float] = []
+    start = time.perf_counter()
+    for user_input in USER_INPUTS:
+        await agent.add_chat_message(
+            thread_id=thread.id, message=ChatMessageContent(role=AuthorRole.USER, content=user_input)
+        )
+        turn_start = time.perf_counter()
+        first: float | None = None
+        if mode == "streaming":
+            async for content in agent.invoke_stream(thread_id=thread.id):
+                if first is None and content.role != AuthorRole.TOOL and content.content:
+                    first = time.perf_counter() - turn_start
+        else:
+            async for content in agent.invoke(thread_id=thread.id):
+                if first is None and content.role != AuthorRole.TOOL:
+                    first = time.perf_counter() - turn_start
+        first_output.append(first or 0.0)
+
+    return {
+        "wall_time": time.perf_counter() - start,
+        "first_output": sum(first_output) / len(first_output),
+        "status_calls": service.status_calls,
+        "requests": service.requests,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare run polling and streaming for AzureAIAgent")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated seconds until the first token")
+    parser.add_argument("--latency-per-token", type=float, default=0.02, help="Simulated seconds per token")
+    args = parser.parse_args()
+
+    print(f"{'mode':<17} {'wall(s)':>8} {'first output(s)':>16} {'status calls':>13} {'requests':>9}")
+    for mode in MODES:
+        result = await run_mode(mode, latency=args.latency, latency_per_token=args.latency_per_token)
+        print(
+            f"{mode:<17} {result['wall_time']:>8.3f} {result['first_output']:>16.3f} "
+            f"{result['status_calls']:>13} {result['requests']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from typing import Any
+
+###################################################################
+# The worker process of CodeWorkerPool. It imports the common     #
+# libraries once at start-up, caps its own memory, then runs the  #
+# jobs it reads from stdin one after another in the shared        #
+# scratch directory and answers each with one JSON line. It only  #
+# uses the standard library so a recycled worker starts quickly.  #
+###################################################################
+
+
+def _preload(modules: list[str]) -> dict[str, Any]:
+    """Import the given modules, returning the ones that are installed keyed by their usual alias."""
+    aliases = {"numpy": "np", "pandas": "pd", "matplotlib.pyplot": "plt"}
+    preloaded: dict[str, Any] = {}
+    for name in modules:
+        try:
+            module = importlib.import_module(name)
+        except Exception:
+            continue
+        if (alias := aliases.get(name)) is not None:
+            preloaded[alias] = module
+        else:
+            package = name.partition(".")[0]
+            preloaded[package] = sys.modules[package]
+    return preloaded
+
+
+def _limit_memory(max_memory_mb: int) -> None:
+    """Cap the address space of this process, allocations beyond it raise MemoryError."""
+    if max_memory_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - not available on Windows
+        return
+    limit = max_memory_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _snapshot(directory: str) -> dict[str, tuple[int, int]]:
+    """Map the files below a directory to their modification time and size."""
+    files: dict[str, tuple[int, int]] = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files[os.path.relpath(path, directory)] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars] + f"\n... ({len(text) - max_chars} more characters)"
+
+
+def run_job(code: str, preloaded: dict[str, Any], max_output_chars: int) -> dict[str, Any]:
+    """Run one job in a fresh namespace and report its output and the files it wrote.
+
+    Args:
+        code: The Python code.
+        preloaded: The modules available to the code without importing them.
+        max_output_chars: The maximum length of stdout and stderr in the result.
+
+    Returns:
+        The JSON result with stdout, stderr, error, files and duration.
+    """
+    before = _snapshot(os.getcwd())
+    stdout, stderr = io.StringIO(), io.StringIO()
+    error: str | None = None
+    start = time.perf_counter()
+    namespace: dict[str, Any] = {"__name__": "__main__", **preloaded}
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            exec(compile(code, "<job>", "exec"), namespace)
+        except BaseException as ex:
+            if isinstance(ex, KeyboardInterrupt):
+                raise
+            error = "".join(traceback.format_exception_only(type(ex), ex)).strip()
+            stderr.write(traceback.format_exc())
+    duration = time.perf_counter() - start
+
+    # Do not let figures of one job leak into the next one
+    if "matplotlib.pyplot" in sys.modules:
+        sys.modules["matplotlib.pyplot"].close("all")
+
+    after = _snapshot(os.getcwd())
+    return {
+        "stdout": _truncate(stdout.getvalue(), max_output_chars),
+        "stderr": _truncate(stderr.getvalue(), max_output_chars),
+        "error": error,
+        "files": sorted(path for path, stat in after.items() if before.get(path) != stat),
+        "duration": duration,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Code execution worker, started by CodeWorkerPool")
+    parser.add_argument("--preload", default="", help="Comma separated modules to import at start-up")
+    parser.add_argument("--max-memory-mb", type=int, default=0, help="Address space limit, 0 for none")
+    parser.add_argument("--max-output-chars", type=int, default=10000, help="Maximum length of stdout/stderr")
+    args = parser.parse_args()
+
+    # Keep the protocol streams for the pool and point the standard file descriptors elsewhere,
+    # so jobs that read stdin or write to the raw stdout cannot corrupt the protocol
+    requests = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    responses = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    sys.stdin = io.StringIO()
+
+    preloaded = _preload([name for name in args.preload.split(",") if name])
+    _limit_memory(args.max_memory_mb)
+    responses.write(json.dumps({"ready": True, "preloaded": sorted(preloaded)}) + "\n")
+    responses.flush()
+
+    for line in requests:
+        job = json.loads(line)
+        responses.write(json.dumps(run_job(job["code"], preloaded, args.max_output_chars)) + "\n")
+        responses.flush()
+
+
+if __name__ == "__main__":
+    main()
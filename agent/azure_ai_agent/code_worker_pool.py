@@ -0,0 +1,263 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Annotated, Any
+
+from semantic_kernel.functions.kernel_function_decorator import kernel_function
+
+###################################################################
+# A local replacement for the remote code interpreter. Python     #
+# code runs in a pool of worker processes that are started ahead  #
+# of time with the common data libraries already imported, so a   #
+# job starts in milliseconds. Every job has a timeout, workers    #
+# have a memory cap and are recycled after a number of jobs, and  #
+# all workers share one scratch directory, so files such as       #
+# charts are written straight to the local disk.                  #
+###################################################################
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.realpath(__file__)), "code_worker.py")
+DEFAULT_PRELOAD = ("json", "math", "statistics", "datetime", "numpy", "pandas", "matplotlib.pyplot")
+
+
+@dataclass
+class CodeExecutionResult:
+    """The outcome of one job."""
+
+    stdout: str = ""
+    stderr: str = ""
+    error: str | None = None
+    files: list[str] = field(default_factory=list)
+    duration: float = 0.0
+    timed_out: bool = False
+
+    def to_text(self, scratch_dir: str) -> str:
+        """Describe the result for the model."""
+        parts = [f"stdout:\n{self.stdout}" if self.stdout else "stdout: (empty)"]
+        if self.error:
+            parts.append(f"error: {self.error}")
+        if self.files:
+            parts.append("files written: " + ", ".join(os.path.join(scratch_dir, path) for path in self.files))
+        return "\n".join(parts)
+
+
+class _Worker:
+    def __init__(self, process: asyncio.subprocess.Process) -> None:
+        self.process = process
+        self.jobs = 0
+        self.killed = False
+
+    @property
+    def alive(self) -> bool:
+        return not self.killed and self.process.returncode is None
+
+    def kill(self) -> None:
+        self.killed = True
+        if self.process.returncode is None:
+            self.process.kill()
+
+
+class CodeWorkerPool:
+    """A pool of prewarmed, resource limited Python worker processes.
+
+    Jobs do not share state: every job runs in a fresh namespace, and a worker that timed out or
+    crashed is replaced. Only the files in the scratch directory outlive a job.
+
+    Args:
+        size: The number of worker processes.
+        scratch_dir: The working directory of the workers, a temporary directory if not given.
+        timeout: The default time limit of a job in seconds.
+        max_memory_mb: The address space limit of a worker in MB, 0 for none.
+        max_jobs_per_worker: The number of jobs after which a worker is replaced by a fresh one.
+        preload: The modules imported by the workers at start-up, missing ones are skipped.
+        max_output_chars: The maximum length of the stdout and stderr of a job.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        scratch_dir: str | None = None,
+        timeout: float = 30.0,
+        max_memory_mb: int = 2048,
+        max_jobs_per_worker: int = 20,
+        preload: tuple[str, ...] = DEFAULT_PRELOAD,
+        max_output_chars: int = 10000,
+    ) -> None:
+        self.size = size
+        self.scratch_dir = os.path.realpath(scratch_dir or tempfile.mkdtemp(prefix="code-worker-"))
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.preload = preload
+        self.max_output_chars = max_output_chars
+        self.workers_started = 0
+        # None wakes the jobs waiting for a worker once the pool is closed or has no workers left
+        self._idle: asyncio.Queue[_Worker | None] = asyncio.Queue()
+        self._spawning: set[asyncio.Task] = set()
+        self._retiring: set[_Worker] = set()
+        self._live = 0
+        self._closed = False
+
+    async def __aenter__(self) -> "CodeWorkerPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_details: Any) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Start the workers and wait until they have imported the preloaded modules."""
+        os.makedirs(self.scratch_dir, exist_ok=True)
+        for worker in await asyncio.gather(*(self._spawn() for _ in range(self.size))):
+            self._idle.put_nowait(worker)
+            self._live += 1
+
+    async def execute(self, code: str, timeout: float | None = None) -> CodeExecutionResult:
+        """Run Python code on the next idle worker.
+
+        Args:
+            code: The Python code.
+            timeout: The time limit in seconds, the pool default if not given.
+
+        Returns:
+            The result of the job.
+
+        Raises:
+            RuntimeError: The pool is closed, or no worker is running and none could be started.
+        """
+        worker = await self._acquire()
+        timeout = timeout or self.timeout
+        start = time.perf_counter()
+        try:
+            worker.jobs += 1
+            worker.process.stdin.write((json.dumps({"code": code}) + "\n").encode("utf-8"))
+            await worker.process.stdin.drain()
+            line = await asyncio.wait_for(worker.process.stdout.readline(), timeout)
+            if line:
+                return CodeExecutionResult(**json.loads(line))
+            worker.kill()
+            return CodeExecutionResult(
+                error=f"The worker exited with code {await worker.process.wait()} while running the code",
+                duration=time.perf_counter() - start,
+            )
+        except asyncio.TimeoutError:
+            worker.kill()
+            return CodeExecutionResult(
+                error=f"TimeoutError: the code did not finish within {timeout:g} seconds",
+                duration=time.perf_counter() - start,
+                timed_out=True,
+            )
+        except BaseException:
+            # Cancelled or broken pipe, the worker may still be running the job
+            worker.kill()
+            raise
+        finally:
+            self._release(worker)
+
+    async def close(self) -> None:
+        """Stop all workers. The scratch directory is kept."""
+        self._closed = True
+        for task in list(self._spawning):
+            task.cancel()
+        await asyncio.gather(*self._spawning, return_exceptions=True)
+        workers = list(self._retiring)
+        while not self._idle.empty():
+            if (worker := self._idle.get_nowait()) is not None:
+                worker.process.stdin.close()
+                workers.append(worker)
+        self._idle.put_nowait(None)
+        for worker in workers:
+            worker.kill()
+            await worker.process.wait()
+        self._retiring.clear()
+        self._live = 0
+
+    async def _acquire(self) -> _Worker:
+        """Wait for an idle worker, unless the pool is closed or has no workers left."""
+        worker = None if self._closed or not self._live else await self._idle.get()
+        if worker is None:
+            # Pass the wake-up on to the next waiting job
+            self._idle.put_nowait(None)
+            if self._closed:
+                raise RuntimeError("The code worker pool is closed")
+            raise RuntimeError("No code worker is running, the workers could not be started")
+        return worker
+
+    def _release(self, worker: _Worker) -> None:
+        """Put a worker back, or replace it in the background when it is dead or has done enough jobs."""
+        if worker.alive and worker.jobs < self.max_jobs_per_worker and not self._closed:
+            self._idle.put_nowait(worker)
+            return
+        if worker.alive:
+            worker.process.stdin.close()
+        if self._closed:
+            self._live = max(0, self._live - 1)
+        self._retiring.add(worker)
+        task = asyncio.create_task(self._replace(worker))
+        self._spawning.add(task)
+        task.add_done_callback(self._spawning.discard)
+
+    async def _replace(self, worker: _Worker) -> None:
+        """Wait for a retired or killed worker to exit, then start a new one in its place."""
+        await worker.process.wait()
+        self._retiring.discard(worker)
+        if self._closed:
+            return
+        try:
+            self._idle.put_nowait(await self._spawn())
+        except Exception as ex:
+            self._live -= 1
+            logger.warning(f"Failed to start a code worker, {self._live} left: {ex}")
+            if not self._live:
+                self._idle.put_nowait(None)
+
+    async def _spawn(self) -> _Worker:
+        env = {**os.environ, "MPLBACKEND": "Agg", "OPENBLAS_NUM_THREADS": "1", "PYTHONUNBUFFERED": "1"}
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            WORKER_SCRIPT,
+            f"--preload={','.join(self.preload)}",
+            f"--max-memory-mb={self.max_memory_mb}",
+            f"--max-output-chars={self.max_output_chars}",
+            cwd=self.scratch_dir,
+            env=env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=8 * self.max_output_chars + 64 * 1024,
+        )
+        worker = _Worker(process)
+        ready = await process.stdout.readline()
+        if not ready:
+            worker.kill()
+            await process.wait()
+            raise RuntimeError(f"The code worker exited with code {process.returncode} during start-up")
+        self.workers_started += 1
+        logger.debug(f"Code worker {process.pid} ready with {json.loads(ready)['preloaded']}")
+        return worker
+
+
+class CodeExecutionPlugin:
+    """Runs Python code for the agent on a CodeWorkerPool."""
+
+    def __init__(self, pool: CodeWorkerPool) -> None:
+        self.pool = pool
+
+    @kernel_function(
+        description="Runs Python code locally and returns its output. numpy (np), pandas (pd) and "
+        "matplotlib.pyplot (plt) are already imported. Variables are not kept between calls. "
+        "Save files with a relative path, they are kept in the local working directory."
+    )
+    async def execute_python(
+        self, code: Annotated[str, "The Python code to run."]
+    ) -> Annotated[str, "Returns the printed output, the error and the written files."]:
+        result = await self.pool.execute(code)
+        return result.to_text(self.pool.scratch_dir)
@@ -0,0 +1,383 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import itertools
+import json
+import time
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from azure.ai.projects.aio import AIProjectClient
+from azure.ai.projects.models import (
+    Agent,
+    AgentDeletionStatus,
+    AgentThread,
+    AsyncAgentEventHandler,
+    AsyncAgentRunStream,
+    MessageRole,
+    OpenAIPageableListOfAgent,
+    OpenAIPageableListOfRunStep,
+    OpenAIPageableListOfThreadMessage,
+    ThreadDeletionStatus,
+    ThreadMessage,
+    ThreadRun,
+)
+
+###################################################################
+# A local stand-in for the Azure AI Agents service. It implements #
+# the subset of `AIProjectClient.agents` used by AzureAIAgent for #
+# polled and streamed runs, answers from a script and simulates   #
+# the model latency, so run polling and streaming can be tried    #
+# and measured without an Azure AI project.                       #
+###################################################################
+
+# A scripted reply: the final text, or the (function name, JSON arguments) tool calls to request
+LocalReply = str | list[tuple[str, str]]
+# A responder gets the thread messages and the tool outputs of the current run as (role, text) pairs
+LocalResponder = Callable[[list[tuple[str, str]]], LocalReply]
+
+_PENDING = ("queued", "in_progress")
+
+
+def _count_words(text: str) -> int:
+    return len(text.split())
+
+
+@dataclass
+class _LocalRun:
+    """The server side state of a run."""
+
+    id: str
+    thread_id: str
+    assistant_id: str
+    status: str = "queued"
+    ready_at: float = 0.0
+    reply: LocalReply = ""
+    tool_outputs: list[tuple[str, str]] = field(default_factory=list)
+    steps: list[dict[str, Any]] = field(default_factory=list)
+    required_action: dict[str, Any] | None = None
+
+
+class LocalAgentsOperations:
+    """A scripted, in-memory implementation of the agents operations of `AIProjectClient`.
+
+    Args:
+        responder: Produces the reply of a run from the thread messages and the tool outputs of the run.
+        latency: Simulated seconds until the first token of every model turn.
+        latency_per_token: Simulated seconds per generated word.
+    """
+
+    def __init__(self, responder: LocalResponder, latency: float = 0.5, latency_per_token: float = 0.02) -> None:
+        self.responder = responder
+        self.latency = latency
+        self.latency_per_token = latency_per_token
+        self.status_calls = 0
+        self.requests = 0
+        self._ids = itertools.count(1)
+        self._agents: dict[str, Agent] = {}
+        self._messages: dict[str, list[ThreadMessage]] = {}
+        self._runs: dict[str, _LocalRun] = {}
+
+    def _new_id(self, prefix: str) -> str:
+        return f"{prefix}_{next(self._ids)}"
+
+    # region Agents, threads and messages
+
+    async def create_agent(
+        self,
+        model: str,
+        name: str | None = None,
+        instructions: str | None = None,
+        metadata: dict[str, str] | None = None,
+        **kwargs: Any,
+    ) -> Agent:
+        self.requests += 1
+        agent = Agent({
+            "id": self._new_id("asst"),
+            "object": "assistant",
+            "created_at": int(time.time()),
+            "name": name,
+            "instructions": instructions,
+            "model": model,
+            "tools": [],
+            "metadata": metadata or {},
+        })
+        self._agents[agent.id] = agent
+        return agent
+
+    async def get_agent(self, assistant_id: str, **kwargs: Any) -> Agent:
+        self.requests += 1
+        return self._agents[assistant_id]
+
+    async def list_agents(self, limit: int = 20, after: str | None = None, **kwargs: Any) -> OpenAIPageableListOfAgent:
+        self.requests += 1
+        agents = list(self._agents.values())
+        start = next((index + 1 for index, agent in enumerate(agents) if agent.id == after), 0)
+        page = agents[start : start + limit]
+        return OpenAIPageableListOfAgent({
+            "object": "list",
+            "data": [agent.as_dict() for agent in page],
+            "first_id": page[0].id if page else "",
+            "last_id": page[-1].id if page else "",
+            "has_more": start + limit < len(agents),
+        })
+
+    async def delete_agent(self, assistant_id: str, **kwargs: Any) -> AgentDeletionStatus:
+        self.requests += 1
+        self._agents.pop(assistant_id, None)
+        return AgentDeletionStatus({"id": assistant_id, "deleted": True, "object": "assistant.deleted"})
+
+    async def create_thread(self, **kwargs: Any) -> AgentThread:
+        self.requests += 1
+        thread = AgentThread({"id": self._new_id("thread"), "object": "thread", "created_at": int(time.time())})
+        self._messages[thread.id] = []
+        return thread
+
+    async def delete_thread(self, thread_id: str, **kwargs: Any) -> ThreadDeletionStatus:
+        self.requests += 1
+        self._messages.pop(thread_id, None)
+        return ThreadDeletionStatus({"id": thread_id, "deleted": True, "object": "thread.deleted"})
+
+    async def create_message(self, thread_id: str, role: str, content: str, **kwargs: Any) -> ThreadMessage:
+        self.requests += 1
+        return self._add_message(thread_id, role, content)
+
+    async def get_message(self, thread_id: str, message_id: str, **kwargs: Any) -> ThreadMessage:
+        self.requests += 1
+        return next(message for message in self._messages[thread_id] if message.id == message_id)
+
+    async def list_messages(
+        self,
+        thread_id: str,
+        limit: int | None = None,
+        order: str | None = None,
+        after: str | None = None,
+        **kwargs: Any,
+    ) -> OpenAIPageableListOfThreadMessage:
+        self.requests += 1
+        messages = self._messages[thread_id]
+        if order == "desc":
+            messages = list(reversed(messages))
+        start = next((index + 1 for index, message in enumerate(messages) if message.id == after), 0)
+        page = messages[start : start + (limit or 20)]
+        return OpenAIPageableListOfThreadMessage({
+            "object": "list",
+            "data": [message.as_dict() for message in page],
+            "first_id": page[0].id if page else "",
+            "last_id": page[-1].id if page else "",
+            "has_more": start + len(page) < len(messages),
+        })
+
+    def _add_message(self, thread_id: str, role: str, text: str, **fields: Any) -> ThreadMessage:
+        message = ThreadMessage({
+            "id": fields.pop("id", None) or self._new_id("msg"),
+            "object": "thread.message",
+            "created_at": int(time.time()),
+            "thread_id": thread_id,
+            "status": "completed",
+            "role": MessageRole.USER if role == MessageRole.USER else MessageRole.AGENT,
+            "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+            "attachments": [],
+            "metadata": {},
+            **fields,
+        })
+        self._messages[thread_id].append(message)
+        return message
+
+    # endregion
+
+    # region Polled runs
+
+    async def create_run(self, thread_id: str, **kwargs: Any) -> ThreadRun:
+        self.requests += 1
+        run = _LocalRun(
+            id=self._new_id("run"),
+            thread_id=thread_id,
+            assistant_id=kwargs.get("assistant_id") or kwargs.get("agent_id", ""),
+        )
+        self._runs[run.id] = run
+        self._start_turn(run)
+        return self._to_thread_run(run)
+
+    async def get_run(self, thread_id: str, run_id: str, **kwargs: Any) -> ThreadRun:
+        self.requests += 1
+        self.status_calls += 1
+        run = self._runs[run_id]
+        if run.status in _PENDING and time.monotonic() >= run.ready_at:
+            self._finish_turn(run)
+        elif run.status == "queued":
+            run.status = "in_progress"
+        return self._to_thread_run(run)
+
+    async def submit_tool_outputs_to_run(
+        self, thread_id: str, run_id: str, tool_outputs: list[dict[str, str]], **kwargs: Any
+    ) -> ThreadRun:
+        self.requests += 1
+        run = self._runs[run_id]
+        self._complete_tool_calls(run, tool_outputs)
+        self._start_turn(run)
+        return self._to_thread_run(run)
+
+    async def list_run_steps(self, thread_id: str, run_id: str, **kwargs: Any) -> OpenAIPageableListOfRunStep:
+        self.requests += 1
+        return OpenAIPageableListOfRunStep({"object": "list", "data": self._runs[run_id].steps, "has_more": False})
+
+    def _context(self, run: _LocalRun) -> list[tuple[str, str]]:
+        """The (role, text) pairs the responder sees for a run."""
+        history = [
+            (MessageRole(message.role).value, message.content[0].text.value)
+            for message in self._messages[run.thread_id]
+        ]
+        return history + [("tool", output) for _, output in run.tool_outputs]
+
+    def _start_turn(self, run: _LocalRun) -> None:
+        """Start a model turn, which becomes visible to status calls after the simulated latency."""
+        run.reply = self.responder(self._context(run))
+        run.status = "queued"
+        run.required_action = None
+        run.ready_at = time.monotonic() + self._turn_latency(run.reply)
+
+    def _turn_latency(self, reply: LocalReply) -> float:
+        text = reply if isinstance(reply, str) else " ".join(f"{name} {arguments}" for name, arguments in reply)
+        return self.latency + self.latency_per_token * _count_words(text)
+
+    def _finish_turn(self, run: _LocalRun, message_id: str | None = None) -> None:
+        """Apply the reply of a finished model turn to the run."""
+        if isinstance(run.reply, str):
+            message = self._add_message(
+                run.thread_id,
+                MessageRole.AGENT,
+                run.reply,
+                id=message_id or self._new_id("msg"),
+                assistant_id=run.assistant_id,
+                run_id=run.id,
+            )
+            run.steps.append(self._step(run, "message_creation", {"message_creation": {"message_id": message.id}}))
+            run.status = "completed"
+            return
+
+        tool_calls = [
+            {"id": self._new_id("call"), "type": "function", "function": {"name": name, "arguments": arguments}}
+            for name, arguments in run.reply
+        ]
+        run.required_action = {"type": "submit_tool_outputs", "submit_tool_outputs": {"tool_calls": tool_calls}}
+        run.steps.append(self._step(run, "tool_calls", {"tool_calls": tool_calls}, completed=False))
+        run.status = "requires_action"
+
+    def _complete_tool_calls(self, run: _LocalRun, tool_outputs: list[dict[str, str]]) -> None:
+        """Record the submitted tool outputs on the pending tool calls step."""
+        outputs = {output["tool_call_id"]: output["output"] for output in tool_outputs}
+        step = run.steps[-1]
+        for tool_call in step["step_details"]["tool_calls"]:
+            tool_call["function"]["output"] = outputs.get(tool_call["id"], "")
+            run.tool_outputs.append((tool_call["function"]["name"], tool_call["function"]["output"]))
+        step["status"] = "completed"
+        step["completed_at"] = int(time.time())
+
+    def _step(self, run: _LocalRun, step_type: str, details: dict[str, Any], completed: bool = True) -> dict[str, Any]:
+        return {
+            "id": self._new_id("step"),
+            "object": "thread.run.step",
+            "type": step_type,
+            "assistant_id": run.assistant_id,
+            "thread_id": run.thread_id,
+            "run_id": run.id,
+            "status": "completed" if completed else "in_progress",
+            "step_details": {"type": step_type, **details},
+            "created_at": int(time.time()),
+            "completed_at": int(time.time()) if completed else None,
+        }
+
+    def _to_thread_run(self, run: _LocalRun) -> ThreadRun:
+        return ThreadRun({
+            "id": run.id,
+            "object": "thread.run",
+            "thread_id": run.thread_id,
+            "assistant_id": run.assistant_id,
+            "status": run.status,
+            "required_action": run.required_action,
+            "created_at": int(time.time()),
+            "instructions": "",
+            "tools": [],
+            "metadata": {},
+        })
+
+    # endregion
+
+    # region Streamed runs
+
+    async def create_stream(self, thread_id: str, **kwargs: Any) -> AsyncAgentRunStream:
+        self.requests += 1
+        run = _LocalRun(
+            id=self._new_id("run"),
+            thread_id=thread_id,
+            assistant_id=kwargs.get("assistant_id") or kwargs.get("agent_id", ""),
+        )
+        self._runs[run.id] = run
+        event_handler = kwargs.get("event_handler") or AsyncAgentEventHandler()
+        return AsyncAgentRunStream(self._stream_turn(run, created=True), self._ignore_tool_outputs, event_handler)
+
+    async def submit_tool_outputs_to_stream(
+        self, thread_id: str, run_id: str, tool_outputs: list[dict[str, str]], event_handler: Any, **kwargs: Any
+    ) -> None:
+        self.requests += 1
+        run = self._runs[run_id]
+        self._complete_tool_calls(run, tool_outputs)
+        event_handler.initialize(self._stream_turn(run), self._ignore_tool_outputs)
+
+    async def _ignore_tool_outputs(self, run: ThreadRun, event_handler: Any) -> None:
+        """The SDK hook for automatic function calls, AzureAIAgent submits tool outputs itself."""
+
+    async def _stream_turn(self, run: _LocalRun, created: bool = False) -> AsyncIterator[bytes]:
+        """Stream a model turn as server-sent events, pushing each word as soon as it is generated."""
+        if created:
+            yield self._event("thread.run.created", self._to_thread_run(run).as_dict())
+        run.reply = self.responder(self._context(run))
+        run.status = "in_progress"
+        yield self._event("thread.run.in_progress", self._to_thread_run(run).as_dict())
+        await asyncio.sleep(self.latency)
+
+        if not isinstance(run.reply, str):
+            await asyncio.sleep(self._turn_latency(run.reply) - self.latency)
+            self._finish_turn(run)
+            yield self._event("thread.run.requires_action", self._to_thread_run(run).as_dict())
+            return
+
+        message_id = self._new_id("msg")
+        for index, word in enumerate(run.reply.split(" ")):
+            await asyncio.sleep(self.latency_per_token)
+            content = [{"index": 0, "type": "text", "text": {"value": word if index == 0 else f" {word}"}}]
+            delta = {"id": message_id, "object": "thread.message.delta"}
+            yield self._event("thread.message.delta", {**delta, "delta": {"role": "assistant", "content": content}})
+
+        self._finish_turn(run, message_id=message_id)
+        yield self._event("thread.run.step.completed", run.steps[-1])
+        yield self._event("thread.run.completed", self._to_thread_run(run).as_dict())
+        yield b"event: done\ndata: [DONE]\n\n"
+
+    @staticmethod
+    def _event(event_type: str, data: dict[str, Any]) -> bytes:
+        return f"event: {event_type}\ndata: {json.dumps(data)}\n\n".encode()
+
+    # endregion
+
+
+class LocalProjectClient(AIProjectClient):
+    """An `AIProjectClient` whose agents operations are served by `LocalAgentsOperations`."""
+
+    def __init__(self, agents: LocalAgentsOperations) -> None:  # pylint: disable=super-init-not-called
+        self.agents = agents
+
+    @property
+    def scope(self) -> dict[str, str]:
+        return {"subscription_id": "local", "resource_group_name": "local", "project_name": "local"}
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self) -> "LocalProjectClient":
+        return self
+
+    async def __aexit__(self, *exc_details: Any) -> None:
+        pass
@@ -0,0 +1,269 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import email.utils
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+import httpx
+
+from semantic_kernel.connectors.openapi_plugin import OpenAPIFunctionExecutionParameters
+from semantic_kernel.connectors.openapi_plugin.openapi_manager import create_functions_from_openapi
+from semantic_kernel.functions import KernelPlugin
+
+###################################################################
+# A local runtime for OpenAPI tools. A spec is read and parsed    #
+# once per process and compiled into kernel functions, which the  #
+# agent calls as regular function tools. All operations share one #
+# pooled async HTTP client whose transport caches responses in a  #
+# bounded LRU cache, honoring Cache-Control and revalidating with #
+# ETag / Last-Modified, so repeated lookups are served locally.   #
+###################################################################
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_CACHEABLE_METHODS = ("GET", "HEAD")
+# Headers that describe the wire format of the body, which is stored decoded
+_WIRE_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+@lru_cache(maxsize=32)
+def _load_spec(path: str, modified_at: float) -> str:
+    """Read an OpenAPI spec, keyed by its modification time so edits are picked up."""
+    with open(path, encoding="utf-8") as spec_file:
+        return spec_file.read()
+
+
+def load_openapi_spec(path: str) -> dict[str, Any]:
+    """Load and parse an OpenAPI spec, reading the file only once per process while it is unchanged.
+
+    Args:
+        path: The path of the JSON spec.
+
+    Returns:
+        The parsed spec. Every call returns a new copy that may be modified.
+    """
+    return json.loads(_load_spec(os.path.realpath(path), os.path.getmtime(path)))
+
+
+@dataclass
+class _CachedResponse:
+    status_code: int
+    headers: list[tuple[str, str]]
+    content: bytes
+    fresh_until: float
+    etag: str | None
+    last_modified: str | None
+
+
+@dataclass
+class _KeyLock:
+    """The lock of one cache key and the number of requests holding or waiting for it."""
+
+    lock: asyncio.Lock
+    users: int = 0
+
+
+def _parse_cache_control(value: str) -> dict[str, str | None]:
+    directives: dict[str, str | None] = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """An httpx transport that caches GET responses in a bounded LRU cache.
+
+    Fresh responses are served from the cache. Stale responses with an ETag or Last-Modified header
+    are revalidated with a conditional request, and a 304 answer reuses the cached body. Responses
+    without caching headers are kept for `default_ttl` seconds, `no-store` responses are never kept.
+    Concurrent requests for the same resource share a single network request.
+
+    Args:
+        transport: The transport used for network requests, defaults to a pooled AsyncHTTPTransport.
+        max_entries: The maximum number of cached responses.
+        max_entry_size: The maximum body size of a cached response in bytes.
+        default_ttl: Seconds a response without Cache-Control or Expires headers stays fresh.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        max_entries: int = 256,
+        max_entry_size: int = 1024 * 1024,
+        default_ttl: float = 300.0,
+    ) -> None:
+        self.transport = transport or httpx.AsyncHTTPTransport(limits=httpx.Limits(max_keepalive_connections=20))
+        self.max_entries = max_entries
+        self.max_entry_size = max_entry_size
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str, str], _CachedResponse] = OrderedDict()
+        self._locks: dict[tuple[str, str, str], _KeyLock] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in _CACHEABLE_METHODS:
+            return await self.transport.handle_async_request(request)
+
+        key = (request.method, str(request.url), request.headers.get("accept", ""))
+        key_lock = self._locks.get(key) or self._locks.setdefault(key, _KeyLock(asyncio.Lock()))
+        key_lock.users += 1
+        try:
+            async with key_lock.lock:
+                return await self._handle_cacheable(key, request)
+        finally:
+            # A woken waiter may not hold the lock yet, so the lock is only dropped once nobody uses it
+            key_lock.users -= 1
+            if not key_lock.users:
+                self._locks.pop(key, None)
+
+    async def _handle_cacheable(self, key: tuple[str, str, str], request: httpx.Request) -> httpx.Response:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if time.monotonic() < entry.fresh_until:
+                self.hits += 1
+                return self._to_response(entry, request)
+            if entry.etag:
+                request.headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request.headers["If-Modified-Since"] = entry.last_modified
+
+        response = await self.transport.handle_async_request(request)
+        if entry is not None and response.status_code == 304:
+            await response.aclose()
+            self.revalidations += 1
+            self._revalidate(key, entry, response.headers)
+            return self._to_response(entry, request)
+
+        self.misses += 1
+        content = await response.aread()
+        await response.aclose()
+        headers = [(name, value) for name, value in response.headers.items() if name.lower() not in _WIRE_HEADERS]
+        self._store(key, response, headers, content)
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    def _store(
+        self, key: tuple[str, str, str], response: httpx.Response, headers: list[tuple[str, str]], content: bytes
+    ) -> None:
+        if response.status_code != 200 or len(content) > self.max_entry_size:
+            self._entries.pop(key, None)
+            return
+        fresh_until = self._fresh_until(response.headers)
+        if fresh_until is None:
+            self._entries.pop(key, None)
+            return
+
+        self._entries[key] = _CachedResponse(
+            status_code=response.status_code,
+            headers=headers,
+            content=content,
+            fresh_until=fresh_until,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _revalidate(self, key: tuple[str, str, str], entry: _CachedResponse, not_modified: httpx.Headers) -> None:
+        """Update a cached response with the headers of a 304 answer, which override the stored ones.
+
+        A 304 without Cache-Control or Expires keeps the directives of the stored response, e.g. a
+        `max-age=0` response is revalidated again next time rather than kept for `default_ttl`.
+        """
+        headers = httpx.Headers(entry.headers)
+        # The response was just validated, its stored age no longer applies
+        headers.pop("age", None)
+        for name, value in not_modified.items():
+            if name.lower() not in _WIRE_HEADERS:
+                headers[name] = value
+        fresh_until = self._fresh_until(headers)
+        if fresh_until is None:
+            self._entries.pop(key, None)
+            return
+        entry.headers = list(headers.items())
+        entry.fresh_until = fresh_until
+        entry.etag = headers.get("etag")
+        entry.last_modified = headers.get("last-modified")
+
+    def _fresh_until(self, headers: httpx.Headers) -> float | None:
+        """The monotonic time until which a response is fresh, or None if it must not be stored."""
+        now = time.monotonic()
+        directives = _parse_cache_control(headers.get("cache-control", ""))
+        if "no-store" in directives:
+            return None
+        if "no-cache" in directives:
+            return now
+        for name in ("s-maxage", "max-age"):
+            if (max_age := directives.get(name)) is not None and max_age.isdigit():
+                return now + int(max_age) - int(headers.get("age", "0") or 0)
+        if (expires := headers.get("expires")) is not None:
+            try:
+                return now + email.utils.parsedate_to_datetime(expires).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return now
+        return now + self.default_ttl
+
+    @staticmethod
+    def _to_response(entry: _CachedResponse, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(entry.status_code, headers=entry.headers, content=entry.content, request=request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class OpenApiPluginRuntime:
+    """Compiles OpenAPI specs into kernel plugins that run locally over one shared, caching HTTP client.
+
+    Args:
+        timeout: The timeout of an API call in seconds.
+        cache_size: The maximum number of cached responses.
+        default_ttl: Seconds a response without caching headers stays fresh.
+    """
+
+    def __init__(self, timeout: float = 30.0, cache_size: int = 256, default_ttl: float = 300.0) -> None:
+        self.transport = CachingTransport(max_entries=cache_size, default_ttl=default_ttl)
+        self.http_client = httpx.AsyncClient(transport=self.transport, timeout=timeout, follow_redirects=True)
+        self._plugins: dict[tuple[str, str], KernelPlugin] = {}
+
+    async def __aenter__(self) -> "OpenApiPluginRuntime":
+        return self
+
+    async def __aexit__(self, *exc_details: Any) -> None:
+        await self.close()
+
+    def create_plugin(self, plugin_name: str, spec_path: str, description: str | None = None) -> KernelPlugin:
+        """Create a plugin with one kernel function per operation of an OpenAPI spec.
+
+        Args:
+            plugin_name: The plugin name.
+            spec_path: The path of the JSON spec.
+            description: The plugin description.
+
+        Returns:
+            The plugin. Plugins are compiled once per runtime and spec.
+        """
+        key = (plugin_name, os.path.realpath(spec_path))
+        if key not in self._plugins:
+            functions = create_functions_from_openapi(
+                plugin_name=plugin_name,
+                openapi_parsed_spec=load_openapi_spec(spec_path),
+                execution_settings=OpenAPIFunctionExecutionParameters(http_client=self.http_client),
+            )
+            self._plugins[key] = KernelPlugin(name=plugin_name, description=description, functions=functions)
+        return self._plugins[key]
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client."""
+        await self.http_client.aclose()
@@ -1,5 +1,6 @@
 # Copyright (c) Microsoft. All rights reserved.
 
+import argparse
 import asyncio
 from typing import Annotated
 
@@ -11,10 +12,18 @@ from semantic_kernel.contents.chat_message_content import ChatMessageContent
 from semantic_kernel.contents.utils.author_role import AuthorRole
 from semantic_kernel.functions.kernel_function_decorator import kernel_function
 
+from adaptive_polling import AdaptivePollingOptions
+from agent_pool import AzureAIAgentPool
+
 ###################################################################
 # The following sample demonstrates how to create a simple,       #
 # Azure AI agent that answers questions about a sample menu       #
 # using a Semantic Kernel Plugin.                                 #
+#                                                                 #
+# Runs are polled with adaptive polling options, or streamed with #
+# `--stream` so the answer is printed as it is generated. The     #
+# agent definition and the thread come from AzureAIAgentPool, so  #
+# later runs reuse the definition instead of recreating it.       #
 ###################################################################
 
 
@@ -37,7 +46,7 @@ class MenuPlugin:
         return "$9.99"
 
 
-async def main() -> None:
+async def main(stream: bool = False) -> None:
     ai_agent_settings = AzureAIAgentSettings.create(env_file_path="../../.env")
 
     async with (
@@ -46,30 +55,31 @@ async def main() -> None:
             credential=creds,
             conn_str=ai_agent_settings.project_connection_string.get_secret_value(),
         ) as client,
+        AzureAIAgentPool(client, min_threads=1, refill=False) as pool,
     ):
         AGENT_NAME = "Host"
         AGENT_INSTRUCTIONS = "Answer questions about the menu."
 
-        # Create agent definition
-        agent_definition = await client.agents.create_agent(
+        # Reuse the agent definition with the same content, it is only created on the first run
+        agent_definition = await pool.get_definition(
             model=ai_agent_settings.model_deployment_name,
             name=AGENT_NAME,
             instructions=AGENT_INSTRUCTIONS,
         )
 
+        # Poll quickly at first, then adapt the interval to the observed run durations,
+        # and poll again right away once tool outputs are submitted
+        polling_options = AdaptivePollingOptions()
+        polling_options.watch_client(client)
+
         # Create the AzureAI Agent
-        agent = AzureAIAgent(
-            client=client,
-            definition=agent_definition,
-            # Optionally configure polling options
-            # polling_options=RunPollingOptions(run_polling_interval=timedelta(seconds=1)),
-        )
+        agent = AzureAIAgent(client=client, definition=agent_definition, polling_options=polling_options)
 
         # Add the sample plugin to the kernel
         agent.kernel.add_plugin(MenuPlugin(), plugin_name="menu")
 
-        # Create a new thread
-        thread = await client.agents.create_thread()
+        # Take a prewarmed thread
+        thread_id = await pool.acquire_thread()
 
         user_inputs = [
             "Hello",
@@ -83,20 +93,30 @@ async def main() -> None:
             for user_input in user_inputs:
                 # Add the user input as a chat message
                 await agent.add_chat_message(
-                    thread_id=thread.id, message=ChatMessageContent(role=AuthorRole.USER, content=user_input)
+                    thread_id=thread_id, message=ChatMessageContent(role=AuthorRole.USER, content=user_input)
                 )
                 print(f"# User: '{user_input}'")
+                if stream:
+                    # Stream the run and print the deltas as they arrive
+                    print("# Agent: ", end="", flush=True)
+                    async for content in agent.invoke_stream(thread_id=thread_id, temperature=0.2):
+                        if content.role != AuthorRole.TOOL and content.content:
+                            print(content.content, end="", flush=True)
+                    print()
+                    continue
                 # Invoke the agent for the specified thread
                 async for content in agent.invoke(
-                    thread_id=thread.id,
+                    thread_id=thread_id,
                     temperature=0.2,  # override the agent-level temperature setting with a run-time value
                 ):
                     if content.role != AuthorRole.TOOL:
                         print(f"# Agent: {content.content}")
         finally:
-            await client.agents.delete_thread(thread.id)
-            await client.agents.delete_agent(agent.id)
+            # The thread is deleted in the background, the definition is kept for the next run
+            pool.release_thread(thread_id)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Answer questions about a sample menu")
+    parser.add_argument("--stream", action="store_true", help="Stream the runs instead of polling them")
+    asyncio.run(main(stream=parser.parse_args().stream))
@@ -6,11 +6,13 @@ from azure.ai.projects.aio import AIProjectClient
 from azure.identity.aio import DefaultAzureCredential
 
 from semantic_kernel.agents import AgentGroupChat
-from semantic_kernel.agents.azure_ai import AzureAIAgent, AzureAIAgentSettings
+from semantic_kernel.agents.azure_ai import AzureAIAgentSettings
 from semantic_kernel.agents.strategies.termination.termination_strategy import TerminationStrategy
 from semantic_kernel.contents.chat_message_content import ChatMessageContent
 from semantic_kernel.contents.utils.author_role import AuthorRole
 
+from thread_message_cache import CachedAzureAIAgent, ThreadMessageCache
+
 #####################################################################
 # The following sample demonstrates how to create an OpenAI         #
 # assistant using either Azure OpenAI or OpenAI, a chat completion  #
@@ -56,6 +58,9 @@ async def main():
             conn_str=ai_agent_settings.project_connection_string.get_secret_value(),
         ) as client,
     ):
+        # Thread messages are cached locally and only new messages are fetched on each read
+        message_cache = ThreadMessageCache(client)
+
         # Create the reviewer agent definition
         reviewer_agent_definition = await client.agents.create_agent(
             model=ai_agent_settings.model_deployment_name,
@@ -63,9 +68,10 @@ async def main():
             instructions=REVIEWER_INSTRUCTIONS,
         )
         # Create the reviewer Azure AI Agent
-        agent_reviewer = AzureAIAgent(
+        agent_reviewer = CachedAzureAIAgent(
             client=client,
             definition=reviewer_agent_definition,
+            message_cache=message_cache,
         )
 
         # Create the copy writer agent definition
@@ -75,9 +81,10 @@ async def main():
             instructions=COPYWRITER_INSTRUCTIONS,
         )
         # Create the copy writer Azure AI Agent
-        agent_writer = AzureAIAgent(
+        agent_writer = CachedAzureAIAgent(
             client=client,
             definition=copy_writer_agent_definition,
+            message_cache=message_cache,
         )
 
         chat = AgentGroupChat(
@@ -1,19 +1,25 @@
 # Copyright (c) Microsoft. All rights reserved.
 
 import asyncio
+import os
 
 from azure.ai.projects.aio import AIProjectClient
-from azure.ai.projects.models import CodeInterpreterTool
 from azure.identity.aio import DefaultAzureCredential
 
 from semantic_kernel.agents.azure_ai import AzureAIAgent, AzureAIAgentSettings
 from semantic_kernel.contents.chat_message_content import ChatMessageContent
 from semantic_kernel.contents.utils.author_role import AuthorRole
 
+from code_worker_pool import CodeExecutionPlugin, CodeWorkerPool
+
 ###################################################################
 # The following sample demonstrates how to create a simple,       #
 # Azure AI agent that uses the code interpreter tool to answer    #
 # a coding question.                                              #
+#                                                                 #
+# The code runs locally on a pool of prewarmed worker processes   #
+# instead of the remote code interpreter, and the files it writes #
+# (e.g. chart.png) are kept in the local scratch directory.       #
 ###################################################################
 
 
@@ -26,14 +32,15 @@ async def main() -> None:
             credential=creds,
             conn_str=ai_agent_settings.project_connection_string.get_secret_value(),
         ) as client,
+        CodeWorkerPool(
+            scratch_dir=os.path.join(os.path.dirname(os.path.realpath(__file__)), "scratch"),
+            timeout=60,
+        ) as code_workers,
     ):
-        code_interpreter = CodeInterpreterTool()
-
-        # Create agent definition
+        # Create agent definition, the code execution function is added by the agent on every run
         agent_definition = await client.agents.create_agent(
             model=ai_agent_settings.model_deployment_name,
-            tools=code_interpreter.definitions,
-            tool_resources=code_interpreter.resources,
+            instructions="Write and run Python code with the execute_python function to answer the question.",
         )
 
         # Create the AzureAI Agent
@@ -41,6 +48,7 @@ async def main() -> None:
             client=client,
             definition=agent_definition,
         )
+        agent.kernel.add_plugin(CodeExecutionPlugin(code_workers), plugin_name="code")
 
         # Create a new thread
         thread = await client.agents.create_thread()
@@ -1,24 +1,25 @@
 # Copyright (c) Microsoft. All rights reserved.
 
 import asyncio
-import json
 import os
 
 from azure.ai.projects.aio import AIProjectClient
-from azure.ai.projects.models import (
-    OpenApiAnonymousAuthDetails,
-    OpenApiTool,
-)
 from azure.identity.aio import DefaultAzureCredential
 
 from semantic_kernel.agents.azure_ai import AzureAIAgent, AzureAIAgentSettings
 from semantic_kernel.contents.chat_message_content import ChatMessageContent
 from semantic_kernel.contents.utils.author_role import AuthorRole
 
+from openapi_runtime import OpenApiPluginRuntime
+
 ###################################################################
 # The following sample demonstrates how to create a simple,       #
 # Azure AI agent that uses the code interpreter tool to answer    #
 # a coding question.                                              #
+#                                                                 #
+# The OpenAPI operations run locally as kernel functions over a   #
+# pooled HTTP client that caches responses, so repeated lookups   #
+# (e.g. the same country or city) do not hit the APIs again.      #
 ###################################################################
 
 
@@ -31,39 +32,28 @@ async def main() -> None:
             credential=creds,
             conn_str=ai_agent_settings.project_connection_string.get_secret_value(),
         ) as client,
+        OpenApiPluginRuntime() as runtime,
     ):
         openapi_spec_file_path = os.path.join(
             os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
             "resources",
         )
 
-        # Create Auth object for the OpenApiTool (note that connection or managed identity
-        # auth setup requires additional setup in Azure)
-        auth = OpenApiAnonymousAuthDetails()
-
-        # Initialize agent OpenApi tool using the read in OpenAPI spec
-
-        with open(os.path.join(openapi_spec_file_path, "weather.json")) as weather_file:
-            weather_openapi_spec = json.loads(weather_file.read())
-
-        openapi_weather = OpenApiTool(
-            name="get_weather",
-            spec=weather_openapi_spec,
+        # Compile the OpenAPI specs once into local plugins, the agent calls them as function tools
+        weather_plugin = runtime.create_plugin(
+            "weather",
+            os.path.join(openapi_spec_file_path, "weather.json"),
             description="Retrieve weather information for a location",
-            auth=auth,
         )
-
-        with open(os.path.join(openapi_spec_file_path, "countries.json")) as countries_file:
-            countries_openapi_spec = json.loads(countries_file.read())
-
-        openapi_countries = OpenApiTool(
-            name="get_country", spec=countries_openapi_spec, description="Retrieve country information", auth=auth
+        countries_plugin = runtime.create_plugin(
+            "countries",
+            os.path.join(openapi_spec_file_path, "countries.json"),
+            description="Retrieve country information",
         )
 
-        # Create agent definition
+        # Create agent definition, the function tools are added by the agent on every run
         agent_definition = await client.agents.create_agent(
             model=ai_agent_settings.model_deployment_name,
-            tools=openapi_weather.definitions + openapi_countries.definitions,
         )
 
         # Create the AzureAI Agent
@@ -71,6 +61,8 @@ async def main() -> None:
             client=client,
             definition=agent_definition,
         )
+        agent.kernel.add_plugin(weather_plugin)
+        agent.kernel.add_plugin(countries_plugin)
 
         # Create a new thread
         thread = await client.agents.create_thread()
@@ -0,0 +1,80 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+from datetime import timedelta
+
+from pydantic import Field
+
+from semantic_kernel.agents.azure_ai import AzureAIAgent
+from semantic_kernel.contents.chat_message_content import ChatMessageContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from adaptive_polling import AdaptivePollingOptions
+from local_agents_service import LocalAgentsOperations, LocalProjectClient, LocalReply
+from step1_azure_ai_agent import MenuPlugin
+
+###################################################################
+# Runs AzureAIAgent.invoke against the local agents stand-in, so  #
+# the runs are polled by AgentThreadActions itself. Each turn is  #
+# a run episode that ends with a tool call and an episode after   #
+# the tool outputs are submitted. On Python 3.11 every episode is #
+# polled in a task of its own (asyncio.wait_for).                 #
+###################################################################
+
+LATENCY = 0.3
+
+
+class RecordingPollingOptions(AdaptivePollingOptions):
+    """Records the (iteration count, interval) of every status call."""
+
+    intervals: list[tuple[int, float]] = Field(default_factory=list)
+
+    def get_polling_interval(self, iteration_count: int) -> timedelta:
+        interval = super().get_polling_interval(iteration_count)
+        self.intervals.append((iteration_count, interval.total_seconds()))
+        return interval
+
+
+def _specials_host(context: list[tuple[str, str]]) -> LocalReply:
+    """Ask for the specials, then answer with the tool output."""
+    if context and context[-1][0] == "tool":
+        return f"Here you go: {context[-1][1].strip()}"
+    return [("menu-get_specials", "{}")]
+
+
+async def _run_turns(polling_options: AdaptivePollingOptions, turns: int) -> None:
+    client = LocalProjectClient(LocalAgentsOperations(responder=_specials_host, latency=LATENCY, latency_per_token=0))
+    polling_options.watch_client(client)
+    definition = await client.agents.create_agent(model="local", name="Host", instructions="Answer questions.")
+    agent = AzureAIAgent(client=client, definition=definition, polling_options=polling_options)
+    agent.kernel.add_plugin(MenuPlugin(), plugin_name="menu")
+    thread = await client.agents.create_thread()
+    for _ in range(turns):
+        await agent.add_chat_message(
+            thread_id=thread.id, message=ChatMessageContent(role=AuthorRole.USER, content="What is the special soup?")
+        )
+        async for _ in agent.invoke(thread_id=thread.id):
+            pass
+
+
+def test_run_is_polled_right_away_after_tool_submission():
+    polling_options = RecordingPollingOptions(
+        first_polling_interval=timedelta(milliseconds=10), run_polling_backoff=timedelta(seconds=2)
+    )
+
+    asyncio.run(_run_turns(polling_options, turns=2))
+
+    first_intervals = [interval for iteration_count, interval in polling_options.intervals if iteration_count == 0]
+    assert len(first_intervals) == 4
+    # The second run episode sleeps until the run is expected to be done, its tool episode polls right away
+    assert first_intervals[2] > LATENCY / 2
+    assert first_intervals[3] == 0.01
+
+
+def test_tool_episodes_do_not_feed_the_duration_estimate():
+    polling_options = AdaptivePollingOptions(first_polling_interval=timedelta(milliseconds=10))
+
+    asyncio.run(_run_turns(polling_options, turns=3))
+
+    assert polling_options.observed_runs == 3
+    assert LATENCY / 2 < polling_options.expected_run_duration < LATENCY * 2
@@ -0,0 +1,164 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import logging
+import sys
+from collections.abc import AsyncIterable
+from dataclasses import dataclass, field
+
+if sys.version < "3.12":
+    from typing_extensions import override  # pragma: no cover
+else:
+    from typing import override  # type: ignore # pragma: no cover
+
+from azure.ai.projects.aio import AIProjectClient
+from azure.ai.projects.models import MessageStatus
+from pydantic import Field
+
+from semantic_kernel.agents.azure_ai import AzureAIAgent
+from semantic_kernel.agents.azure_ai.agent_content_generation import generate_message_content
+from semantic_kernel.agents.azure_ai.agent_thread_actions import AgentThreadActions
+from semantic_kernel.agents.azure_ai.azure_ai_channel import AzureAIChannel
+from semantic_kernel.agents.channels.agent_channel import AgentChannel
+from semantic_kernel.contents.chat_message_content import ChatMessageContent
+
+###################################################################
+# A local cache of Azure AI agent thread messages. Instead of     #
+# paging through the whole thread on every read, the cache only   #
+# asks the service for the messages after the last one it has     #
+# seen, so reading a long thread costs O(new messages). The       #
+# cached agent and channel plug the cache into AgentGroupChat.    #
+###################################################################
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CachedThread:
+    """The cached messages of one thread, in ascending order."""
+
+    messages: list[ChatMessageContent] = field(default_factory=list)
+    last_message_id: str | None = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class ThreadMessageCache:
+    """Caches thread messages and syncs them incrementally with a cursor on the last seen message.
+
+    A message that is still being written by a run does not advance the cursor, so it is fetched
+    again on the next sync.
+
+    Args:
+        client: The AzureAI Project client.
+        page_size: The number of messages requested per page.
+    """
+
+    def __init__(self, client: AIProjectClient, page_size: int = 100) -> None:
+        self.client = client
+        self.page_size = page_size
+        self.fetched_messages = 0
+        self._threads: dict[str, _CachedThread] = {}
+        self._agent_names: dict[str, str] = {}
+
+    async def get_messages(self, thread_id: str) -> list[ChatMessageContent]:
+        """Sync a thread and return all of its messages in ascending order.
+
+        Args:
+            thread_id: The thread id.
+
+        Returns:
+            The cached messages. The list is a copy and can be modified by the caller.
+        """
+        thread = self._threads.setdefault(thread_id, _CachedThread())
+        async with thread.lock:
+            await self._sync(thread_id, thread)
+            return list(thread.messages)
+
+    def invalidate(self, thread_id: str | None = None) -> None:
+        """Drop the cached messages of a thread, or of all threads.
+
+        Args:
+            thread_id: The thread id, or None to clear the whole cache.
+        """
+        if thread_id is None:
+            self._threads.clear()
+        else:
+            self._threads.pop(thread_id, None)
+
+    async def _sync(self, thread_id: str, thread: _CachedThread) -> None:
+        """Fetch the messages after the last seen message."""
+        while True:
+            page = await self.client.agents.list_messages(
+                thread_id=thread_id, limit=self.page_size, order="asc", after=thread.last_message_id
+            )
+            if not page or not page.data:
+                return
+
+            for message in page.data:
+                if message.status == MessageStatus.IN_PROGRESS:
+                    # Still being written by a run, fetch it again next time
+                    return
+                self.fetched_messages += 1
+                thread.last_message_id = message.id
+                content = generate_message_content(await self._get_agent_name(message.assistant_id), message)
+                if len(content.items) > 0:
+                    thread.messages.append(content)
+
+            if not page.has_more:
+                return
+
+    async def _get_agent_name(self, assistant_id: str | None) -> str | None:
+        """Resolve the agent name of a message, looking each agent up only once."""
+        if not assistant_id or not assistant_id.strip():
+            return None
+        if assistant_id not in self._agent_names:
+            assistant = await self.client.agents.get_agent(assistant_id)
+            self._agent_names[assistant_id] = assistant.name if assistant.name and assistant.name.strip() else ""
+        return self._agent_names[assistant_id] or assistant_id
+
+
+class CachedAzureAIChannel(AzureAIChannel):
+    """An AzureAIChannel that reads its history from a ThreadMessageCache."""
+
+    def __init__(self, client: AIProjectClient, thread_id: str, cache: ThreadMessageCache) -> None:
+        """Initialize the cached AzureAI Channel.
+
+        Args:
+            client: The AzureAI Project client.
+            thread_id: The thread ID.
+            cache: The message cache.
+        """
+        super().__init__(client=client, thread_id=thread_id)
+        self.cache = cache
+
+    @override
+    async def get_history(self) -> AsyncIterable[ChatMessageContent]:
+        """Get the conversation history in descending order, syncing only the new messages.
+
+        Yields:
+            ChatMessageContent: The conversation history.
+        """
+        for message in reversed(await self.cache.get_messages(self.thread_id)):
+            yield message
+
+    @override
+    async def reset(self) -> None:
+        """Reset the agent's thread and invalidate its cached messages."""
+        self.cache.invalidate(self.thread_id)
+        await super().reset()
+
+
+class CachedAzureAIAgent(AzureAIAgent):
+    """An AzureAIAgent whose group chat channels read the thread history from a ThreadMessageCache.
+
+    Agents that share a `message_cache` also share the agent name lookups.
+    """
+
+    message_cache: ThreadMessageCache | None = Field(default=None, exclude=True)
+
+    async def create_channel(self) -> AgentChannel:
+        """Create a channel backed by the message cache."""
+        if self.message_cache is None:
+            self.message_cache = ThreadMessageCache(self.client)
+        thread_id = await AgentThreadActions.create_thread(self.client)
+        return CachedAzureAIChannel(client=self.client, thread_id=thread_id, cache=self.message_cache)
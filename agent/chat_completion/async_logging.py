@@ -0,0 +1,177 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import atexit
+import copy
+import logging
+import queue
+import random
+import re
+from collections import Counter
+from collections.abc import Iterable
+from logging.handlers import QueueHandler, QueueListener
+
+###################################################################
+# Logging that stays off the event loop. Records are put on a     #
+# bounded queue and formatted and written by a background thread; #
+# when the queue is full they are dropped rather than blocking.   #
+# Chatty loggers can be sampled, and long payloads (full prompts  #
+# and responses) are redacted and truncated before being written. #
+###################################################################
+
+# Secrets that may appear in logged requests
+DEFAULT_REDACTIONS: list[tuple[str, str]] = [
+    (r"(?i)(api[-_]?key|authorization|bearer)(['\"]?\s*[:=]\s*['\"]?|\s+)[\w\-.~+/]{8,}=*", r"\1\2[REDACTED]"),
+    (r"\bsk-[A-Za-z0-9_\-]{16,}", "[REDACTED]"),
+]
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a share of the records of each logger, records at or above `always_keep_level` are always kept.
+
+    Args:
+        sample_rates: The share of records kept per logger name prefix, e.g. {"httpx": 0.1}; the longest
+            matching prefix wins and loggers without a match keep every record.
+        always_keep_level: The level from which records are never sampled out, default is WARNING.
+    """
+
+    def __init__(self, sample_rates: dict[str, float] | None = None, always_keep_level: int = logging.WARNING) -> None:
+        super().__init__()
+        self.sample_rates = dict(sample_rates or {})
+        self.always_keep_level = always_keep_level
+        self.sampled_out: Counter[str] = Counter()
+        self._rates: dict[str, float] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.always_keep_level:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self.sampled_out[record.name] += 1
+        return False
+
+    def _rate(self, name: str) -> float:
+        if (rate := self._rates.get(name)) is None:
+            prefixes = [
+                prefix for prefix in self.sample_rates if name == prefix or name.startswith(prefix + ".")
+            ]
+            rate = self.sample_rates[max(prefixes, key=len)] if prefixes else 1.0
+            self._rates[name] = rate
+        return rate
+
+
+class TruncatingFormatter(logging.Formatter):
+    """A formatter that redacts secrets from the message and truncates it.
+
+    Args:
+        fmt: The format string, see logging.Formatter.
+        max_message_chars: The maximum length of the message, longer messages keep their start and end.
+        redactions: The (pattern, replacement) pairs applied to the message.
+    """
+
+    def __init__(
+        self,
+        fmt: str | None = None,
+        max_message_chars: int = 2000,
+        redactions: Iterable[tuple[str, str]] = DEFAULT_REDACTIONS,
+    ) -> None:
+        super().__init__(fmt)
+        self.max_message_chars = max_message_chars
+        self.redactions = [(re.compile(pattern), replacement) for pattern, replacement in redactions]
+        self.truncated = 0
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        message = record.message
+        for pattern, replacement in self.redactions:
+            message = pattern.sub(replacement, message)
+        if len(message) > self.max_message_chars:
+            self.truncated += 1
+            head = self.max_message_chars * 3 // 4
+            tail = self.max_message_chars - head
+            omitted = len(message) - head - tail
+            message = f"{message[:head]} ...[{omitted} chars truncated]... {message[-tail:] if tail else ''}"
+        record = copy.copy(record)
+        record.message = message
+        return super().formatMessage(record)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """A queue handler that defers formatting to the listener thread and drops records when the queue is full.
+
+    Args:
+        max_queue_size: The number of waiting records from which records are dropped.
+        always_keep_level: The level from which records are never dropped, default is WARNING.
+    """
+
+    def __init__(self, max_queue_size: int = 10000, always_keep_level: int = logging.WARNING) -> None:
+        super().__init__(queue.Queue())
+        self.max_queue_size = max_queue_size
+        self.always_keep_level = always_keep_level
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # QueueHandler formats the message here, on the caller's thread; the listener formats it instead
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if record.levelno < self.always_keep_level and self.queue.qsize() >= self.max_queue_size:
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+
+class AsyncLogging:
+    """Routes the root logger through a bounded queue to handlers run on a background thread.
+
+    Args:
+        level: The level of the root logger.
+        handlers: The handlers writing the records, a stderr StreamHandler by default.
+        sample_rates: The share of records kept per logger name prefix, see SamplingFilter.
+        max_message_chars: The maximum length of a logged message, see TruncatingFormatter.
+        redactions: The (pattern, replacement) pairs applied to every message.
+        max_queue_size: The number of records waiting to be written from which records below WARNING are
+            dropped, default is 10000.
+        fmt: The format of the records, the logging.basicConfig format by default.
+    """
+
+    def __init__(
+        self,
+        level: int = logging.DEBUG,
+        handlers: list[logging.Handler] | None = None,
+        sample_rates: dict[str, float] | None = None,
+        max_message_chars: int = 2000,
+        redactions: Iterable[tuple[str, str]] = DEFAULT_REDACTIONS,
+        max_queue_size: int = 10000,
+        fmt: str = logging.BASIC_FORMAT,
+    ) -> None:
+        self.formatter = TruncatingFormatter(fmt, max_message_chars=max_message_chars, redactions=redactions)
+        self.handlers = handlers or [logging.StreamHandler()]
+        for handler in self.handlers:
+            handler.setFormatter(self.formatter)
+        self.sampling_filter = SamplingFilter(sample_rates)
+        self.queue_handler = NonBlockingQueueHandler(max_queue_size)
+        self.queue_handler.addFilter(self.sampling_filter)
+        self.listener = QueueListener(self.queue_handler.queue, *self.handlers, respect_handler_level=True)
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(self.queue_handler)
+        self.listener.start()
+        self._running = True
+        atexit.register(self.stop)
+
+    def stats(self) -> dict[str, int]:
+        """The dropped, sampled out and truncated record counters."""
+        return {
+            "dropped": self.queue_handler.dropped,
+            "sampled_out": sum(self.sampling_filter.sampled_out.values()),
+            "truncated": self.formatter.truncated,
+            "queued": self.queue_handler.queue.qsize(),
+        }
+
+    def stop(self) -> None:
+        """Write the queued records and stop the background thread."""
+        if self._running:
+            self._running = False
+            logging.getLogger().removeHandler(self.queue_handler)
+            self.listener.stop()
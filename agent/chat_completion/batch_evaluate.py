@@ -0,0 +1,279 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+
+from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.contents import ChatHistory
+
+from step5_json_result import InputScore, create_tutor_agent, create_tutor_kernel
+
+###################################################################
+# The following script scores a JSONL file of user inputs with    #
+# the single-turn tutor agent from step5. Inputs are streamed     #
+# from disk and scored with bounded, adaptive concurrency:        #
+# throttling (HTTP 429) halves the number of requests in flight   #
+# and pauses for the Retry-After period, successes grow it back.  #
+# Validated results are appended to the output file as they       #
+# arrive, and the output file doubles as the checkpoint, so an    #
+# interrupted run resumes where it stopped.                       #
+#                                                                 #
+# Input lines:  {"id": "1", "input": "The sunset is colorful."}  #
+# Output lines: {"id": "1", "input": "...", "score": 40, ...}     #
+###################################################################
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """An AIMD concurrency limiter that backs off on throttling.
+
+    Args:
+        initial: The initial number of requests allowed in flight.
+        maximum: The maximum number of requests allowed in flight.
+    """
+
+    def __init__(self, initial: int, maximum: int) -> None:
+        self.limit = float(initial)
+        self.maximum = maximum
+        self.in_flight = 0
+        self._resume_at = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """Wait for a free slot and for any throttling pause to pass."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def release(self, throttled: bool = False, retry_after: float | None = None) -> None:
+        """Release a slot, shrinking the limit on throttling and growing it on success."""
+        async with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+                self._resume_at = max(self._resume_at, time.monotonic() + (retry_after or 1.0))
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+@dataclass
+class Progress:
+    """Counters for the throughput report."""
+
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retries: int = 0
+    throttled: int = 0
+    started: float = 0.0
+
+    def report(self, limiter: AdaptiveLimiter) -> str:
+        """Format the current throughput."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (
+            f"# scored={self.succeeded} failed={self.failed} skipped={self.skipped} retries={self.retries} "
+            f"throttled={self.throttled} concurrency={int(limiter.limit)} "
+            f"throughput={self.succeeded / elapsed:.2f}/s elapsed={elapsed:.1f}s"
+        )
+
+
+def _read_completed_ids(output_path: str) -> set[str]:
+    """Read the ids already written to the output file."""
+    completed: set[str] = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as output_file:
+        for line in output_file:
+            try:
+                completed.add(str(json.loads(line)["id"]))
+            except (json.JSONDecodeError, KeyError):
+                # A partially written last line from an interrupted run
+                continue
+    return completed
+
+
+def _read_inputs(input_path: str, on_invalid: Callable[[int, str, str], None]) -> Iterator[tuple[str, str]]:
+    """Stream (id, input) pairs from a JSONL file. The line number is used when no id is given.
+
+    Args:
+        input_path: The JSONL file with the inputs.
+        on_invalid: Called with the line number, the line and the error for every line that is skipped.
+    """
+    with open(input_path, encoding="utf-8") as input_file:
+        for line_number, line in enumerate(input_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as ex:
+                on_invalid(line_number, line, f"JSONDecodeError: {ex}")
+                continue
+            if not isinstance(record, dict) or not isinstance(record.get("input"), str):
+                on_invalid(line_number, line, "The line is not an object with an 'input' string")
+                continue
+            yield str(record.get("id", line_number)), record["input"]
+
+
+def _throttling(ex: BaseException) -> tuple[bool, float | None]:
+    """Check whether an exception (or its cause) is a 429 and return its Retry-After in seconds."""
+    current: BaseException | None = ex
+    while current is not None:
+        if getattr(current, "status_code", None) == 429:
+            response = getattr(current, "response", None)
+            retry_after = response.headers.get("retry-after") if response is not None else None
+            try:
+                return True, float(retry_after) if retry_after else None
+            except ValueError:
+                return True, None
+        current = current.__cause__ or current.__context__
+    return False, None
+
+
+async def score_input(agent: ChatCompletionAgent, user_input: str) -> InputScore:
+    """Score a single input with the agent and validate the structured result."""
+    history = ChatHistory()
+    history.add_user_message(user_input)
+    content = ""
+    async for message in agent.invoke(history):
+        content = message.content or ""
+    return InputScore.model_validate_json(content)
+
+
+async def run(
+    agent: ChatCompletionAgent,
+    input_path: str,
+    output_path: str,
+    concurrency: int = 8,
+    max_concurrency: int = 64,
+    max_retries: int = 5,
+    report_interval: float = 10.0,
+) -> Progress:
+    """Score every input of `input_path` that is not yet in `output_path`.
+
+    Args:
+        agent: The agent used to score the inputs.
+        input_path: The JSONL file with the inputs.
+        output_path: The JSONL file the results are appended to, also used to resume.
+        concurrency: The initial number of requests in flight.
+        max_concurrency: The upper bound for the adaptive concurrency.
+        max_retries: The number of retries per input before it is recorded as failed.
+        report_interval: Seconds between throughput reports.
+
+    Returns:
+        The final progress counters.
+    """
+    completed = _read_completed_ids(output_path)
+    limiter = AdaptiveLimiter(initial=concurrency, maximum=max_concurrency)
+    progress = Progress(started=time.monotonic())
+    queue: asyncio.Queue[tuple[str, str] | None] = asyncio.Queue(maxsize=max_concurrency * 2)
+
+    with (
+        open(output_path, "a", encoding="utf-8") as output_file,
+        open(f"{output_path}.errors", "a", encoding="utf-8") as error_file,
+    ):
+
+        async def score_with_retries(item_id: str, user_input: str) -> None:
+            for attempt in range(max_retries + 1):
+                await limiter.acquire()
+                throttled, retry_after, backoff = False, None, 0.0
+                try:
+                    result = await score_input(agent, user_input)
+                except Exception as ex:
+                    throttled, retry_after = _throttling(ex)
+                    progress.throttled += throttled
+                    if attempt == max_retries:
+                        progress.failed += 1
+                        error = {"id": item_id, "input": user_input, "error": f"{type(ex).__name__}: {ex}"}
+                        error_file.write(json.dumps(error, ensure_ascii=False) + "\n")
+                        return
+                    progress.retries += 1
+                    if not throttled:
+                        # Validation and transient errors back off exponentially with jitter
+                        backoff = min(30.0, 2**attempt) * random.uniform(0.5, 1.0)
+                    result = None
+                finally:
+                    await limiter.release(throttled=throttled, retry_after=retry_after)
+
+                if result is None:
+                    # Back off without holding a slot, so the other inputs keep the limiter busy
+                    await asyncio.sleep(backoff)
+                    continue
+
+                record = {"id": item_id, "input": user_input, **result.model_dump()}
+                output_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                progress.succeeded += 1
+                if progress.succeeded % 100 == 0:
+                    output_file.flush()
+                return
+
+        async def worker() -> None:
+            while (item := await queue.get()) is not None:
+                await score_with_retries(*item)
+
+        async def reporter() -> None:
+            while True:
+                await asyncio.sleep(report_interval)
+                output_file.flush()
+                print(progress.report(limiter), flush=True)
+
+        def skip_invalid(line_number: int, line: str, error: str) -> None:
+            progress.failed += 1
+            invalid = {"line": line_number, "text": line.rstrip("\n"), "error": error}
+            error_file.write(json.dumps(invalid, ensure_ascii=False) + "\n")
+
+        workers = [asyncio.create_task(worker()) for _ in range(max_concurrency)]
+        report_task = asyncio.create_task(reporter())
+        try:
+            for item_id, user_input in _read_inputs(input_path, skip_invalid):
+                if item_id in completed:
+                    progress.skipped += 1
+                    continue
+                await queue.put((item_id, user_input))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            report_task.cancel()
+            for task in workers:
+                task.cancel()
+
+    print(progress.report(limiter), flush=True)
+    return progress
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Score a JSONL file of inputs with the tutor agent")
+    parser.add_argument("input", help="JSONL file with one {'id', 'input'} object per line")
+    parser.add_argument("output", help="JSONL file the scores are appended to, used to resume")
+    parser.add_argument("--concurrency", type=int, default=8, help="Initial number of requests in flight")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="Upper bound for the adaptive concurrency")
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries per input before it is recorded as failed")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between throughput reports")
+    args = parser.parse_args()
+
+    agent = create_tutor_agent(create_tutor_kernel())
+    await run(
+        agent,
+        args.input,
+        args.output,
+        concurrency=args.concurrency,
+        max_concurrency=args.max_concurrency,
+        max_retries=args.max_retries,
+        report_interval=args.report_interval,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
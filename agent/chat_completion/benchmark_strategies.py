@@ -0,0 +1,299 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
+
+from semantic_kernel import Kernel
+from semantic_kernel.agents import AgentGroupChat, ChatCompletionAgent
+from semantic_kernel.agents.strategies import (
+    KernelFunctionSelectionStrategy,
+    KernelFunctionTerminationStrategy,
+    SequentialSelectionStrategy,
+)
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
+from semantic_kernel.contents import AuthorRole, ChatHistory, ChatMessageContent
+from semantic_kernel.contents.streaming_chat_message_content import StreamingChatMessageContent
+from semantic_kernel.functions import KernelFunctionFromPrompt
+
+from speculative_group_chat import SpeculativeAgentGroupChat
+from step3_chat import ApprovalTerminationStrategy
+
+###################################################################
+# The following script benchmarks the cost of the selection and   #
+# termination strategies used in step3 and step4. The agents and  #
+# the strategy functions are backed by a scripted local stand-in  #
+# for the chat completion service, so every combination can be    #
+# compared on model calls, tokens, wall time and turns without    #
+# calling Azure OpenAI.                                           #
+#                                                                 #
+#   python benchmark_strategies.py                  # compare     #
+#   python benchmark_strategies.py --save-baseline  # new baseline#
+###################################################################
+
+REVIEWER_NAME = "ArtDirector"
+COPYWRITER_NAME = "CopyWriter"
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "benchmark_baseline.json")
+
+TERMINATION_PROMPT = """
+Determine if the copy has been approved.  If so, respond with a single word: yes
+
+History:
+{{$history}}
+"""
+
+SELECTION_PROMPT = f"""
+Determine which participant takes the next turn in a conversation based on the the most recent participant.
+State only the name of the participant to take the next turn.
+
+Choose only from these participants:
+- {REVIEWER_NAME}
+- {COPYWRITER_NAME}
+
+Always follow these rules when selecting the next participant:
+- After user input, it is {COPYWRITER_NAME}'s turn.
+- After {COPYWRITER_NAME} replies, it is {REVIEWER_NAME}'s turn.
+- After {REVIEWER_NAME} provides feedback, it is {COPYWRITER_NAME}'s turn.
+
+History:
+{{{{$history}}}}
+"""
+
+CHAT_TYPES = ("sequential", "speculative")
+SELECTION_STRATEGIES = ("sequential", "kernel_function")
+TERMINATION_STRATEGIES = ("keyword", "kernel_function")
+
+DRAFT_MARKER = "DRAFT"
+REVIEW_MARKER = "REVIEW"
+APPROVAL_MARKER = "##approved##"
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens as whitespace separated words, which is stable across runs and machines."""
+    return len(text.split())
+
+
+class ScriptedChatCompletion(ChatCompletionClientBase):
+    """A local stand-in for a chat completion service that answers from a script.
+
+    Latency is simulated as `latency` seconds until the first token plus `latency_per_token`
+    seconds per completion token. Every call is counted together with its prompt and completion tokens.
+    """
+
+    responder: Callable[[str], str]
+    latency: float = 0.1
+    latency_per_token: float = 0.002
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def _respond(self, chat_history: ChatHistory) -> str:
+        prompt = "\n".join(message.content or "" for message in chat_history.messages)
+        reply = self.responder(prompt)
+        self.calls += 1
+        self.prompt_tokens += count_tokens(prompt)
+        self.completion_tokens += count_tokens(reply)
+        return reply
+
+    async def _inner_get_chat_message_contents(
+        self, chat_history: ChatHistory, settings: PromptExecutionSettings
+    ) -> list[ChatMessageContent]:
+        reply = self._respond(chat_history)
+        await asyncio.sleep(self.latency + self.latency_per_token * count_tokens(reply))
+        return [ChatMessageContent(role=AuthorRole.ASSISTANT, content=reply, ai_model_id=self.ai_model_id)]
+
+    async def _inner_get_streaming_chat_message_contents(
+        self, chat_history: ChatHistory, settings: PromptExecutionSettings, function_invoke_attempt: int = 0
+    ) -> AsyncGenerator[list[StreamingChatMessageContent], Any]:
+        reply = self._respond(chat_history)
+        # The chunks join to exactly the reply and take the same total latency as the non-streamed one
+        words = reply.split(" ")
+        chunk_latency = self.latency_per_token * count_tokens(reply) / len(words)
+        await asyncio.sleep(self.latency)
+        for index, word in enumerate(words):
+            await asyncio.sleep(chunk_latency)
+            yield [
+                StreamingChatMessageContent(
+                    role=AuthorRole.ASSISTANT,
+                    content=word if index == len(words) - 1 else f"{word} ",
+                    choice_index=0,
+                    ai_model_id=self.ai_model_id,
+                )
+            ]
+
+
+def _writer(prompt: str) -> str:
+    draft = prompt.count(DRAFT_MARKER) + 1
+    return f"{DRAFT_MARKER} {draft}: Quiet power, zero excuses. The new line of electric cars goes further on less."
+
+
+def _reviewer(approve_after: int) -> Callable[[str], str]:
+    def respond(prompt: str) -> str:
+        if prompt.count(REVIEW_MARKER) + 1 >= approve_after:
+            return f"The copy is ready to print. {APPROVAL_MARKER}"
+        return f"{REVIEW_MARKER}: The second sentence explains what the first one already implies, tighten it."
+
+    return respond
+
+
+def _selector(prompt: str) -> str:
+    return REVIEWER_NAME if prompt.rfind(DRAFT_MARKER) > prompt.rfind(REVIEW_MARKER) else COPYWRITER_NAME
+
+
+def _terminator(prompt: str) -> str:
+    return "yes" if prompt.rfind(APPROVAL_MARKER) > prompt.rfind(DRAFT_MARKER) else "no"
+
+
+def _create_kernel(service: ScriptedChatCompletion) -> Kernel:
+    kernel = Kernel()
+    kernel.add_service(service)
+    return kernel
+
+
+async def run_scenario(
+    chat_type: str, selection: str, termination: str, approve_after: int, **latency: float
+) -> dict[str, Any]:
+    """Run the copywriting group chat once and collect its cost metrics."""
+    responders = {
+        "copywriter": _writer,
+        "artdirector": _reviewer(approve_after),
+        "selection": _selector,
+        "termination": _terminator,
+    }
+    services = {
+        service_id: ScriptedChatCompletion(
+            service_id=service_id, ai_model_id="scripted", responder=responder, **latency
+        )
+        for service_id, responder in responders.items()
+    }
+    agent_writer = ChatCompletionAgent(
+        service_id="copywriter", kernel=_create_kernel(services["copywriter"]), name=COPYWRITER_NAME
+    )
+    agent_reviewer = ChatCompletionAgent(
+        service_id="artdirector", kernel=_create_kernel(services["artdirector"]), name=REVIEWER_NAME
+    )
+
+    if selection == "sequential":
+        selection_strategy = SequentialSelectionStrategy()
+    else:
+        selection_strategy = KernelFunctionSelectionStrategy(
+            function=KernelFunctionFromPrompt(function_name="selection", prompt=SELECTION_PROMPT),
+            kernel=_create_kernel(services["selection"]),
+            result_parser=lambda result: str(result.value[0]) if result.value is not None else COPYWRITER_NAME,
+            agent_variable_name="agents",
+            history_variable_name="history",
+        )
+
+    if termination == "keyword":
+        termination_strategy = ApprovalTerminationStrategy(agents=[agent_reviewer], maximum_iterations=10)
+    else:
+        termination_strategy = KernelFunctionTerminationStrategy(
+            agents=[agent_reviewer],
+            function=KernelFunctionFromPrompt(function_name="termination", prompt=TERMINATION_PROMPT),
+            kernel=_create_kernel(services["termination"]),
+            result_parser=lambda result: str(result.value[0]).lower() == "yes",
+            history_variable_name="history",
+            maximum_iterations=10,
+        )
+
+    chat_options: dict[str, Any] = {}
+    if chat_type == "speculative":
+        chat_class = SpeculativeAgentGroupChat
+        # Count the speculative tokens like the service does, without downloading a tiktoken encoding
+        chat_options["token_counter"] = count_tokens
+    else:
+        chat_class = AgentGroupChat
+    chat = chat_class(
+        agents=[agent_writer, agent_reviewer],
+        termination_strategy=termination_strategy,
+        selection_strategy=selection_strategy,
+        **chat_options,
+    )
+    await chat.add_chat_message(
+        ChatMessageContent(role=AuthorRole.USER, content="A slogan for a new line of electric cars.")
+    )
+
+    start = time.perf_counter()
+    turns = 0
+    async for _ in chat.invoke():
+        turns += 1
+    wall_time = time.perf_counter() - start
+
+    return {
+        "model_calls": sum(service.calls for service in services.values()),
+        "prompt_tokens": sum(service.prompt_tokens for service in services.values()),
+        "completion_tokens": sum(service.completion_tokens for service in services.values()),
+        "wall_time": round(wall_time, 4),
+        "turns": turns,
+        "completed": chat.is_complete,
+        "calls_by_role": {role: service.calls for role, service in services.items()},
+    }
+
+
+def _print_report(results: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]] | None) -> None:
+    width = max(len(name) for name in results)
+    header = f"{'scenario':<{width}} {'calls':>6} {'prompt':>8} {'compl':>7} {'wall(s)':>8} {'turns':>6} {'done':>5}"
+    print(header)
+    print("-" * len(header))
+    for name, result in results.items():
+        print(
+            f"{name:<{width}} {result['model_calls']:>6} {result['prompt_tokens']:>8} {result['completion_tokens']:>7} "
+            f"{result['wall_time']:>8.3f} {result['turns']:>6} {str(result['completed']):>5}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous:
+            deltas = []
+            for metric in ("model_calls", "prompt_tokens", "completion_tokens", "wall_time", "turns"):
+                if previous[metric]:
+                    change = (result[metric] - previous[metric]) / previous[metric] * 100
+                    deltas.append(f"{metric} {change:+.1f}%")
+            print(f"{'  vs baseline':<{width}} {', '.join(deltas)}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the cost of agent group chat strategies")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Baseline JSON file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Save the results as the new baseline")
+    parser.add_argument(
+        "--approve-after", type=int, nargs="+", default=[1, 3], help="Reviews until the copy is approved"
+    )
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated seconds until the first token")
+    parser.add_argument("--latency-per-token", type=float, default=0.002, help="Simulated seconds per token")
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, Any]] = {}
+    for chat_type, selection, termination, approve_after in itertools.product(
+        CHAT_TYPES, SELECTION_STRATEGIES, TERMINATION_STRATEGIES, args.approve_after
+    ):
+        name = f"{chat_type}-chat/{selection}-selection/{termination}-termination/approve@{approve_after}"
+        results[name] = await run_scenario(
+            chat_type,
+            selection,
+            termination,
+            approve_after,
+            latency=args.latency,
+            latency_per_token=args.latency_per_token,
+        )
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    _print_report(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"# Baseline saved to {args.baseline}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,317 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import copy
+import json
+from array import array
+from collections.abc import Callable, Iterable, Iterator, MutableSequence
+from typing import Any, overload
+
+from pydantic import Field, SerializerFunctionWrapHandler, field_serializer
+
+from semantic_kernel.contents import AuthorRole, ChatHistory, ChatMessageContent
+
+###################################################################
+# A memory-compact ChatHistory for long-lived sessions. Messages  #
+# are stored as rows of parallel arrays (role, name, text offset  #
+# and length, token count) over one shared UTF-8 buffer; the      #
+# other fields of a message, when it has any, are kept as compact #
+# JSON in the same buffer. Message objects are only built when a  #
+# message is read, except for the most recent ones, which stay as #
+# objects since agents still change them right after adding them. #
+###################################################################
+
+_ROLES = list(AuthorRole)
+_ROLE_IDS = {role: index for index, role in enumerate(_ROLES)}
+
+# The serialized form of a message made of only a role, an optional name and a text
+_PLAIN_MESSAGE = {"metadata": {}, "content_type": "message", "items": [{"metadata": {}, "content_type": "text"}]}
+
+# The unused share of the buffer from which it is rewritten, after messages were replaced or removed
+_MAX_GARBAGE_RATIO = 0.5
+_MIN_GARBAGE_BYTES = 64 * 1024
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the tokens of a text, about 4 bytes of UTF-8 per token."""
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+class CompactMessageList(MutableSequence[ChatMessageContent]):
+    """A list of chat messages stored as arrays over a UTF-8 buffer.
+
+    Reading a stored message builds a new ChatMessageContent from its serialized form, equal to the message
+    restored by `ChatHistory.restore_chat_history` (the raw `inner_content` of the service response is not
+    kept, and the metadata values are plain JSON). Changes to a read message are therefore not stored: assign
+    it back to its index. The last `hot_messages` messages are kept as the objects that were added, so
+    agents and services can still update the latest messages in place.
+
+    Args:
+        messages: The initial messages.
+        hot_messages: The number of most recent messages kept as objects, default is 16.
+        token_counter: Counts the tokens of a message text, an estimate of 4 bytes per token by default.
+    """
+
+    def __init__(
+        self,
+        messages: Iterable[ChatMessageContent] = (),
+        hot_messages: int = 16,
+        token_counter: Callable[[str], int] | None = None,
+    ) -> None:
+        self.hot_messages = hot_messages
+        self.token_counter = token_counter or estimate_tokens
+        self._reset()
+        self.extend(messages)
+
+    def _reset(self) -> None:
+        self._buffer = bytearray()
+        self._garbage = 0
+        self._roles = array("B")
+        self._names = array("I")
+        self._offsets = array("Q")
+        self._text_lengths = array("I")
+        self._extra_lengths = array("I")
+        self._tokens = array("I")
+        self._name_ids: dict[str | None, int] = {None: 0}
+        self._name_list: list[str | None] = [None]
+        self._hot: list[ChatMessageContent] = []
+
+    # region Sequence
+
+    def __len__(self) -> int:
+        return len(self._roles) + len(self._hot)
+
+    @overload
+    def __getitem__(self, index: int) -> ChatMessageContent: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[ChatMessageContent]: ...
+
+    def __getitem__(self, index: int | slice) -> ChatMessageContent | list[ChatMessageContent]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        position = self._position(index)
+        stored = len(self._roles)
+        return self._hot[position - stored] if position >= stored else self._materialize(position)
+
+    def __setitem__(self, index: int | slice, value: Any) -> None:
+        if isinstance(index, slice):
+            messages = list(self)
+            messages[index] = value
+            self._reset()
+            self.extend(messages)
+            return
+        position = self._position(index)
+        stored = len(self._roles)
+        if position >= stored:
+            self._hot[position - stored] = value
+            return
+        self._garbage += self._text_lengths[position] + self._extra_lengths[position]
+        role, name, offset, text_length, extra_length, tokens = self._encode(value)
+        self._roles[position] = role
+        self._names[position] = name
+        self._offsets[position] = offset
+        self._text_lengths[position] = text_length
+        self._extra_lengths[position] = extra_length
+        self._tokens[position] = tokens
+        self._collect_garbage()
+
+    def __delitem__(self, index: int | slice) -> None:
+        if isinstance(index, slice):
+            for position in sorted(range(*index.indices(len(self))), reverse=True):
+                del self[position]
+            return
+        position = self._position(index)
+        stored = len(self._roles)
+        if position >= stored:
+            del self._hot[position - stored]
+            return
+        self._garbage += self._text_lengths[position] + self._extra_lengths[position]
+        for column in self._columns():
+            del column[position]
+        self._collect_garbage()
+
+    def insert(self, index: int, value: ChatMessageContent) -> None:
+        stored = len(self._roles)
+        position = max(0, min(len(self), index if index >= 0 else len(self) + index))
+        if position >= stored:
+            self._hot.insert(position - stored, value)
+            self._spill()
+            return
+        for column, field in zip(self._columns(), self._encode(value)):
+            column.insert(position, field)
+
+    def append(self, value: ChatMessageContent) -> None:
+        self._hot.append(value)
+        self._spill()
+
+    def clear(self) -> None:
+        self._reset()
+
+    def copy(self) -> list[ChatMessageContent]:
+        """The messages as a list, like `list.copy`."""
+        return list(self)
+
+    def __iter__(self) -> Iterator[ChatMessageContent]:
+        for position in range(len(self._roles)):
+            yield self._materialize(position)
+        yield from list(self._hot)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (CompactMessageList, list)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def __copy__(self) -> "CompactMessageList":
+        # The stored messages are values, copying the arrays and the buffer is enough
+        clone = CompactMessageList.__new__(CompactMessageList)
+        clone.__dict__.update(
+            {key: value if callable(value) else copy.copy(value) for key, value in self.__dict__.items()}
+        )
+        return clone
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "CompactMessageList":
+        clone = copy.copy(self)
+        clone._hot = copy.deepcopy(self._hot, memo)
+        return clone
+
+    # endregion
+
+    # region Compact storage
+
+    def token_count(self, index: int) -> int:
+        """The tokens of the text of a message, without reading the message."""
+        position = self._position(index)
+        stored = len(self._roles)
+        if position >= stored:
+            return self.token_counter(self._hot[position - stored].content or "")
+        return self._tokens[position]
+
+    @property
+    def total_tokens(self) -> int:
+        """The tokens of the texts of all the messages."""
+        return sum(self._tokens) + sum(self.token_count(index) for index in range(len(self._roles), len(self)))
+
+    def role(self, index: int) -> AuthorRole:
+        """The role of a message, without reading the message."""
+        position = self._position(index)
+        stored = len(self._roles)
+        return self._hot[position - stored].role if position >= stored else _ROLES[self._roles[position]]
+
+    def stored_bytes(self) -> int:
+        """The bytes used by the stored messages: the buffer and the arrays, not the hot message objects."""
+        return len(self._buffer) + sum(column.itemsize * len(column) for column in self._columns())
+
+    def _columns(self) -> tuple[array, ...]:
+        return (self._roles, self._names, self._offsets, self._text_lengths, self._extra_lengths, self._tokens)
+
+    def _position(self, index: int) -> int:
+        position = index + len(self) if index < 0 else index
+        if not 0 <= position < len(self):
+            raise IndexError("message index out of range")
+        return position
+
+    def _spill(self) -> None:
+        """Store the messages that are no longer among the most recent ones."""
+        while len(self._hot) > self.hot_messages:
+            for column, field in zip(self._columns(), self._encode(self._hot.pop(0))):
+                column.append(field)
+
+    def _encode(self, message: ChatMessageContent | dict[str, Any]) -> tuple[int, int, int, int, int, int]:
+        """Write a message to the buffer, the text as UTF-8 and the other fields as JSON unless they are defaults.
+
+        Returns:
+            The role id, the name id, the offset, the text length, the JSON length and the tokens of the row.
+        """
+        if isinstance(message, dict):
+            message = ChatMessageContent.model_validate(message)
+        data = message.model_dump(exclude_none=True, mode="json")
+        role = _ROLE_IDS[AuthorRole(data.pop("role"))]
+        name = data.pop("name", None)
+        items = data.get("items", [])
+        text = ""
+        if len(items) == 1 and items[0].get("content_type") == "text" and items[0].get("text"):
+            text = items[0].pop("text")
+        extras = "" if data == _PLAIN_MESSAGE else json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+        if (name_id := self._name_ids.get(name)) is None:
+            name_id = self._name_ids[name] = len(self._name_list)
+            self._name_list.append(name)
+        offset = len(self._buffer)
+        encoded_text, encoded_extras = text.encode("utf-8"), extras.encode("utf-8")
+        self._buffer += encoded_text
+        self._buffer += encoded_extras
+        return role, name_id, offset, len(encoded_text), len(encoded_extras), self.token_counter(text or extras)
+
+    def _materialize(self, position: int) -> ChatMessageContent:
+        offset = self._offsets[position]
+        text_end = offset + self._text_lengths[position]
+        extra_length = self._extra_lengths[position]
+        if extra_length:
+            data = json.loads(self._buffer[text_end : text_end + extra_length])
+        else:
+            data = copy.deepcopy(_PLAIN_MESSAGE)
+        data["role"] = _ROLES[self._roles[position]]
+        if (name := self._name_list[self._names[position]]) is not None:
+            data["name"] = name
+        if text_end > offset:
+            data["items"][0]["text"] = self._buffer[offset:text_end].decode("utf-8")
+        return ChatMessageContent.model_validate(data)
+
+    def _collect_garbage(self) -> None:
+        """Rewrite the buffer without the bytes of replaced and removed messages once they are a large share."""
+        if self._garbage < max(_MIN_GARBAGE_BYTES, len(self._buffer) * _MAX_GARBAGE_RATIO):
+            return
+        buffer = bytearray()
+        for position in range(len(self._roles)):
+            offset = self._offsets[position]
+            self._offsets[position] = len(buffer)
+            buffer += self._buffer[offset : offset + self._text_lengths[position] + self._extra_lengths[position]]
+        self._buffer = buffer
+        self._garbage = 0
+
+    # endregion
+
+
+class CompactChatHistory(ChatHistory):
+    """A ChatHistory keeping its messages in a CompactMessageList, for many long-lived sessions.
+
+    It is used like a ChatHistory, by agents, group chats and services; assigning `messages` stores the new
+    messages compactly too. Messages read from it, other than the most recent ones, are rebuilt copies, see
+    CompactMessageList.
+
+    Args:
+        hot_messages: The number of most recent messages kept as objects, default is 16.
+        token_counter: Counts the tokens of a message text, an estimate of 4 bytes per token by default.
+    """
+
+    hot_messages: int = Field(default=16, exclude=True)
+    token_counter: Callable[[str], int] | None = Field(default=None, exclude=True)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._compact_messages()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name == "messages":
+            self._compact_messages()
+
+    @field_serializer("messages", mode="wrap")
+    def _serialize_messages(self, messages: Any, handler: SerializerFunctionWrapHandler) -> Any:
+        return handler(list(messages))
+
+    @property
+    def total_tokens(self) -> int:
+        """The tokens of the texts of all the messages."""
+        return self.messages.total_tokens
+
+    def _compact_messages(self) -> None:
+        if not isinstance(self.messages, CompactMessageList):
+            # Set as a plain attribute, the validation of the field would turn it back into a list
+            messages = CompactMessageList(
+                self.messages, hot_messages=self.hot_messages, token_counter=self.token_counter
+            )
+            object.__setattr__(self, "messages", messages)
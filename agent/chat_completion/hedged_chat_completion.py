@@ -0,0 +1,191 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import logging
+import math
+import sys
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from typing import Any, ClassVar
+
+if sys.version < "3.12":
+    from typing_extensions import override  # pragma: no cover
+else:
+    from typing import override  # type: ignore # pragma: no cover
+
+from pydantic import Field, PrivateAttr
+
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
+from semantic_kernel.contents import ChatHistory, ChatMessageContent, StreamingChatMessageContent
+
+###################################################################
+# A chat completion service that hedges slow requests. When the   #
+# first token of a request has not arrived by a deadline taken    #
+# from the recent first-token latencies, a duplicate request is   #
+# sent to the same or an alternate deployment. Whichever answers  #
+# first is streamed, the other one is cancelled. A budget caps    #
+# the duplicates at a percentage of the requests.                 #
+###################################################################
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class HedgedChatCompletion(ChatCompletionClientBase):
+    """A chat completion service that sends a duplicate request when the first token is late.
+
+    The deadline is the `percentile` of the time to first token of the last `window` requests, within
+    `min_delay` and `max_delay`, and `initial_delay` until `min_samples` requests were observed. Each
+    request earns `budget_percent` / 100 hedge credits and each hedge spends one, so the duplicates stay
+    under `budget_percent` of the requests; up to `max_burst` credits are saved for bursts of slow requests.
+
+    The first request goes to the first service, the hedge to the next one, which may be the same
+    service, i.e. a duplicate request to the same deployment. Function calling is handled once here,
+    around the hedged requests, so the services should be of the same kind.
+
+    Args:
+        services: The services, the first one is the primary, the second one (if any) receives the hedges.
+        percentile: The percentile of the first-token latency used as the hedging deadline, default is 95.
+        budget_percent: The maximum extra requests as a percentage of the requests, default is 10.
+        initial_delay: The deadline in seconds before enough latencies were observed, default is 2.
+        min_delay: The minimum deadline in seconds, default is 0.2.
+        max_delay: The maximum deadline in seconds, default is 10.
+        window: The number of recent latencies the percentile is computed on, default is 200.
+        min_samples: The number of latencies needed before the percentile is used, default is 20.
+        max_burst: The maximum number of saved hedge credits, default is 5.
+    """
+
+    services: list[ChatCompletionClientBase]
+    percentile: float = Field(default=95.0, gt=0.0, lt=100.0)
+    budget_percent: float = Field(default=10.0, ge=0.0)
+    initial_delay: float = 2.0
+    min_delay: float = 0.2
+    max_delay: float = 10.0
+    window: int = 200
+    min_samples: int = 20
+    max_burst: float = 5.0
+    requests: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+
+    SUPPORTS_FUNCTION_CALLING: ClassVar[bool] = True
+
+    _latencies: deque[float] = PrivateAttr()
+    _credits: float = PrivateAttr(default=0.0)
+
+    def __init__(self, services: list[ChatCompletionClientBase], **kwargs: Any) -> None:
+        if not services:
+            raise ValueError("A hedged service needs at least one service")
+        kwargs.setdefault("ai_model_id", services[0].ai_model_id)
+        super().__init__(services=services, **kwargs)
+        self._latencies = deque(maxlen=self.window)
+
+    @property
+    def hedge_deadline(self) -> float:
+        """The seconds to wait for the first token before hedging."""
+        if len(self._latencies) < self.min_samples:
+            return self.initial_delay
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, math.ceil(self.percentile / 100 * len(ordered)) - 1)
+        return min(self.max_delay, max(self.min_delay, ordered[index]))
+
+    @override
+    def get_prompt_execution_settings_class(self) -> type[PromptExecutionSettings]:
+        return self.services[0].get_prompt_execution_settings_class()
+
+    @override
+    def _verify_function_choice_settings(self, settings: PromptExecutionSettings) -> None:
+        self.services[0]._verify_function_choice_settings(settings)
+
+    @override
+    def _update_function_choice_settings_callback(self) -> Callable[..., None]:
+        return self.services[0]._update_function_choice_settings_callback()
+
+    @override
+    def _reset_function_choice_settings(self, settings: PromptExecutionSettings) -> None:
+        self.services[0]._reset_function_choice_settings(settings)
+
+    @override
+    async def _inner_get_chat_message_contents(
+        self, chat_history: ChatHistory, settings: PromptExecutionSettings
+    ) -> list[ChatMessageContent]:
+        def request(service: ChatCompletionClientBase) -> Awaitable[list[ChatMessageContent]]:
+            return service._inner_get_chat_message_contents(chat_history, self._copy_settings(settings))
+
+        _, result = await self._race(request)
+        return result
+
+    @override
+    async def _inner_get_streaming_chat_message_contents(
+        self, chat_history: ChatHistory, settings: PromptExecutionSettings, function_invoke_attempt: int = 0
+    ) -> AsyncGenerator[list[StreamingChatMessageContent], Any]:
+        streams: list[AsyncGenerator[list[StreamingChatMessageContent], Any]] = []
+
+        async def first_chunk(service: ChatCompletionClientBase) -> list[StreamingChatMessageContent] | None:
+            stream = service._inner_get_streaming_chat_message_contents(
+                chat_history, self._copy_settings(settings), function_invoke_attempt
+            )
+            streams.append(stream)
+            return await anext(stream, None)
+
+        try:
+            winner, first = await self._race(first_chunk)
+            if first is None:
+                return
+            yield first
+            async for chunks in streams[winner]:
+                yield chunks
+        finally:
+            for stream in streams:
+                await stream.aclose()
+
+    async def _race(self, request: Callable[[ChatCompletionClientBase], Awaitable[Any]]) -> tuple[int, Any]:
+        """Run a request on the primary service, and a hedge once the deadline passes.
+
+        Args:
+            request: Sends the request to a service and returns its first response.
+
+        Returns:
+            The index of the request that answered first (0 for the primary, 1 for the hedge) and its response.
+        """
+        self.requests += 1
+        self._credits = min(self.max_burst, self._credits + self.budget_percent / 100)
+        start = time.monotonic()
+        tasks = [asyncio.create_task(request(self.services[0]))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_deadline)
+            if not done and self._credits >= 1:
+                self._credits -= 1
+                self.hedges += 1
+                logger.info(f"No first token after {time.monotonic() - start:.2f}s, sending a hedged request.")
+                tasks.append(asyncio.create_task(request(self.services[1 % len(self.services)])))
+
+            pending = set(tasks)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=tasks.index):
+                    if task.exception() is not None:
+                        # The other request may still answer
+                        error = error or task.exception()
+                        continue
+                    winner = tasks.index(task)
+                    # The primary latency is only known if it won, otherwise the wait so far is a lower bound
+                    self._latencies.append(time.monotonic() - start)
+                    if winner == 1:
+                        self.hedge_wins += 1
+                    return winner, task.result()
+            assert error is not None  # nosec
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _copy_settings(self, settings: PromptExecutionSettings) -> PromptExecutionSettings:
+        """Copy the settings for one request, the service fills in its own model id and the messages."""
+        request_settings = settings.model_copy(deep=True)
+        if hasattr(request_settings, "ai_model_id"):
+            request_settings.ai_model_id = None
+        return request_settings
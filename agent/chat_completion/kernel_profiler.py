@@ -0,0 +1,305 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import atexit
+import contextvars
+import functools
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from semantic_kernel import Kernel
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.filters.filter_types import FilterTypes
+
+###################################################################
+# A profiler for kernels. Function invocations, prompt renders,   #
+# auto-invoked tool calls and chat completion service calls are   #
+# timed as nested frames, with the tokens reported by the service #
+# and optionally the memory allocated. The result is exported as  #
+# collapsed stacks (flamegraph.pl, speedscope) and as a summary   #
+# table per frame. Enable it with `--profile` or SK_PROFILE=1.    #
+###################################################################
+
+PROFILE_FLAG = "--profile"
+PROFILE_ENVIRONMENT_VARIABLE = "SK_PROFILE"
+
+
+@dataclass
+class _Frame:
+    """A running frame, the time of its children is subtracted from its own self time."""
+
+    path: tuple[str, ...]
+    start: float
+    allocated_at_start: int
+    child_seconds: float = 0.0
+
+
+@dataclass
+class FrameStats:
+    """The aggregated measurements of one stack of frames.
+
+    Args:
+        calls: The number of times the frame ran.
+        total_seconds: The wall time of the frame, including its children.
+        self_seconds: The wall time of the frame, excluding its children.
+        max_seconds: The longest run of the frame.
+        prompt_tokens: The prompt tokens reported by the service calls of the frame.
+        completion_tokens: The completion tokens reported by the service calls of the frame.
+        allocated_bytes: The net memory allocated during the frame, when allocations are traced.
+    """
+
+    calls: int = 0
+    total_seconds: float = 0.0
+    self_seconds: float = 0.0
+    max_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    allocated_bytes: int = 0
+
+    def add(self, other: "FrameStats") -> None:
+        self.calls += other.calls
+        self.total_seconds += other.total_seconds
+        self.self_seconds += other.self_seconds
+        self.max_seconds = max(self.max_seconds, other.max_seconds)
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.allocated_bytes += other.allocated_bytes
+
+
+class KernelProfiler:
+    """Records nested timings of the work done by kernels.
+
+    Frames nest across tasks: a tool call started by the auto function calling loop is recorded
+    under the function that called the model. Streamed service calls are recorded from the request
+    to the last chunk. With concurrent children (e.g. parallel tool calls), the self time of the
+    parent is clamped at zero, and the allocations are a net, process-wide measure.
+
+    Args:
+        trace_allocations: Whether to trace memory allocations with tracemalloc, which slows the process down.
+    """
+
+    def __init__(self, trace_allocations: bool = False) -> None:
+        self.trace_allocations = trace_allocations
+        self.stacks: dict[tuple[str, ...], FrameStats] = defaultdict(FrameStats)
+        self._current: contextvars.ContextVar[_Frame | None] = contextvars.ContextVar("kernel_profiler_frame")
+        self._kernels: set[int] = set()
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def register(self, kernel: Kernel) -> Kernel:
+        """Add the profiling filters to a kernel and instrument its chat completion services.
+
+        Services added to the kernel afterwards are not instrumented, register the kernel once it is configured.
+
+        Args:
+            kernel: The kernel.
+
+        Returns:
+            The kernel.
+        """
+        if id(kernel) in self._kernels:
+            return kernel
+        self._kernels.add(id(kernel))
+        kernel.add_filter(FilterTypes.FUNCTION_INVOCATION, self._filter("function"))
+        kernel.add_filter(FilterTypes.PROMPT_RENDERING, self._filter("render"))
+        kernel.add_filter(FilterTypes.AUTO_FUNCTION_INVOCATION, self._filter("tool"))
+        for service in kernel.services.values():
+            if isinstance(service, ChatCompletionClientBase):
+                self._instrument(service)
+        return kernel
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[FrameStats]:
+        """Record a frame around a block of code, e.g. a history reduction.
+
+        Args:
+            name: The frame name.
+
+        Yields:
+            The stats the measurements are added to, e.g. to add token counts.
+        """
+        parent = self._current.get(None)
+        frame = self._start(name, parent)
+        token = self._current.set(frame)
+        extra = FrameStats()
+        try:
+            yield extra
+        finally:
+            self._current.reset(token)
+            self._finish(frame, parent, extra)
+
+    def collapsed_stacks(self) -> list[str]:
+        """The self time of every stack in microseconds, in the collapsed format of flamegraph.pl."""
+        return [
+            f"{';'.join(name.replace(';', ',') for name in path)} {round(stats.self_seconds * 1_000_000)}"
+            for path, stats in sorted(self.stacks.items())
+        ]
+
+    def summary(self) -> dict[str, FrameStats]:
+        """The measurements per frame name, over all the stacks the frame appears in."""
+        per_name: dict[str, FrameStats] = defaultdict(FrameStats)
+        for path, stats in self.stacks.items():
+            per_name[path[-1]].add(stats)
+        return dict(per_name)
+
+    def summary_table(self) -> str:
+        """The per-frame summary as a text table, slowest total first."""
+        header = f"{'frame':<48} {'calls':>6} {'total ms':>10} {'self ms':>10} {'mean ms':>9} {'max ms':>9}"
+        header += f" {'prompt tok':>10} {'compl tok':>9}"
+        if self.trace_allocations:
+            header += f" {'alloc KiB':>10}"
+        lines = [header, "-" * len(header)]
+        for name, stats in sorted(self.summary().items(), key=lambda item: -item[1].total_seconds):
+            line = (
+                f"{name[:48]:<48} {stats.calls:>6}"
+                f" {stats.total_seconds * 1000:>10.1f} {stats.self_seconds * 1000:>10.1f}"
+                f" {stats.total_seconds * 1000 / stats.calls:>9.1f} {stats.max_seconds * 1000:>9.1f}"
+                f" {stats.prompt_tokens:>10} {stats.completion_tokens:>9}"
+            )
+            if self.trace_allocations:
+                line += f" {stats.allocated_bytes / 1024:>10.1f}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def write(self, prefix: str | Path = "profile") -> tuple[Path, Path]:
+        """Write the collapsed stacks to `<prefix>.folded` and the summary table to `<prefix>.txt`.
+
+        Args:
+            prefix: The path of the files without extension.
+
+        Returns:
+            The paths of the two files.
+        """
+        folded, table = Path(f"{prefix}.folded"), Path(f"{prefix}.txt")
+        folded.write_text("\n".join(self.collapsed_stacks()) + "\n", encoding="utf-8")
+        table.write_text(self.summary_table() + "\n", encoding="utf-8")
+        return folded, table
+
+    def reset(self) -> None:
+        """Drop the measurements."""
+        self.stacks.clear()
+
+    def _filter(self, kind: str) -> Callable[[Any, Callable[[Any], Awaitable[None]]], Awaitable[None]]:
+        async def profile(context: Any, next: Callable[[Any], Awaitable[None]]) -> None:
+            function = context.function
+            name = f"{function.plugin_name}-{function.name}" if function.plugin_name else function.name
+            with self.measure(f"{kind}:{name}"):
+                await next(context)
+
+        return profile
+
+    def _instrument(self, service: ChatCompletionClientBase) -> None:
+        """Wrap the requests of a service, the auto function calling loop around them stays outside the frame."""
+        if getattr(service, "__kernel_profiler__", None) is self:
+            return
+        name = f"service:{service.service_id or service.ai_model_id}"
+        inner = service._inner_get_chat_message_contents
+        inner_streaming = service._inner_get_streaming_chat_message_contents
+        prepare_history = service._prepare_chat_history_for_request
+
+        @functools.wraps(inner)
+        async def get_chat_message_contents(*args: Any, **kwargs: Any) -> Any:
+            with self.measure(name) as stats:
+                result = await inner(*args, **kwargs)
+                for message in result[:1]:
+                    _add_usage(stats, message.metadata.get("usage"))
+                return result
+
+        @functools.wraps(inner_streaming)
+        async def get_streaming_chat_message_contents(*args: Any, **kwargs: Any) -> AsyncGenerator[Any, Any]:
+            # A frame cannot be made current across the yields of a generator, it is recorded without children
+            parent = self._current.get(None)
+            frame = self._start(f"{name} (stream)", parent)
+            stats = FrameStats()
+            try:
+                async for messages in inner_streaming(*args, **kwargs):
+                    for message in messages[:1]:
+                        _add_usage(stats, message.metadata.get("usage"))
+                    yield messages
+            finally:
+                self._finish(frame, parent, stats)
+
+        @functools.wraps(prepare_history)
+        def prepare_chat_history_for_request(*args: Any, **kwargs: Any) -> Any:
+            with self.measure("history:prepare"):
+                return prepare_history(*args, **kwargs)
+
+        # The services are pydantic models, set the wrappers as plain instance attributes
+        object.__setattr__(service, "_inner_get_chat_message_contents", get_chat_message_contents)
+        object.__setattr__(service, "_inner_get_streaming_chat_message_contents", get_streaming_chat_message_contents)
+        object.__setattr__(service, "_prepare_chat_history_for_request", prepare_chat_history_for_request)
+        object.__setattr__(service, "__kernel_profiler__", self)
+
+    def _start(self, name: str, parent: _Frame | None) -> _Frame:
+        path = (*parent.path, name) if parent else (name,)
+        return _Frame(path=path, start=time.perf_counter(), allocated_at_start=self._allocated())
+
+    def _finish(self, frame: _Frame, parent: _Frame | None, extra: FrameStats) -> None:
+        duration = time.perf_counter() - frame.start
+        if parent is not None:
+            parent.child_seconds += duration
+        stats = self.stacks[frame.path]
+        stats.calls += 1
+        stats.total_seconds += duration
+        stats.self_seconds += max(0.0, duration - frame.child_seconds)
+        stats.max_seconds = max(stats.max_seconds, duration)
+        stats.prompt_tokens += extra.prompt_tokens
+        stats.completion_tokens += extra.completion_tokens
+        if self.trace_allocations:
+            stats.allocated_bytes += self._allocated() - frame.allocated_at_start
+
+    def _allocated(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if self.trace_allocations else 0
+
+
+def _add_usage(stats: FrameStats, usage: Any) -> None:
+    if usage is not None:
+        stats.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+        stats.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+
+def profiling_enabled(argv: list[str] | None = None) -> bool:
+    """Whether profiling was requested with the --profile flag or the SK_PROFILE environment variable."""
+    argv = sys.argv if argv is None else argv
+    return PROFILE_FLAG in argv or os.getenv(PROFILE_ENVIRONMENT_VARIABLE, "").lower() in ("1", "true", "yes", "alloc")
+
+
+_profiler: KernelProfiler | None = None
+
+
+def profile_kernel(kernel: Kernel, prefix: str | None = None) -> Kernel:
+    """Register the process-wide profiler on a kernel if profiling is enabled, a no-op otherwise.
+
+    The profile is printed and written to `<prefix>.folded` and `<prefix>.txt` when the process exits. The
+    prefix defaults to SK_PROFILE_OUTPUT, or "profile". SK_PROFILE=alloc also traces memory allocations.
+
+    Args:
+        kernel: The kernel, once its services are added.
+        prefix: The path of the profile files without extension.
+
+    Returns:
+        The kernel.
+    """
+    global _profiler
+    if not profiling_enabled():
+        return kernel
+    if _profiler is None:
+        _profiler = KernelProfiler(trace_allocations=os.getenv(PROFILE_ENVIRONMENT_VARIABLE, "").lower() == "alloc")
+        output = prefix or os.getenv("SK_PROFILE_OUTPUT", "profile")
+        atexit.register(_report, _profiler, output)
+    return _profiler.register(kernel)
+
+
+def _report(profiler: KernelProfiler, prefix: str) -> None:
+    if not profiler.stacks:
+        return
+    folded, table = profiler.write(prefix)
+    print(profiler.summary_table(), file=sys.stderr)
+    print(f"Profile written to {folded} (flamegraph.pl, speedscope) and {table}", file=sys.stderr)
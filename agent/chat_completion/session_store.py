@@ -0,0 +1,265 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import atexit
+import json
+import logging
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from pydantic import PrivateAttr
+
+from semantic_kernel.contents import ChatHistory, ChatMessageContent
+
+###################################################################
+# A durable store for chat sessions. Every message added to a     #
+# session's ChatHistory is appended to a SQLite log (WAL mode) by #
+# a background writer thread, and the log of a session is folded  #
+# into a snapshot every `snapshot_every` messages so loading it   #
+# reads one snapshot and a short tail. Only recently active       #
+# sessions stay in memory, the others are loaded again when their #
+# next message arrives.                                           #
+###################################################################
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id);
+CREATE TABLE IF NOT EXISTS snapshots (
+    session_id TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL,
+    messages TEXT NOT NULL
+);
+"""
+
+_CLOSE = object()
+
+
+class PersistentChatHistory(ChatHistory):
+    """A ChatHistory that appends every added message to a session store.
+
+    Args:
+        session_id: The id of the session in the store.
+    """
+
+    session_id: str
+
+    _store: "SessionStore | None" = PrivateAttr(default=None)
+
+    def add_message(
+        self,
+        message: ChatMessageContent | dict[str, Any],
+        encoding: str | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        """Add a message to the history and append it to the store."""
+        super().add_message(message, encoding=encoding, metadata=metadata)
+        if self._store is not None:
+            self._store.append(self.session_id, self.messages[-1])
+
+
+class SessionStore:
+    """An append-only SQLite store of chat sessions with lazy loading.
+
+    Writes never block the event loop: messages are serialized on the caller's thread and written
+    in batches by a background thread. Loads are queued behind the pending writes, so a session
+    evicted from memory and loaded again right away still sees all its messages.
+
+    Args:
+        path: The SQLite database file.
+        snapshot_every: The number of appended messages after which a session's log is snapshotted, default is 50.
+        max_resident: The number of sessions kept in memory, default is 256.
+        history_class: The class of the loaded histories, a PersistentChatHistory subclass.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        snapshot_every: int = 50,
+        max_resident: int = 256,
+        history_class: type[PersistentChatHistory] = PersistentChatHistory,
+    ) -> None:
+        self.path = Path(path)
+        self.snapshot_every = snapshot_every
+        self.max_resident = max_resident
+        self.history_class = history_class
+        self.loads = 0
+        self._resident: OrderedDict[str, PersistentChatHistory] = OrderedDict()
+        self._loading: dict[str, asyncio.Future[PersistentChatHistory]] = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._unsnapshotted: dict[str, int] = {}
+        self._connection = self._connect()
+        self._writer = threading.Thread(target=self._run_writer, name="session-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    async def get(self, session_id: str) -> PersistentChatHistory:
+        """Get the history of a session, from memory or from disk if it is not resident.
+
+        Args:
+            session_id: The session id.
+
+        Returns:
+            The history, empty for a new session. Messages added to it are persisted.
+        """
+        if (history := self._resident.get(session_id)) is not None:
+            self._resident.move_to_end(session_id)
+            return history
+        if (loading := self._loading.get(session_id)) is not None:
+            return await asyncio.shield(loading)
+
+        future: asyncio.Future[PersistentChatHistory] = asyncio.get_running_loop().create_future()
+        self._loading[session_id] = future
+        try:
+            self._queue.put(("load", session_id, future, asyncio.get_running_loop()))
+            history = await asyncio.shield(future)
+        finally:
+            del self._loading[session_id]
+        history._store = self
+        self.loads += 1
+        self._resident[session_id] = history
+        while len(self._resident) > self.max_resident:
+            self._resident.popitem(last=False)
+        return history
+
+    def append(self, session_id: str, message: ChatMessageContent) -> None:
+        """Queue a message to be appended to the log of a session.
+
+        Args:
+            session_id: The session id.
+            message: The message.
+        """
+        self._queue.put(("append", session_id, message.model_dump_json(exclude_none=True)))
+
+    def evict(self, session_id: str) -> None:
+        """Drop a session from memory, e.g. when its chat ends. It is loaded again on its next message."""
+        self._resident.pop(session_id, None)
+
+    async def flush(self) -> None:
+        """Wait until the queued messages are written."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put(("flush", None, future, asyncio.get_running_loop()))
+        await future
+
+    def close(self) -> None:
+        """Write the queued messages and stop the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(_CLOSE)
+            self._writer.join()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode a commit is durable against a process crash without an fsync per transaction
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def _run_writer(self) -> None:
+        """Apply the queued operations in order, batching consecutive appends in one transaction."""
+        closing = False
+        while not closing:
+            operations = [self._queue.get()]
+            while not self._queue.empty() and len(operations) < 500:
+                operations.append(self._queue.get_nowait())
+            appends: list[tuple[str, str]] = []
+            for operation in operations:
+                if operation is _CLOSE:
+                    closing = True
+                    continue
+                if operation[0] == "append":
+                    appends.append((operation[1], operation[2]))
+                    continue
+                # Reads and flushes see every append queued before them
+                self._write(appends)
+                appends = []
+                _, session_id, future, loop = operation
+                try:
+                    result = self._load(session_id) if operation[0] == "load" else None
+                except Exception as exc:
+                    loop.call_soon_threadsafe(_set_exception, future, exc)
+                else:
+                    loop.call_soon_threadsafe(_set_result, future, result)
+            self._write(appends)
+        self._connection.close()
+
+    def _write(self, appends: list[tuple[str, str]]) -> None:
+        if not appends:
+            return
+        try:
+            with self._transaction():
+                self._connection.executemany("INSERT INTO messages (session_id, message) VALUES (?, ?)", appends)
+            for session_id in dict.fromkeys(session_id for session_id, _ in appends):
+                if session_id not in self._unsnapshotted:
+                    self._unsnapshotted[session_id] = self._connection.execute(
+                        "SELECT COUNT(*) FROM messages WHERE session_id = ?", (session_id,)
+                    ).fetchone()[0]
+                else:
+                    self._unsnapshotted[session_id] += sum(1 for appended, _ in appends if appended == session_id)
+                if self._unsnapshotted[session_id] >= self.snapshot_every:
+                    self._snapshot(session_id)
+        except sqlite3.Error:
+            logger.exception("Failed to write chat session messages.")
+
+    def _snapshot(self, session_id: str) -> None:
+        """Fold the log of a session into its snapshot and drop the folded messages."""
+        with self._transaction():
+            last_id, messages = self._read(session_id)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO snapshots (session_id, last_id, messages) VALUES (?, ?, ?)",
+                (session_id, last_id, json.dumps(messages)),
+            )
+            self._connection.execute("DELETE FROM messages WHERE session_id = ? AND id <= ?", (session_id, last_id))
+        self._unsnapshotted[session_id] = 0
+
+    def _read(self, session_id: str) -> tuple[int, list[str]]:
+        """Read the snapshot and the log tail of a session as serialized messages."""
+        row = self._connection.execute(
+            "SELECT last_id, messages FROM snapshots WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        last_id, messages = (row[0], json.loads(row[1])) if row else (0, [])
+        for message_id, message in self._connection.execute(
+            "SELECT id, message FROM messages WHERE session_id = ? AND id > ? ORDER BY id", (session_id, last_id)
+        ):
+            last_id = message_id
+            messages.append(message)
+        return last_id, messages
+
+    def _load(self, session_id: str) -> PersistentChatHistory:
+        _, messages = self._read(session_id)
+        return self.history_class(
+            session_id=session_id, messages=[ChatMessageContent.model_validate_json(message) for message in messages]
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one transaction, rolled back on error."""
+        self._connection.execute("BEGIN")
+        try:
+            yield self._connection
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+
+def _set_result(future: asyncio.Future, result: Any) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_exception(future: asyncio.Future, exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
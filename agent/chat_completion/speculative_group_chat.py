@@ -0,0 +1,309 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import logging
+from collections.abc import AsyncIterable, Callable
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+import tiktoken
+from pydantic import Field
+
+from semantic_kernel.agents import Agent, AgentGroupChat
+from semantic_kernel.agents.channels.agent_channel import AgentChannel
+from semantic_kernel.agents.channels.chat_history_channel import ChatHistoryChannel
+from semantic_kernel.agents.group_chat.broadcast_queue import ChannelReference
+from semantic_kernel.agents.strategies.selection.selection_strategy import SelectionStrategy
+from semantic_kernel.agents.strategies.termination.termination_strategy import TerminationStrategy
+from semantic_kernel.contents import ChatHistory, ChatMessageContent, StreamingChatMessageContent
+from semantic_kernel.contents.function_call_content import FunctionCallContent
+from semantic_kernel.contents.function_result_content import FunctionResultContent
+from semantic_kernel.contents.history_reducer.chat_history_reducer import ChatHistoryReducer
+from semantic_kernel.exceptions.agent_exceptions import AgentChatException
+
+###################################################################
+# An AgentGroupChat that starts the next agent's completion while #
+# the termination strategy is still deciding whether the chat is  #
+# over. If the chat continues, the speculative turn is committed  #
+# and one termination round trip is saved. If the chat ends, the  #
+# speculative turn is cancelled and its output is dropped.        #
+###################################################################
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=32)
+def _get_encoding(model_id: str) -> tiktoken.Encoding:
+    """The tiktoken encoding of the model that streamed a chunk, o200k_base for unknown names."""
+    try:
+        return tiktoken.encoding_for_model(model_id)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+class SpeculativeAgentGroupChat(AgentGroupChat):
+    """An agent group chat that overlaps the termination decision with the next agent turn.
+
+    Only agents backed by a ChatHistoryChannel (e.g. ChatCompletionAgent) are run speculatively,
+    because their turn can be computed on a private copy of the history. Other agents fall back
+    to the regular, sequential behavior.
+
+    A speculative turn never runs tools before it is confirmed: when the model asks for a function
+    call, the turn waits for the termination decision before the auto-invoked functions run, so a
+    discarded turn has no side effects beyond the model request itself.
+
+    An optional `history_reducer` is applied to each agent's channel before the agent runs, so
+    long chats do not resend the whole transcript on every turn.
+    """
+
+    speculative: bool = True
+    max_speculative_tokens: int = 256
+    token_counter: Callable[[str], int] | None = Field(default=None, exclude=True)
+    history_reducer: ChatHistoryReducer | None = None
+    speculative_turns: int = 0
+    committed_turns: int = 0
+    discarded_turns: int = 0
+    wasted_tokens: int = 0
+
+    def __init__(
+        self,
+        agents: list[Agent] | None = None,
+        termination_strategy: TerminationStrategy | None = None,
+        selection_strategy: SelectionStrategy | None = None,
+        chat_history: ChatHistory | None = None,
+        speculative: bool = True,
+        max_speculative_tokens: int = 256,
+        token_counter: Callable[[str], int] | None = None,
+        history_reducer: ChatHistoryReducer | None = None,
+    ) -> None:
+        """Initialize a new instance of SpeculativeAgentGroupChat.
+
+        Args:
+            agents: The agents to add to the group chat.
+            termination_strategy: The termination strategy to use.
+            selection_strategy: The selection strategy
+            chat_history: The chat history.
+            speculative: Whether to start the next turn while termination is being evaluated.
+            max_speculative_tokens: The maximum number of completion tokens a speculative turn may
+                produce before the termination decision is known. Beyond it the turn is abandoned.
+            token_counter: A custom token counter, overrides the tiktoken based counting for the model
+                of each streamed chunk.
+            history_reducer: A reducer applied to each agent's channel history before the agent is invoked.
+                The group chat history itself is never reduced.
+        """
+        super().__init__(
+            agents=agents,
+            termination_strategy=termination_strategy,
+            selection_strategy=selection_strategy,
+            chat_history=chat_history,
+        )
+        self.speculative = speculative
+        self.max_speculative_tokens = max_speculative_tokens
+        self.token_counter = token_counter
+        self.history_reducer = history_reducer
+
+    async def invoke(self, agent: Agent | None = None, is_joining: bool = True) -> AsyncIterable[ChatMessageContent]:
+        """Invoke the agent chat asynchronously, speculating on the next turn when possible.
+
+        Args:
+            agent: The agent to invoke. If provided, a single turn is run without speculation.
+            is_joining: Controls whether the agent joins the chat. Defaults to True.
+
+        Yields:
+            The chat message.
+        """
+        if agent is not None or not self.speculative:
+            async for message in super().invoke(agent, is_joining):
+                yield message
+            return
+
+        if not self.agents:
+            raise AgentChatException("No agents are available")
+
+        if self.is_complete:
+            if not self.termination_strategy.automatic_reset:
+                raise AgentChatException("Chat is already complete")
+
+            self.is_complete = False
+
+        maximum_iterations = self.termination_strategy.maximum_iterations
+        speculation: _SpeculativeTurn | None = None
+
+        for iteration in range(maximum_iterations):
+            if speculation is not None:
+                await speculation.task
+                selected_agent = speculation.agent
+                for message in await self._commit_turn(speculation):
+                    yield message
+            else:
+                selected_agent = await self._select_agent()
+                async for message in super().invoke_agent(selected_agent):
+                    yield message
+
+            if iteration == maximum_iterations - 1:
+                self.is_complete = await self.termination_strategy.should_terminate(
+                    selected_agent, self.history.messages
+                )
+                break
+
+            speculation = _SpeculativeTurn(selection_state=self._capture_selection_state())
+            speculation.task = asyncio.create_task(self._speculate_turn(speculation))
+
+            try:
+                self.is_complete = await self.termination_strategy.should_terminate(
+                    selected_agent, self.history.messages
+                )
+            except BaseException:
+                await self._discard_speculation(speculation)
+                raise
+
+            if self.is_complete:
+                await self._discard_speculation(speculation)
+                break
+
+            speculation.decided.set()
+
+    async def _get_or_create_channel(self, agent: Agent) -> AgentChannel:
+        """Get or create a channel, reducing the agent's view of the history if a reducer is configured."""
+        channel = await super()._get_or_create_channel(agent)
+        if self.history_reducer is not None and isinstance(channel, ChatHistory):
+            self.history_reducer.messages = channel.messages
+            try:
+                reduced = await self.history_reducer.reduce()
+                if reduced is not None:
+                    channel.messages[:] = reduced.messages
+            finally:
+                self.history_reducer.messages = []
+        return channel
+
+    async def _select_agent(self) -> Agent:
+        """Select the agent that takes the next turn."""
+        try:
+            return await self.selection_strategy.next(self.agents, self.history.messages)
+        except Exception as ex:
+            logger.error(f"Failed to select agent: {ex}")
+            raise AgentChatException("Failed to select agent") from ex
+
+    def _capture_selection_state(self) -> tuple[bool, dict[str, Any]]:
+        """Capture the selection strategy state so a discarded speculation can be rolled back."""
+        strategy = self.selection_strategy
+        return strategy.has_selected, dict(strategy.__pydantic_private__ or {})
+
+    def _restore_selection_state(self, state: tuple[bool, dict[str, Any]]) -> None:
+        """Restore the selection strategy state captured before speculating."""
+        strategy = self.selection_strategy
+        strategy.has_selected = state[0]
+        if strategy.__pydantic_private__ is not None:
+            strategy.__pydantic_private__.update(state[1])
+
+    async def _speculate_turn(self, turn: "_SpeculativeTurn") -> None:
+        """Run the next agent turn against a private copy of its channel history.
+
+        The turn is abandoned if it produces more than `max_speculative_tokens` tokens before the
+        termination decision is known; it is then run again normally on commit. Function calls
+        wait for the decision, since the functions are invoked once the stream reads past them.
+
+        Args:
+            turn: The speculative turn to fill in.
+        """
+        turn.agent = await self._select_agent()
+        if not issubclass(turn.agent.channel_type, ChatHistoryChannel):
+            return
+
+        self.speculative_turns += 1
+        channel = await self._get_or_create_channel(turn.agent)
+        history = ChatHistory(messages=list(channel.messages))
+        message_count = len(history.messages)
+
+        async with aclosing(turn.agent.invoke_stream(history)) as stream:
+            async for chunk in stream:
+                if chunk.content:
+                    turn.tokens += self._count_tokens(chunk)
+                if turn.decided.is_set():
+                    continue
+                if turn.tokens > self.max_speculative_tokens:
+                    logger.info(f"Speculative turn for {turn.agent.name} exceeded {self.max_speculative_tokens} tokens")
+                    turn.abandoned = True
+                    return
+                if any(isinstance(item, FunctionCallContent) for item in chunk.items):
+                    # The tools may have side effects, a discarded turn is cancelled while it waits here
+                    await turn.decided.wait()
+
+        turn.messages = history.messages[message_count:]
+
+    def _count_tokens(self, chunk: StreamingChatMessageContent) -> int:
+        """Count the completion tokens of a streamed chunk."""
+        if self.token_counter is not None:
+            return self.token_counter(chunk.content)
+        return len(_get_encoding(chunk.ai_model_id or "").encode(chunk.content))
+
+    async def _commit_turn(self, turn: "_SpeculativeTurn") -> list[ChatMessageContent]:
+        """Commit a speculative turn to the chat, or run the turn normally if it was not speculated.
+
+        Args:
+            turn: The completed speculative turn.
+
+        Returns:
+            The visible messages of the turn.
+        """
+        if turn.messages is None:
+            if turn.abandoned:
+                self.wasted_tokens += turn.tokens
+                self.discarded_turns += 1
+            return [message async for message in self.invoke_agent(turn.agent)]
+
+        self.set_activity_or_throw()
+        try:
+            channel = await self._get_or_create_channel(turn.agent)
+            channel.messages.extend(turn.messages)
+            self.history.messages.extend(turn.messages)
+
+            # Broadcast message to other channels (in parallel)
+            channel_refs = [
+                ChannelReference(channel=ch, hash=key) for key, ch in self.agent_channels.items() if ch != channel
+            ]
+            await self.broadcast_queue.enqueue(channel_refs, turn.messages)
+        finally:
+            self.clear_activity_signal()
+
+        self.committed_turns += 1
+        last_index = len(turn.messages) - 1
+        return [
+            message
+            for index, message in enumerate(turn.messages)
+            if index == last_index
+            or not any(isinstance(item, (FunctionCallContent, FunctionResultContent)) for item in message.items)
+        ]
+
+    async def _discard_speculation(self, turn: "_SpeculativeTurn") -> None:
+        """Cancel a speculative turn, drop its output and roll back the selection strategy.
+
+        Args:
+            turn: The speculative turn to discard.
+        """
+        turn.task.cancel()
+        try:
+            await turn.task
+        except asyncio.CancelledError:
+            pass
+        except Exception as ex:
+            logger.warning(f"Discarded speculative turn failed: {ex}")
+
+        self.wasted_tokens += turn.tokens
+        self.discarded_turns += 1
+        self._restore_selection_state(turn.selection_state)
+
+
+@dataclass
+class _SpeculativeTurn:
+    """The state of a single speculative agent turn."""
+
+    selection_state: tuple[bool, dict[str, Any]]
+    decided: asyncio.Event = field(default_factory=asyncio.Event)
+    task: asyncio.Task | None = None
+    agent: Agent | None = None
+    messages: list[ChatMessageContent] | None = None
+    tokens: int = 0
+    abandoned: bool = False
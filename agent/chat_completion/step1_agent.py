@@ -7,6 +7,8 @@ from semantic_kernel.agents import ChatCompletionAgent
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from semantic_kernel.contents import ChatHistory
 
+from kernel_profiler import profile_kernel
+
 ###################################################################
 # The following sample demonstrates how to create a simple,       #
 # non-group agent that repeats the user message in the voice      #
@@ -19,6 +21,9 @@ kernel = Kernel()
 # Add the OpenAIChatCompletion AI Service to the Kernel
 kernel.add_service(AzureChatCompletion(service_id="agent", env_file_path="../../.env"))
 
+# Profile the kernel when run with --profile (or SK_PROFILE=1)
+profile_kernel(kernel)
+
 # Define the agent with name and instructions
 AGENT_NAME = "Parrot"
 AGENT_INSTRUCTIONS = "You are a helpful parrot that repeats the user message in a emperor's voice."
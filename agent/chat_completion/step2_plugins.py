@@ -5,13 +5,15 @@ from typing import TYPE_CHECKING, Annotated
 
 from semantic_kernel import Kernel
 from semantic_kernel.agents import ChatCompletionAgent
-from semantic_kernel.connectors.ai import FunctionChoiceBehavior
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from semantic_kernel.contents import ChatHistory
 from semantic_kernel.contents.function_call_content import FunctionCallContent
 from semantic_kernel.contents.function_result_content import FunctionResultContent
 from semantic_kernel.functions import KernelArguments, kernel_function
 
+from kernel_profiler import profile_kernel
+from tool_schema_cache import CachedFunctionChoiceBehavior
+
 if TYPE_CHECKING:
     pass
 
@@ -49,9 +51,13 @@ kernel.add_plugin(MenuPlugin(), plugin_name="menu")
 service_id = "agent"
 kernel.add_service(AzureChatCompletion(service_id=service_id, env_file_path="../../.env"))
 
+# Profile the kernel when run with --profile (or SK_PROFILE=1)
+profile_kernel(kernel)
+
 settings = kernel.get_prompt_execution_settings_from_service_id(service_id=service_id)
-# Configure the function choice behavior to auto invoke kernel functions
-settings.function_choice_behavior = FunctionChoiceBehavior.Auto()
+# Configure the function choice behavior to auto invoke kernel functions,
+# the tool definitions are only rebuilt when plugins are added or removed
+settings.function_choice_behavior = CachedFunctionChoiceBehavior.Auto()
 
 # Define the agent name and instructions
 AGENT_NAME = "Host"
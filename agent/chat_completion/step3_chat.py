@@ -3,11 +3,15 @@
 import asyncio
 
 from semantic_kernel import Kernel
-from semantic_kernel.agents import AgentGroupChat, ChatCompletionAgent
+from semantic_kernel.agents import ChatCompletionAgent
 from semantic_kernel.agents.strategies import TerminationStrategy
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from semantic_kernel.contents import AuthorRole, ChatMessageContent
 
+from kernel_profiler import profile_kernel
+from speculative_group_chat import SpeculativeAgentGroupChat
+from token_budget_reducer import TokenBudgetHistoryReducer
+
 ###################################################################
 # The following sample demonstrates how to create a simple,       #
 # agent group chat that utilizes An Art Director Chat Completion  #
@@ -19,7 +23,7 @@ from semantic_kernel.contents import AuthorRole, ChatMessageContent
 def _create_kernel_with_chat_completion(service_id: str) -> Kernel:
     kernel = Kernel()
     kernel.add_service(AzureChatCompletion(service_id=service_id, env_file_path="../../.env",))
-    return kernel
+    return profile_kernel(kernel)
 
 
 class ApprovalTerminationStrategy(TerminationStrategy):
@@ -61,7 +65,7 @@ async def main():
         instructions=COPYWRITER_INSTRUCTIONS,
     )
 
-    group_chat = AgentGroupChat(
+    group_chat = SpeculativeAgentGroupChat(
         agents=[
             agent_writer,
             agent_reviewer,
@@ -70,6 +74,13 @@ async def main():
             agents=[agent_reviewer],
             maximum_iterations=10,
         ),
+        # Start the next agent's turn while the termination strategy is still deciding
+        max_speculative_tokens=256,
+        # Keep each agent's view under 2000 tokens: the goal, a running summary and the latest draft/feedback
+        history_reducer=TokenBudgetHistoryReducer(
+            max_tokens=2000,
+            service=AzureChatCompletion(service_id="summarizer", env_file_path="../../.env"),
+        ),
     )
 
     input = "새로운 전기차 라인의 슬로건"
@@ -81,6 +92,10 @@ async def main():
         print(f"# Agent - {content.name or '*'}: '{content.content}'")
 
     print(f"# IS COMPLETE: {group_chat.is_complete}")
+    print(
+        f"# SPECULATION: committed={group_chat.committed_turns}, discarded={group_chat.discarded_turns}, "
+        f"wasted_tokens={group_chat.wasted_tokens}"
+    )
 
 
 if __name__ == "__main__":
@@ -3,7 +3,7 @@
 import asyncio
 
 from semantic_kernel import Kernel
-from semantic_kernel.agents import AgentGroupChat, ChatCompletionAgent
+from semantic_kernel.agents import ChatCompletionAgent
 from semantic_kernel.agents.strategies import (
     KernelFunctionSelectionStrategy,
     KernelFunctionTerminationStrategy,
@@ -13,6 +13,9 @@ from semantic_kernel.contents import AuthorRole, ChatMessageContent
 from semantic_kernel.functions import KernelFunctionFromPrompt
 from semantic_kernel.agents.strategies.selection.sequential_selection_strategy import SequentialSelectionStrategy
 
+from kernel_profiler import profile_kernel
+from speculative_group_chat import SpeculativeAgentGroupChat
+
 ###################################################################
 # The following sample demonstrates how to create a simple,       #
 # agent group chat that utilizes An Art Director Chat Completion  #
@@ -27,7 +30,7 @@ from semantic_kernel.agents.strategies.selection.sequential_selection_strategy i
 def _create_kernel_with_chat_completion(service_id: str) -> Kernel:
     kernel = Kernel()
     kernel.add_service(AzureChatCompletion(service_id=service_id, env_file_path="../../.env",))
-    return kernel
+    return profile_kernel(kernel)
 
 
 async def main():
@@ -92,7 +95,7 @@ async def main():
         """,
     )
 
-    chat = AgentGroupChat(
+    chat = SpeculativeAgentGroupChat(
         agents=[agent_writer, agent_reviewer],
         termination_strategy=
         KernelFunctionTerminationStrategy(
@@ -123,6 +126,10 @@ async def main():
         print(f"# Agent - {content.name or '*'}: '{content.content}'")
 
     print(f"# IS COMPLETE: {chat.is_complete}")
+    print(
+        f"# SPECULATION: committed={chat.committed_turns}, discarded={chat.discarded_turns}, "
+        f"wasted_tokens={chat.wasted_tokens}"
+    )
 
 
 if __name__ == "__main__":
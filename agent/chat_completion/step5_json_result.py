@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft. All rights reserved.
 
 import asyncio
+from contextlib import suppress
 
 from pydantic import BaseModel, ValidationError
 
@@ -11,19 +12,26 @@ from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from semantic_kernel.contents import AuthorRole, ChatMessageContent
 from semantic_kernel.functions import KernelArguments
 
+from kernel_profiler import profile_kernel
+from streaming_json_parser import StreamingJsonParser
+
 ###################################################################
 # The following sample demonstrates how to configure an Agent     #
 # Group Chat, and invoke an agent with only a single turn.        #
 # A custom termination strategy is provided where the model is    #
 # to rate the user input on creativity and expressiveness         #
 # and end the chat when a score of 70 or higher is provided.      #
+# The response is parsed while it streams, so the decision is     #
+# made as soon as the score is complete and the notes of an       #
+# approved input are not generated to the end.                    #
 ###################################################################
 
 
-def _create_kernel_with_chat_completion(service_id: str) -> Kernel:
+def create_tutor_kernel(service_id: str = "tutor") -> Kernel:
+    """Create the profiled kernel with the chat completion service of the tutor agent."""
     kernel = Kernel()
     kernel.add_service(AzureChatCompletion(service_id=service_id, env_file_path="../../.env",))
-    return kernel
+    return profile_kernel(kernel)
 
 
 class InputScore(BaseModel):
@@ -38,33 +46,81 @@ class ThresholdTerminationStrategy(TerminationStrategy):
 
     threshold: int = 70
 
+    def is_threshold_met(self, score: int) -> bool:
+        """Check if the score is high enough to terminate."""
+        return score >= self.threshold
+
     async def should_agent_terminate(self, agent, history):
         """Check if the agent should terminate."""
         try:
             result = InputScore.model_validate_json(history[-1].content or "")
-            return result.score >= self.threshold
+            return self.is_threshold_met(result.score)
         except ValidationError:
             return False
 
 
-async def main():
-    kernel = _create_kernel_with_chat_completion(service_id="tutor")
-
-    TUTOR_NAME = "Tutor"
-    TUTOR_INSTRUCTIONS = """단계별로 생각하고 창의성과 표현력에 대한 사용자 의견을 1~100점까지 평가하고 개선 방법에 대한 몇 가지 메모를 남깁니다."""  # noqa: E501
-
-    settings = kernel.get_prompt_execution_settings_from_service_id(service_id="tutor")
+async def stream_until_threshold(
+    group_chat: AgentGroupChat, agent: ChatCompletionAgent, termination_strategy: ThresholdTerminationStrategy
+) -> None:
+    """Stream a single turn and decide on termination as soon as the score is complete.
+
+    When the score meets the threshold the chat is complete and the remaining notes are not
+    needed, so the turn is cancelled instead of waiting for the model to finish. The text
+    streamed until then is added to the chat history as the reply of the agent.
+    """
+    parser = StreamingJsonParser(InputScore, fields=["score"])
+    threshold_met = asyncio.Event()
+    streamed: list[str] = []
+
+    async def stream_turn() -> None:
+        async for content in group_chat.invoke_stream_single_turn(agent):
+            print(content.content, end="", flush=True)
+            streamed.append(content.content or "")
+            for _, score in parser.feed(content.content or ""):
+                if termination_strategy.is_threshold_met(score):
+                    threshold_met.set()
+
+    turn = asyncio.create_task(stream_turn())
+    decision = asyncio.create_task(threshold_met.wait())
+    await asyncio.wait([turn, decision], return_when=asyncio.FIRST_COMPLETED)
+    decision.cancel()
+
+    if threshold_met.is_set() and not turn.done():
+        # Cancelling the task unwinds the whole stream, which closes the request to the model
+        turn.cancel()
+        with suppress(asyncio.CancelledError):
+            await turn
+        # The chat only records a streamed reply once the stream ends, so record the partial one here
+        await group_chat.add_chat_message(
+            ChatMessageContent(role=AuthorRole.ASSISTANT, name=agent.name, content="".join(streamed))
+        )
+        group_chat.is_complete = True
+    else:
+        await turn
+
+
+TUTOR_NAME = "Tutor"
+TUTOR_INSTRUCTIONS = """단계별로 생각하고 창의성과 표현력에 대한 사용자 의견을 1~100점까지 평가하고 개선 방법에 대한 몇 가지 메모를 남깁니다."""  # noqa: E501
+
+
+def create_tutor_agent(kernel: Kernel, service_id: str = "tutor") -> ChatCompletionAgent:
+    """Create the tutor agent that answers with an InputScore."""
+    settings = kernel.get_prompt_execution_settings_from_service_id(service_id=service_id)
     settings.response_format = InputScore
 
-    agent = ChatCompletionAgent(
-        service_id="tutor",
+    return ChatCompletionAgent(
+        service_id=service_id,
         kernel=kernel,
         name=TUTOR_NAME,
         instructions=TUTOR_INSTRUCTIONS,
         arguments=KernelArguments(settings=settings),
-       
     )
 
+
+async def main():
+    kernel = create_tutor_kernel()
+    agent = create_tutor_agent(kernel)
+
     # Here a TerminationStrategy subclass is used that will terminate when
     # the response includes a score that is greater than or equal to 70.
     termination_strategy = ThresholdTerminationStrategy(maximum_iterations=10)
@@ -80,9 +136,10 @@ async def main():
         await group_chat.add_chat_message(ChatMessageContent(role=AuthorRole.USER, content=user_input))
         print(f"# User: '{user_input}'")
 
-        async for content in group_chat.invoke_single_turn(agent):
-            print(f"# Agent - {content.name or '*'}: '{content.content}'")
-            print(f"# IS COMPLETE: {group_chat.is_complete}")
+        print(f"# Agent - {TUTOR_NAME}: '", end="")
+        await stream_until_threshold(group_chat, agent, termination_strategy)
+        print("'")
+        print(f"# IS COMPLETE: {group_chat.is_complete}")
 
 
 if __name__ == "__main__":
@@ -9,6 +9,9 @@ from semantic_kernel.agents.strategies import TerminationStrategy
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from semantic_kernel.contents import AuthorRole, ChatMessageContent
 
+from async_logging import AsyncLogging
+from kernel_profiler import profile_kernel
+
 ###################################################################
 # The following sample demonstrates how to create a simple,       #
 # agent group chat that utilizes An Art Director Chat Completion  #
@@ -19,8 +22,15 @@ from semantic_kernel.contents import AuthorRole, ChatMessageContent
 ###################################################################
 
 
-# NOTE: This is all that is required to enable logging
-logging.basicConfig(level=logging.DEBUG)
+# NOTE: This is all that is required to enable logging. Records are formatted and written on a background
+# thread, so logging full prompts and responses does not slow down the event loop. The HTTP client
+# loggers are sampled and long payloads are truncated; use logging.basicConfig(level=logging.DEBUG)
+# for plain synchronous logging.
+async_logging = AsyncLogging(
+    level=logging.DEBUG,
+    sample_rates={"httpcore": 0.0, "httpx": 0.2, "openai": 0.2},
+    max_message_chars=4000,
+)
 
 
 class ApprovalTerminationStrategy(TerminationStrategy):
@@ -34,7 +44,7 @@ class ApprovalTerminationStrategy(TerminationStrategy):
 def _create_kernel_with_chat_completion(service_id: str) -> Kernel:
     kernel = Kernel()
     kernel.add_service(AzureChatCompletion(service_id=service_id))
-    return kernel
+    return profile_kernel(kernel)
 
 
 async def main():
@@ -82,6 +92,7 @@ async def main():
         print(f"# Agent - {content.name or '*'}: '{content.content}'")
 
     print(f"# IS COMPLETE: {group_chat.is_complete}")
+    print(f"# Logging: {async_logging.stats()}")
 
 
 if __name__ == "__main__":
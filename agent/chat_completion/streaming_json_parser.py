@@ -0,0 +1,159 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import logging
+from collections.abc import Iterable
+from typing import Any
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+###################################################################
+# An incremental parser for a JSON object streamed chunk by chunk #
+# (e.g. structured output with `response_format`). Top-level      #
+# fields are validated against the pydantic model and emitted as  #
+# soon as their value is complete, so callers can act on `score`  #
+# while the model is still generating `notes`.                    #
+###################################################################
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Parser states
+_BEFORE_OBJECT = 0
+_EXPECT_KEY = 1
+_KEY = 2
+_EXPECT_COLON = 3
+_EXPECT_VALUE = 4
+_VALUE = 5
+_DONE = 6
+
+
+class StreamingJsonParser:
+    """Parses a streamed JSON object and yields validated top-level fields as they complete.
+
+    Only the values of the requested fields are buffered; all other values are skipped while
+    being scanned, so the memory held between chunks is bounded by the largest requested value.
+
+    Args:
+        model: The pydantic model describing the JSON object.
+        fields: The names of the fields to emit, defaults to all fields of the model.
+    """
+
+    def __init__(self, model: type[BaseModel], fields: Iterable[str] | None = None) -> None:
+        names = set(fields) if fields is not None else set(model.model_fields)
+        self._adapters: dict[str, TypeAdapter] = {
+            name: TypeAdapter(field.annotation) for name, field in model.model_fields.items() if name in names
+        }
+        self._state = _BEFORE_OBJECT
+        self._key: list[str] = []
+        self._value: list[str] | None = None
+        self._value_kind = ""
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def is_done(self) -> bool:
+        """Whether the closing brace of the object has been parsed."""
+        return self._state == _DONE
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """Feed the next chunk of the stream.
+
+        Args:
+            chunk: The next piece of streamed text.
+
+        Returns:
+            The (name, value) pairs of the fields completed by this chunk, in stream order.
+        """
+        completed: list[tuple[str, Any]] = []
+        for char in chunk:
+            state = self._state
+            if state == _VALUE:
+                self._feed_value(char, completed)
+            elif state == _KEY:
+                if self._escaped:
+                    self._escaped = False
+                    self._key.append(char)
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._state = _EXPECT_COLON
+                else:
+                    self._key.append(char)
+            elif state == _BEFORE_OBJECT:
+                # Anything before the object, such as a markdown fence, is ignored
+                if char == "{":
+                    self._state = _EXPECT_KEY
+            elif state == _EXPECT_KEY:
+                if char == '"':
+                    self._key.clear()
+                    self._state = _KEY
+                elif char == "}":
+                    self._state = _DONE
+            elif state == _EXPECT_COLON:
+                if char == ":":
+                    self._state = _EXPECT_VALUE
+            elif state == _EXPECT_VALUE and not char.isspace():
+                self._start_value(char)
+        return completed
+
+    def _start_value(self, char: str) -> None:
+        """Start scanning a value that begins with `char`."""
+        self._value = [] if "".join(self._key) in self._adapters else None
+        self._depth = 0
+        self._escaped = False
+        if char == '"':
+            self._value_kind = "string"
+            self._in_string = True
+        elif char in "{[":
+            self._value_kind = "container"
+            self._depth = 1
+            self._in_string = False
+        else:
+            self._value_kind = "scalar"
+            self._in_string = False
+        if self._value is not None:
+            self._value.append(char)
+        self._state = _VALUE
+
+    def _feed_value(self, char: str, completed: list[tuple[str, Any]]) -> None:
+        """Scan one character of the current value."""
+        if self._value_kind == "scalar" and (char in ",}" or char.isspace()):
+            self._end_value(completed)
+            if char == "}":
+                self._state = _DONE
+            return
+
+        if self._value is not None:
+            self._value.append(char)
+
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+                if self._value_kind == "string":
+                    self._end_value(completed)
+        elif char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                self._end_value(completed)
+
+    def _end_value(self, completed: list[tuple[str, Any]]) -> None:
+        """Validate the buffered value and record it if it belongs to a requested field."""
+        self._state = _EXPECT_KEY
+        if self._value is None:
+            return
+
+        name = "".join(self._key)
+        raw = "".join(self._value)
+        self._value = None
+        try:
+            completed.append((name, self._adapters[name].validate_json(raw)))
+        except ValidationError as ex:
+            logger.warning(f"Streamed field `{name}` failed validation: {ex}")
@@ -0,0 +1,180 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import hashlib
+import logging
+import sys
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import lru_cache
+
+if sys.version < "3.12":
+    from typing_extensions import override  # pragma: no cover
+else:
+    from typing import override  # type: ignore # pragma: no cover
+
+import tiktoken
+from pydantic import Field
+
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
+from semantic_kernel.contents import AuthorRole, ChatHistory, ChatMessageContent
+from semantic_kernel.contents.function_result_content import FunctionResultContent
+from semantic_kernel.contents.history_reducer.chat_history_reducer import ChatHistoryReducer
+from semantic_kernel.contents.history_reducer.chat_history_reducer_utils import SUMMARY_METADATA_KEY
+from semantic_kernel.exceptions.content_exceptions import ChatHistoryReducerException
+
+###################################################################
+# A chat history reducer that keeps an agent's view of a group    #
+# chat under a token budget. The user goal and the most recent    #
+# messages (the latest draft and its feedback) are kept verbatim, #
+# everything in between is collapsed into a single summary that   #
+# is only extended with the messages dropped since the last       #
+# reduction.                                                      #
+###################################################################
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+DEFAULT_SUMMARIZATION_PROMPT = """
+Update the summary of the conversation with the new messages below.
+Keep the decisions made, the feedback that was given and what has already been tried.
+Do not exceed 5 sentences. Answer with the updated summary only.
+"""
+
+# Per-message framing overhead of the chat completion format, see the OpenAI cookbook
+# "How to count tokens with tiktoken".
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_NAME = 1
+
+
+@lru_cache(maxsize=32)
+def _get_encoding(model_id: str) -> tiktoken.Encoding:
+    """Get the tiktoken encoding for a model, falling back to o200k_base for deployment names."""
+    try:
+        return tiktoken.encoding_for_model(model_id)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+@lru_cache(maxsize=4096)
+def _count_text_tokens(model_id: str, text: str) -> int:
+    """Count the tokens of a text for a model."""
+    return len(_get_encoding(model_id).encode(text))
+
+
+class TokenBudgetHistoryReducer(ChatHistoryReducer):
+    """A ChatHistoryReducer that keeps the history under `max_tokens`.
+
+    When the history is over budget, it is reduced to the latest user message (the goal), one
+    summary message and the last `target_count` messages. The summary is extended incrementally:
+    only the previous summary and the newly dropped messages are sent to the summarizer, and the
+    result is cached so that agents sharing the same conversation summarize it only once.
+
+    Args:
+        max_tokens: The token budget of the history.
+        target_count: The number of most recent messages kept verbatim, default is 2.
+        service: The ChatCompletion service used for summarization.
+        ai_model_id: The model used to count tokens, defaults to the service's model.
+        token_counter: A custom token counter, overrides the tiktoken based counting.
+        summarization_instructions: The summarization instructions, optional.
+        execution_settings: The execution settings for the summarization prompt, optional.
+        cache_size: The number of summaries to cache, default is 128.
+    """
+
+    max_tokens: int = Field(..., gt=0)
+    target_count: int = Field(default=2, gt=0)
+    service: ChatCompletionClientBase
+    ai_model_id: str | None = None
+    token_counter: Callable[[str], int] | None = Field(default=None, exclude=True)
+    summarization_instructions: str = DEFAULT_SUMMARIZATION_PROMPT
+    execution_settings: PromptExecutionSettings | None = None
+    cache_size: int = Field(default=128, gt=0)
+    summary_cache: OrderedDict[str, str] = Field(default_factory=OrderedDict, exclude=True)
+
+    def count_tokens(self, messages: list[ChatMessageContent]) -> int:
+        """Count the prompt tokens of a list of messages for the target model.
+
+        Args:
+            messages: The messages to count.
+
+        Returns:
+            The number of tokens.
+        """
+        return sum(self._count_message_tokens(message) for message in messages)
+
+    def _count_message_tokens(self, message: ChatMessageContent) -> int:
+        """Count the tokens of a single message including the chat format overhead."""
+        tokens = TOKENS_PER_MESSAGE + self._count_text(message.content or "")
+        if message.name:
+            tokens += TOKENS_PER_NAME + self._count_text(message.name)
+        return tokens
+
+    def _count_text(self, text: str) -> int:
+        """Count the tokens of a text."""
+        if self.token_counter is not None:
+            return self.token_counter(text)
+        return _count_text_tokens(self.ai_model_id or self.service.ai_model_id, text)
+
+    @override
+    async def reduce(self) -> "TokenBudgetHistoryReducer | None":
+        history = self.messages
+        if self.count_tokens(history) <= self.max_tokens:
+            return None
+
+        goal_index = next((i for i in range(len(history) - 1, -1, -1) if history[i].role == AuthorRole.USER), None)
+        summary_index = next(
+            (i for i, m in enumerate(history) if m.metadata and SUMMARY_METADATA_KEY in m.metadata), None
+        )
+
+        # Never start the kept tail on a function result, it would be orphaned from its call
+        tail_index = max(len(history) - self.target_count, 0)
+        while tail_index > 0 and any(isinstance(item, FunctionResultContent) for item in history[tail_index].items):
+            tail_index -= 1
+
+        pinned = {goal_index, summary_index}
+        dropped = [m for i, m in enumerate(history[:tail_index]) if i not in pinned and m.content]
+        if not dropped:
+            logger.info("History is over budget but there are no messages to summarize.")
+            return None
+
+        previous_summary = history[summary_index].content if summary_index is not None else ""
+        summary = await self._summarize(previous_summary, dropped)
+
+        summary_message = ChatMessageContent(
+            role=AuthorRole.ASSISTANT, content=summary, metadata={SUMMARY_METADATA_KEY: True}
+        )
+        goal = [history[goal_index]] if goal_index is not None and goal_index < tail_index else []
+        tail = [m for m in history[tail_index:] if not (m.metadata and SUMMARY_METADATA_KEY in m.metadata)]
+        self.messages = [*goal, summary_message, *tail]
+
+        logger.info(f"Reduced history from {len(history)} to {len(self.messages)} messages.")
+        return self
+
+    async def _summarize(self, previous_summary: str, messages: list[ChatMessageContent]) -> str:
+        """Extend the previous summary with the dropped messages, using the cache when possible."""
+        key_source = "\n".join([previous_summary, *(f"{m.role}:{m.name}:{m.content}" for m in messages)])
+        key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+        if key in self.summary_cache:
+            self.summary_cache.move_to_end(key)
+            return self.summary_cache[key]
+
+        chat_history = ChatHistory()
+        chat_history.add_system_message(self.summarization_instructions)
+        if previous_summary:
+            chat_history.add_user_message(f"Current summary:\n{previous_summary}")
+        chat_history.add_user_message(
+            "New messages:\n" + "\n".join(f"{m.name or m.role}: {m.content}" for m in messages)
+        )
+        settings = self.execution_settings or self.service.get_prompt_execution_settings_from_settings(
+            PromptExecutionSettings()
+        )
+        try:
+            result = await self.service.get_chat_message_content(chat_history=chat_history, settings=settings)
+        except Exception as ex:
+            raise ChatHistoryReducerException("Chat History Summarization failed.") from ex
+        if result is None or not result.content:
+            raise ChatHistoryReducerException("Chat History Summarization returned no content.")
+
+        self.summary_cache[key] = result.content
+        if len(self.summary_cache) > self.cache_size:
+            self.summary_cache.popitem(last=False)
+        return result.content
@@ -0,0 +1,164 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from semantic_kernel import Kernel
+from semantic_kernel.connectors.ai.function_call_choice_configuration import FunctionCallChoiceConfiguration
+from semantic_kernel.connectors.ai.function_calling_utils import (
+    kernel_function_metadata_to_function_call_format,
+    update_settings_from_function_call_configuration,
+)
+from semantic_kernel.connectors.ai.function_choice_behavior import FunctionChoiceBehavior
+from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
+
+###################################################################
+# A cache of the tool definitions sent with every function        #
+# calling request. The kernel rebuilds the JSON schema of every   #
+# function for every request; here the plugin collection of the   #
+# kernel carries a version counter bumped when plugins or         #
+# functions are added or removed, and the schemas are rebuilt     #
+# only when the version or the function filters changed.          #
+###################################################################
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class _VersionedDict(dict):
+    """A dict that bumps a version counter, its own and its parents', whenever it is modified."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        self.parents: list["_VersionedDict"] = []
+        self.tool_cache: dict[Any, tuple[int, FunctionCallChoiceConfiguration, list[dict[str, Any]] | None]] = {}
+
+    def _changed(self) -> None:
+        self.version += 1
+        for parent in self.parents:
+            parent._changed()
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key: Any) -> None:
+        super().__delitem__(key)
+        self._changed()
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, *args: Any) -> Any:
+        result = super().pop(*args)
+        self._changed()
+        return result
+
+    def popitem(self) -> tuple[Any, Any]:
+        result = super().popitem()
+        self._changed()
+        return result
+
+    def clear(self) -> None:
+        super().clear()
+        self._changed()
+
+    def __ior__(self, other: Any) -> "_VersionedDict":
+        self.update(other)
+        return self
+
+
+class _VersionedPlugins(_VersionedDict):
+    """The plugin collection of a kernel, the functions of every plugin put in it are versioned too."""
+
+    def __setitem__(self, key: Any, plugin: Any) -> None:
+        _version_functions(plugin, self)
+        super().__setitem__(key, plugin)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for plugin in dict(*args, **kwargs).values():
+            _version_functions(plugin, self)
+        super().update(*args, **kwargs)
+
+
+def _version_functions(plugin: Any, plugins: _VersionedDict) -> None:
+    """Replace the functions dict of a plugin with a versioned one that reports to the plugin collection."""
+    functions = plugin.functions
+    if not isinstance(functions, _VersionedDict):
+        functions = _VersionedDict(functions)
+        # Plugins are pydantic models, set the dict as a plain attribute to skip the validation copying it
+        object.__setattr__(plugin, "functions", functions)
+    if plugins not in functions.parents:
+        functions.parents.append(plugins)
+
+
+def track_plugin_changes(kernel: Kernel) -> Kernel:
+    """Make the plugin collection of a kernel count its changes, so the tool definitions can be cached.
+
+    Every way the kernel adds or removes plugins and functions goes through the plugin dicts and bumps the
+    version. Functions changed in place (e.g. a description edited on the metadata) are not seen, add the
+    function again to pick up the change.
+
+    Args:
+        kernel: The kernel, plugins may be added before or after.
+
+    Returns:
+        The kernel.
+    """
+    if not isinstance(kernel.plugins, _VersionedPlugins):
+        plugins = _VersionedPlugins()
+        plugins.update(kernel.plugins)
+        object.__setattr__(kernel, "plugins", plugins)
+    return kernel
+
+
+class CachedFunctionChoiceBehavior(FunctionChoiceBehavior):
+    """A function choice behavior that reuses the tool definitions while the kernel's plugins are unchanged.
+
+    Create it like the base class, e.g. `CachedFunctionChoiceBehavior.Auto()`. The available functions are
+    cached per kernel, filters and choice type, and keyed by the version of the kernel's plugin collection,
+    so configuring a request is a dict lookup until a plugin is added or removed. For the OpenAI and Azure
+    OpenAI services the serialized tools are cached too; other services get the cached functions and
+    serialize them themselves.
+    """
+
+    def configure(
+        self,
+        kernel: Kernel,
+        update_settings_callback: Callable[..., None],
+        settings: PromptExecutionSettings,
+    ) -> None:
+        """Configure the function choice behavior, from the cache while the plugins are unchanged."""
+        if not self.enable_kernel_functions:
+            return
+
+        plugins = track_plugin_changes(kernel).plugins
+        key = (_freeze_filters(self.filters), self.type_, update_settings_callback)
+        cached = plugins.tool_cache.get(key)
+        if cached is None or cached[0] != plugins.version:
+            config = self.get_config(kernel)
+            tools = None
+            if update_settings_callback is update_settings_from_function_call_configuration:
+                tools = [kernel_function_metadata_to_function_call_format(f) for f in config.available_functions or []]
+            logger.debug(f"Built the definitions of {len(config.available_functions or [])} tools.")
+            cached = (plugins.version, config, tools)
+            plugins.tool_cache[key] = cached
+
+        _, config, tools = cached
+        if tools is None:
+            update_settings_callback(config, settings, self.type_)
+        elif tools and hasattr(settings, "tool_choice") and hasattr(settings, "tools"):
+            # Same as update_settings_from_function_call_configuration; the list is copied, the schemas are shared
+            settings.tool_choice = self.type_
+            settings.tools = list(tools)
+
+
+def _freeze_filters(filters: dict[str, list[str]] | None) -> tuple[tuple[str, tuple[str, ...]], ...]:
+    return tuple(sorted((name, tuple(values)) for name, values in (filters or {}).items()))
@@ -1,23 +1,58 @@
+import os
+
 import chainlit as cl
 from chainlit import Message, on_message
 
 from semantic_kernel import Kernel
 from semantic_kernel.agents import ChatCompletionAgent
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
-from semantic_kernel.contents import ChatHistory
+
+from agent.chat_completion.compact_chat_history import CompactChatHistory
+from agent.chat_completion.hedged_chat_completion import HedgedChatCompletion
+from agent.chat_completion.kernel_profiler import profile_kernel
+from agent.chat_completion.session_store import PersistentChatHistory, SessionStore
 
 kernel = Kernel()
 
-kernel.add_service(AzureChatCompletion(service_id="agent"))
+# Hedging is opt-in: when AZURE_OPENAI_HEDGE_DEPLOYMENT_NAME or HEDGE_BUDGET_PERCENT is set, slow first tokens
+# are hedged with a duplicate request, to the alternate deployment if one is configured, spending at most
+# HEDGE_BUDGET_PERCENT (default 10) extra requests.
+hedge_deployment = os.getenv("AZURE_OPENAI_HEDGE_DEPLOYMENT_NAME")
+hedge_budget_percent = os.getenv("HEDGE_BUDGET_PERCENT")
+if hedge_deployment or hedge_budget_percent:
+    chat_services = [AzureChatCompletion(service_id="agent-primary")]
+    if hedge_deployment:
+        chat_services.append(AzureChatCompletion(service_id="agent-hedge", deployment_name=hedge_deployment))
+    kernel.add_service(
+        HedgedChatCompletion(
+            service_id="agent",
+            services=chat_services,
+            percentile=95,
+            budget_percent=float(hedge_budget_percent or "10"),
+        )
+    )
+else:
+    kernel.add_service(AzureChatCompletion(service_id="agent"))
+# Profile the kernel when SK_PROFILE=1, the profile is written when the app stops
+profile_kernel(kernel)
 
 AGENT_INSTRUCTIONS = "You are a agent"
 agent = ChatCompletionAgent(service_id="agent", kernel=kernel, name="agent")
 
-chat_history = ChatHistory()
-chat_history.add_system_message(AGENT_INSTRUCTIONS)
+
+class SessionChatHistory(CompactChatHistory, PersistentChatHistory):
+    """A persisted session history, kept compact in memory: all but its latest messages are stored as arrays."""
+
+
+# Every message is appended to a local SQLite log, a session is only loaded from it when its next
+# message arrives, so conversations survive restarts and idle ones do not stay in memory.
+session_store = SessionStore(os.getenv("CHAT_SESSION_DB", "chat_sessions.db"), history_class=SessionChatHistory)
 
 @cl.on_message
 async def main(message: cl.Message):
+    chat_history = await session_store.get(cl.context.session.thread_id)
+    if not chat_history.messages:
+        chat_history.add_system_message(AGENT_INSTRUCTIONS)
     chat_history.add_user_message(message.content)
     response = agent.invoke_stream(chat_history)
     msg = await Message(content="").send()
@@ -25,3 +60,9 @@ async def main(message: cl.Message):
         if chunk and chunk.content:
             await msg.stream_token(str(chunk.content))
     await msg.update()
+
+
+@cl.on_chat_end
+async def end():
+    # The session stays on disk and is loaded again if the chat is resumed
+    session_store.evict(cl.context.session.thread_id)
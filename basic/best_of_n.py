@@ -0,0 +1,145 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import inspect
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
+from semantic_kernel.contents.chat_history import ChatHistory
+
+# Called with the text of a candidate so far and whether it is finished. Returns True to accept the
+# candidate, False to reject it (its generation is cancelled) or None while it cannot tell yet.
+Validator = Callable[[str, bool], bool | None | Awaitable[bool | None]]
+
+
+@dataclass
+class BestOfNResult:
+    """
+    The outcome of a best-of-N request
+
+    Args:
+        text (str): The text of the chosen candidate
+        index (int | None): The index of the chosen candidate, None if every candidate was rejected
+        accepted (bool): Whether the validator accepted the candidate, False for a fallback candidate
+        candidates (list[str]): The text every candidate had generated when it finished or was cancelled
+        cancelled (list[int]): The indexes of the candidates whose generation was cancelled
+        elapsed (float): The seconds until the chosen candidate was finished
+    """
+
+    text: str
+    index: int | None
+    accepted: bool
+    candidates: list[str] = field(default_factory=list)
+    cancelled: list[int] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+async def best_of_n(
+    service: ChatCompletionClientBase,
+    chat_history: ChatHistory,
+    settings: PromptExecutionSettings,
+    validator: Validator,
+    n: int = 3,
+    on_update: Callable[[int, str], None] | None = None,
+) -> BestOfNResult:
+    """
+    Stream N candidates at once and return the first one the validator accepts
+
+    Every candidate is a separate streamed request, so a candidate can be cancelled on its own: a rejected
+    candidate stops as soon as the validator rejects it, and once a candidate is accepted all the others stop
+    generating. If no candidate is accepted, the first finished candidate that was not rejected is returned.
+
+    Args:
+        service (ChatCompletionClientBase): The chat completion service
+        chat_history (ChatHistory): The chat history to complete
+        settings (PromptExecutionSettings): The execution settings, number_of_responses is set to 1 per candidate
+        validator (Validator): Scores a candidate incrementally, see `Validator`
+        n (int): The number of candidates
+        on_update (Callable[[int, str], None] | None): Called with the index and text of a candidate on every chunk
+
+    Returns:
+        BestOfNResult: The chosen candidate
+    """
+    candidate_settings = settings.model_copy(deep=True)
+    if hasattr(candidate_settings, "number_of_responses"):
+        candidate_settings.number_of_responses = 1
+
+    start = time.perf_counter()
+    texts = [""] * n
+    verdicts: list[bool | None] = [None] * n
+    finished_at: list[float | None] = [None] * n
+    accepted = asyncio.Event()
+
+    async def validate(text: str, done: bool) -> bool | None:
+        verdict = validator(text, done)
+        return await verdict if inspect.isawaitable(verdict) else verdict
+
+    async def run_candidate(index: int) -> None:
+        async for messages in service.get_streaming_chat_message_contents(
+            chat_history=chat_history, settings=candidate_settings
+        ):
+            for message in messages:
+                texts[index] += str(message)
+            if on_update is not None:
+                on_update(index, texts[index])
+            if verdicts[index] is None:
+                verdicts[index] = await validate(texts[index], False)
+                if verdicts[index] is False:
+                    return
+                if verdicts[index] is True:
+                    accepted.set()
+        finished_at[index] = time.perf_counter() - start
+        if verdicts[index] is None:
+            verdicts[index] = await validate(texts[index], True)
+            if verdicts[index] is True:
+                accepted.set()
+
+    tasks = [asyncio.create_task(run_candidate(index)) for index in range(n)]
+    errors: dict[int, BaseException] = {}
+    winner: int | None = None
+    try:
+        pending = set(tasks)
+        while pending and winner is None:
+            waiter = asyncio.create_task(accepted.wait())
+            done, pending = await asyncio.wait(pending | {waiter}, return_when=asyncio.FIRST_COMPLETED)
+            pending.discard(waiter)
+            waiter.cancel()
+            for task in done:
+                if task is not waiter and not task.cancelled() and task.exception() is not None:
+                    # A failed candidate counts as rejected, the others may still succeed
+                    errors[tasks.index(task)] = task.exception()
+                    verdicts[tasks.index(task)] = False
+            if accepted.is_set():
+                winner = verdicts.index(True)
+                for index, task in enumerate(tasks):
+                    if index != winner:
+                        task.cancel()
+                await tasks[winner]
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    cancelled = [
+        index for index in range(n) if finished_at[index] is None and index != winner and index not in errors
+    ]
+    if winner is None:
+        fallbacks = [index for index in range(n) if finished_at[index] is not None and verdicts[index] is not False]
+        winner = min(fallbacks, key=lambda index: finished_at[index], default=None)
+        if winner is None and errors:
+            raise next(iter(errors.values()))
+        is_accepted = False
+    else:
+        is_accepted = True
+
+    return BestOfNResult(
+        text=texts[winner] if winner is not None else "",
+        index=winner,
+        accepted=is_accepted,
+        candidates=texts,
+        cancelled=cancelled,
+        elapsed=(finished_at[winner] or 0.0) if winner is not None else time.perf_counter() - start,
+    )
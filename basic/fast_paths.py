@@ -0,0 +1,264 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import inspect
+import json
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from semantic_kernel.contents import AuthorRole, ChatMessageContent
+from semantic_kernel.contents.kernel_content import KernelContent
+from semantic_kernel.filters.filter_types import FilterTypes
+from semantic_kernel.filters.functions.function_invocation_context import FunctionInvocationContext
+from semantic_kernel.functions.function_result import FunctionResult
+from semantic_kernel.functions.kernel_arguments import KernelArguments
+from semantic_kernel.kernel import Kernel
+
+FastPathHandler = Callable[[KernelArguments], Any]
+FastPathValidator = Callable[[KernelArguments], bool]
+
+
+class FastPathMiss(Exception):
+    """
+    Raised by a fast path that cannot handle its input, the function then falls back to the model
+    """
+
+
+# Errors of a handler that means the input is not in the shape it handles, rather than a bug
+_MISS_ERRORS = (FastPathMiss, ValueError, LookupError, TypeError)
+
+
+@dataclass(frozen=True)
+class FastPath:
+    """
+    A native implementation of a prompt function
+
+    Args:
+        handler (FastPathHandler): Computes the result from the arguments; returning None or raising FastPathMiss,
+            ValueError, LookupError or TypeError falls back to the model
+        validator (FastPathValidator | None): Tells whether the handler can take the arguments, checked first
+    """
+
+    handler: FastPathHandler
+    validator: FastPathValidator | None = None
+
+
+@dataclass
+class FastPathStats:
+    """
+    The calls of one prompt function with a fast path
+
+    Args:
+        hits (int): The calls answered by the native implementation
+        fallbacks (int): The calls that went to the model
+        native_seconds (float): The time spent in the native implementation, hits and misses
+    """
+
+    hits: int = 0
+    fallbacks: int = 0
+    native_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of the calls answered natively."""
+        calls = self.hits + self.fallbacks
+        return self.hits / calls if calls else 0.0
+
+
+class FastPathRegistry:
+    """
+    Native implementations tried before the model for prompt functions that have an exact answer
+
+    The registry is a function invocation filter: when a function with a fast path is invoked, the handler runs
+    on the arguments and its value becomes the function result, without rendering the prompt or calling the
+    service. The value is returned the way a chat completion returns it, as a list with one assistant message,
+    so callers cannot tell a hit from a model answer. When the handler cannot take the input, the call goes on
+    to the model. Streamed invocations always go to the model.
+    """
+
+    def __init__(self) -> None:
+        self.stats: dict[tuple[str | None, str], FastPathStats] = {}
+        self._paths: dict[tuple[str | None, str], FastPath] = {}
+
+    def register(self, kernel: Kernel) -> "FastPathRegistry":
+        """
+        Add the registry to a kernel as a function invocation filter
+
+        Args:
+            kernel (Kernel): The kernel
+
+        Returns:
+            FastPathRegistry: The registry itself
+        """
+        kernel.add_filter(FilterTypes.FUNCTION_INVOCATION, self.on_function_invocation)
+        return self
+
+    def declare(
+        self,
+        plugin_name: str | None,
+        function_name: str,
+        handler: FastPathHandler,
+        validator: FastPathValidator | None = None,
+    ) -> None:
+        """
+        Declare the native implementation of a prompt function
+
+        Args:
+            plugin_name (str | None): The plugin name
+            function_name (str): The function name
+            handler (FastPathHandler): Computes the result from the arguments, may be async
+            validator (FastPathValidator | None): Tells whether the handler can take the arguments
+        """
+        self._paths[(plugin_name, function_name)] = FastPath(handler=handler, validator=validator)
+        self.stats.setdefault((plugin_name, function_name), FastPathStats())
+
+    def native(
+        self, plugin_name: str | None, function_name: str, validator: FastPathValidator | None = None
+    ) -> Callable[[FastPathHandler], FastPathHandler]:
+        """
+        Declare the decorated function the native implementation of a prompt function
+
+        Args:
+            plugin_name (str | None): The plugin name
+            function_name (str): The function name
+            validator (FastPathValidator | None): Tells whether the handler can take the arguments
+
+        Returns:
+            The decorator, which returns the handler unchanged
+        """
+
+        def decorator(handler: FastPathHandler) -> FastPathHandler:
+            self.declare(plugin_name, function_name, handler, validator)
+            return handler
+
+        return decorator
+
+    async def on_function_invocation(
+        self,
+        context: FunctionInvocationContext,
+        next: Callable[[FunctionInvocationContext], Awaitable[None]],
+    ) -> None:
+        """The function invocation filter answering from the fast paths."""
+        key = (context.function.plugin_name, context.function.name)
+        path = None if context.is_streaming else self._paths.get(key)
+        if path is None:
+            await next(context)
+            return
+
+        stats = self.stats[key]
+        start = time.perf_counter()
+        value = await self._try(path, context.arguments)
+        stats.native_seconds += time.perf_counter() - start
+        if value is None:
+            stats.fallbacks += 1
+            await next(context)
+            return
+
+        stats.hits += 1
+        context.result = FunctionResult(
+            function=context.function.metadata, value=self._as_messages(value), metadata={"fast_path": True}
+        )
+
+    def report(self) -> str:
+        """
+        The hit rate of every fast path, one line per function
+        """
+        lines = []
+        for (plugin_name, function_name), stats in self.stats.items():
+            name = f"{plugin_name}.{function_name}" if plugin_name else function_name
+            calls = stats.hits + stats.fallbacks
+            mean_us = stats.native_seconds / calls * 1_000_000 if calls else 0.0
+            lines.append(
+                f"{name}: {stats.hits}/{calls} native ({stats.hit_rate:.0%}), {stats.fallbacks} to the model,"
+                f" {mean_us:.1f} us per native attempt"
+            )
+        return "\n".join(lines)
+
+    @staticmethod
+    def _as_messages(value: Any) -> list[KernelContent]:
+        """The value of a handler in the shape of a prompt function result, content is kept as it is."""
+        if isinstance(value, list) and value and all(isinstance(item, KernelContent) for item in value):
+            return value
+        if isinstance(value, KernelContent):
+            return [value]
+        return [ChatMessageContent(role=AuthorRole.ASSISTANT, content=str(value))]
+
+    @staticmethod
+    async def _try(path: FastPath, arguments: KernelArguments) -> Any:
+        """Run the fast path, None when the input is left to the model."""
+        try:
+            if path.validator is not None and not path.validator(arguments):
+                return None
+            value = path.handler(arguments)
+            if inspect.isawaitable(value):
+                value = await value
+        except _MISS_ERRORS:
+            return None
+        return value
+
+
+def parse_elements(text: str) -> list[str]:
+    """
+    Split a list given as text: a JSON array, one element per line or comma separated elements
+
+    Args:
+        text (str): The list
+
+    Returns:
+        list[str]: The elements, stripped of whitespace and list markers
+    """
+    text = text.strip()
+    if text.startswith("["):
+        try:
+            elements = json.loads(text)
+        except json.JSONDecodeError:
+            elements = None
+        if isinstance(elements, list):
+            return [element if isinstance(element, str) else json.dumps(element) for element in elements]
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if len(lines) > 1:
+        return [line.lstrip("-*• ").strip() for line in lines]
+    return [element.strip() for element in text.split(",") if element.strip()]
+
+
+def element_at_index(arguments: KernelArguments) -> str:
+    """
+    The native implementation of MiscPlugin.ElementAtIndex, Elements[index] with a zero-based index
+
+    Args:
+        arguments (KernelArguments): The input list, the index and optionally the count of elements
+
+    Returns:
+        str: The element
+    """
+    elements = parse_elements(str(arguments["input"]))
+    index = int(str(arguments["index"]).strip())
+    count = str(arguments.get("count") or "").strip()
+    if count and int(count) != len(elements):
+        # The list was not split the way the caller counted it, the model may know better
+        raise FastPathMiss(f"Parsed {len(elements)} elements, expected {count}")
+    if index < 0:
+        raise FastPathMiss("Negative index")
+    return elements[index]
+
+
+# The prompt functions of prompt_template_samples with an exact native answer
+SAMPLE_FAST_PATHS: dict[tuple[str, str], FastPathHandler] = {
+    ("MiscPlugin", "ElementAtIndex"): element_at_index,
+}
+
+
+def register_sample_fast_paths(registry: FastPathRegistry) -> FastPathRegistry:
+    """
+    Declare the fast paths of the prompt_template_samples plugins
+
+    Args:
+        registry (FastPathRegistry): The registry
+
+    Returns:
+        FastPathRegistry: The registry
+    """
+    for (plugin_name, function_name), handler in SAMPLE_FAST_PATHS.items():
+        registry.declare(plugin_name, function_name, handler)
+    return registry
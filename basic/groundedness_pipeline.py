@@ -0,0 +1,302 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import re
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from semantic_kernel.functions.kernel_function import KernelFunction
+from semantic_kernel.functions.kernel_plugin import KernelPlugin
+from semantic_kernel.kernel import Kernel
+
+_TOKEN_REGEX = re.compile(r"\w+")
+_BULLET_REGEX = re.compile(r"^\s*[-*•]\s*(?P<item>.+?)\s*$", re.MULTILINE)
+_HANGUL_REGEX = re.compile(r"[\uac00-\ud7a3]$")
+
+# Korean particles that may follow a noun in the grounding text, longest first
+KOREAN_PARTICLES = (
+    "에서는", "에게서", "으로는", "이라는", "에서", "에게", "에는", "으로", "까지", "부터", "보다", "처럼", "께서",
+    "한테", "이나", "이랑", "라는", "은", "는", "이", "가", "을", "를", "의", "에", "와", "과", "도", "로", "만", "랑",
+)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for matching: unicode compatibility form, case folded, punctuation removed, single spaces
+
+    Args:
+        text (str): The text
+
+    Returns:
+        str: The normalized text
+    """
+    return " ".join(_TOKEN_REGEX.findall(unicodedata.normalize("NFKC", text).casefold()))
+
+
+def split_into_chunks(text: str, max_chars: int = 2000) -> list[str]:
+    """
+    Split a text into chunks of at most max_chars characters at paragraph, line or sentence boundaries
+
+    Args:
+        text (str): The text
+        max_chars (int): The maximum length of a chunk, unless a single sentence is longer
+
+    Returns:
+        list[str]: The chunks in document order
+    """
+    pieces = [piece for piece in re.split(r"(?<=[.!?。])\s+|\n+", text) if piece.strip()]
+    chunks: list[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 1 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current} {piece.strip()}" if current else piece.strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def parse_bulleted_list(text: str, tag: str) -> list[str]:
+    """
+    Parse the bulleted list between <tag> and </tag> of a grounding function result
+
+    Args:
+        text (str): The function result
+        tag (str): The tag name, e.g. "entities"
+
+    Returns:
+        list[str]: The items, or an empty list if the tag is missing
+    """
+    match = re.search(rf"<{tag}>(.*?)(?:</{tag}>|$)", text, re.DOTALL)
+    if not match:
+        return []
+    return [bullet.group("item") for bullet in _BULLET_REGEX.finditer(match.group(1))]
+
+
+def format_bulleted_list(items: list[str], tag: str) -> str:
+    """Format items as a bulleted list between <tag> and </tag>, as the grounding functions expect."""
+    return "\n".join([f"<{tag}>", *(f"- {item}" for item in items), f"</{tag}>"])
+
+
+class GroundingIndex:
+    """
+    A local index of the grounding text, used to resolve entities that appear in it verbatim or normalized
+
+    Args:
+        grounding_text (str): The grounding text
+        chunk_chars (int): The length of the chunks handed to the LLM reference check
+    """
+
+    def __init__(self, grounding_text: str, chunk_chars: int = 2000) -> None:
+        self.chunks = split_into_chunks(grounding_text, chunk_chars)
+        self._chunk_tokens = [_token_forms(normalize_text(chunk).split()) for chunk in self.chunks]
+        # The forms of every grounding token in order, and the positions of each form
+        self._forms = [_forms(token) for token in normalize_text(grounding_text).split()]
+        self._positions: dict[str, list[int]] = {}
+        for position, forms in enumerate(self._forms):
+            for form in forms:
+                self._positions.setdefault(form, []).append(position)
+
+    def contains(self, entity: str) -> bool:
+        """
+        Whether the normalized entity appears in the normalized grounding text as whole tokens
+
+        The entity tokens must match consecutive grounding tokens exactly. The only suffix allowed is a Korean
+        particle after a Hangul token (see KOREAN_PARTICLES), so a noun matches the noun followed by a particle.
+
+        Examples:
+            >>> index = GroundingIndex("존이 파리에 갔다. Anna lives in Paris.")
+            >>> index.contains("존"), index.contains("파리"), index.contains("Paris")
+            (True, True, True)
+            >>> GroundingIndex("존경하는 선생님").contains("존"), index.contains("Ann"), index.contains("Par")
+            (False, False, False)
+        """
+        tokens = normalize_text(entity).split()
+        if not tokens:
+            return False
+        return any(
+            all(
+                start + offset < len(self._forms) and token in self._forms[start + offset]
+                for offset, token in enumerate(tokens[1:], 1)
+            )
+            for start in self._positions.get(tokens[0], [])
+        )
+
+    def relevant_context(self, entities: list[str], max_chars: int) -> str:
+        """
+        Select the chunks sharing the most tokens with the entities, in document order, within max_chars
+
+        Args:
+            entities (list[str]): The entities to check
+            max_chars (int): The maximum length of the context
+
+        Returns:
+            str: The reference context
+        """
+        tokens = {token for entity in entities for token in normalize_text(entity).split()}
+        scores = [
+            sum(token in chunk_tokens for token in tokens)
+            for chunk_tokens in self._chunk_tokens
+        ]
+        selected: list[int] = []
+        length = 0
+        for index in sorted(range(len(self.chunks)), key=lambda index: (-scores[index], index)):
+            if length + len(self.chunks[index]) > max_chars and selected:
+                break
+            selected.append(index)
+            length += len(self.chunks[index]) + 1
+        return "\n".join(self.chunks[index] for index in sorted(selected))
+
+
+def _forms(token: str) -> set[str]:
+    """The token and, for a Hangul token ending with a particle, the noun before the particle."""
+    forms = {token}
+    for particle in KOREAN_PARTICLES:
+        stem = token[: -len(particle)]
+        if token.endswith(particle) and _HANGUL_REGEX.search(stem):
+            forms.add(stem)
+    return forms
+
+
+def _token_forms(tokens: Iterable[str]) -> set[str]:
+    return {form for token in tokens for form in _forms(token)}
+
+
+@dataclass
+class GroundednessReport:
+    """
+    The result of a groundedness check
+
+    Args:
+        entities (list[str]): The deduplicated entities of the checked text
+        grounded_locally (list[str]): The entities found in the grounding text by the local pre-pass
+        checked_by_llm (list[str]): The entities sent to the LLM reference check
+        ungrounded (list[str]): The entities the reference check found ungrounded
+    """
+
+    entities: list[str] = field(default_factory=list)
+    grounded_locally: list[str] = field(default_factory=list)
+    checked_by_llm: list[str] = field(default_factory=list)
+    ungrounded: list[str] = field(default_factory=list)
+
+    @property
+    def ungrounded_entities(self) -> str:
+        """The ungrounded entities in the form ExciseEntities expects."""
+        return format_bulleted_list(self.ungrounded, "ungrounded_entities")
+
+
+class GroundednessPipeline:
+    """
+    A map-reduce version of the GroundingPlugin pipeline for long texts
+
+    Entities are extracted from chunks of the checked text in parallel and deduplicated. Entities that appear
+    in the grounding text are resolved locally, only the remaining ones are sent to the reference check, in
+    parallel batches that each get the grounding chunks most relevant to them instead of the whole text.
+
+    Args:
+        kernel (Kernel): The kernel used to invoke the functions
+        grounding_plugin (KernelPlugin): The GroundingPlugin
+        chunk_chars (int): The length of the chunks of the checked text and of the grounding text
+        batch_size (int): The number of entities per reference check
+        max_context_chars (int): The maximum length of the grounding context of one reference check
+        max_concurrency (int): The maximum number of LLM calls running at the same time
+    """
+
+    def __init__(
+        self,
+        kernel: Kernel,
+        grounding_plugin: KernelPlugin,
+        chunk_chars: int = 2000,
+        batch_size: int = 10,
+        max_context_chars: int = 6000,
+        max_concurrency: int = 4,
+    ) -> None:
+        self.kernel = kernel
+        self.entity_extraction = grounding_plugin["ExtractEntities"]
+        self.reference_check = grounding_plugin["ReferenceCheckEntities"]
+        self.entity_excision = grounding_plugin["ExciseEntities"]
+        self.chunk_chars = chunk_chars
+        self.batch_size = batch_size
+        self.max_context_chars = max_context_chars
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def check(
+        self, text: str, grounding_text: str, topic: str = "people and places", example_entities: str = ""
+    ) -> GroundednessReport:
+        """
+        Find the entities of a text that are not grounded in the grounding text
+
+        Args:
+            text (str): The text to check, e.g. a summary
+            grounding_text (str): The grounding text
+            topic (str): The kind of entities to extract
+            example_entities (str): Examples of such entities
+
+        Returns:
+            GroundednessReport: The entities and how they were resolved
+        """
+        extracted = await asyncio.gather(
+            *(
+                self._invoke(self.entity_extraction, input=chunk, topic=topic, example_entities=example_entities)
+                for chunk in split_into_chunks(text, self.chunk_chars)
+            )
+        )
+        entities = _deduplicate(entity for result in extracted for entity in parse_bulleted_list(result, "entities"))
+
+        index = GroundingIndex(grounding_text, self.chunk_chars)
+        report = GroundednessReport(entities=entities)
+        for entity in entities:
+            (report.grounded_locally if index.contains(entity) else report.checked_by_llm).append(entity)
+
+        batches = [
+            report.checked_by_llm[start : start + self.batch_size]
+            for start in range(0, len(report.checked_by_llm), self.batch_size)
+        ]
+        checked = await asyncio.gather(
+            *(
+                self._invoke(
+                    self.reference_check,
+                    input=format_bulleted_list(batch, "entities"),
+                    reference_context=index.relevant_context(batch, self.max_context_chars),
+                )
+                for batch in batches
+            )
+        )
+        for batch, result in zip(batches, checked):
+            # Only keep answers that are entities of the batch, the model may rephrase or add items
+            by_key = {normalize_text(entity): entity for entity in batch}
+            for item in parse_bulleted_list(result, "ungrounded_entities"):
+                if (entity := by_key.get(normalize_text(item))) is not None and entity not in report.ungrounded:
+                    report.ungrounded.append(entity)
+        return report
+
+    async def excise(self, text: str, report: GroundednessReport) -> str:
+        """
+        Remove the ungrounded entities of a report from the text
+
+        Args:
+            text (str): The checked text
+            report (GroundednessReport): The report of the check
+
+        Returns:
+            str: The rewritten text, or the text itself if every entity is grounded
+        """
+        if not report.ungrounded:
+            return text
+        return await self._invoke(self.entity_excision, input=text, ungrounded_entities=report.ungrounded_entities)
+
+    async def _invoke(self, function: KernelFunction, **arguments: str) -> str:
+        async with self._semaphore:
+            return str(await self.kernel.invoke(function, **arguments))
+
+
+def _deduplicate(entities: Iterable[str]) -> list[str]:
+    """Keep the first spelling of every normalized entity, in order."""
+    seen: dict[str, str] = {}
+    for entity in entities:
+        key = normalize_text(entity)
+        if key and key not in seen:
+            seen[key] = entity
+    return list(seen.values())
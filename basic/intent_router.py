@@ -0,0 +1,290 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import random
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+from semantic_kernel.connectors.ai.embeddings.embedding_generator_base import EmbeddingGeneratorBase
+from semantic_kernel.functions.kernel_function import KernelFunction
+from semantic_kernel.kernel import Kernel
+
+# "Message: <text>" followed by "<Field>: <Label>", the few-shot format of the ClassificationPlugin templates
+_EXAMPLE_REGEX = re.compile(r"^Message:\s*(?P<message>.+?)\s*\n\s*\w+:\s*(?P<label>\w+)", re.MULTILINE)
+# An indented "Name," line of a list of intents, as in IntentDetectionPlugin/AssistantIntent
+_INTENT_REGEX = re.compile(r"^\s+(?P<intent>[A-Z]\w+),?\s*$", re.MULTILINE)
+_CAMEL_CASE_REGEX = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+
+UNKNOWN_LABEL = "Unknown"
+
+
+def template_examples(template: str) -> list[tuple[str, str]]:
+    """
+    Extract the labeled few-shot examples of a classification prompt template
+
+    Message examples ("Message: ..." followed by "Type: Question") are used as they are. Templates that only
+    list the labels, like AssistantIntent, give one example per label made of its words ("WhatTimeIsIt" gives
+    "What Time Is It"), which is a weak seed that labeled traffic should complement.
+
+    Args:
+        template (str): The prompt template
+
+    Returns:
+        list[tuple[str, str]]: The (text, label) examples
+    """
+    examples = [
+        (match.group("message").strip('"'), match.group("label"))
+        for match in _EXAMPLE_REGEX.finditer(template)
+        if "{{" not in match.group("message")
+    ]
+    if examples:
+        return examples
+    return [(" ".join(_CAMEL_CASE_REGEX.split(intent)), intent) for intent in _INTENT_REGEX.findall(template)]
+
+
+def canonical_label(output: str, labels: Iterable[str]) -> str:
+    """
+    Map the output of a classification function to a known label
+
+    Args:
+        output (str): The function output, e.g. " question\n"
+        labels (Iterable[str]): The known labels
+
+    Returns:
+        str: The known label with the same spelling ignoring case, otherwise the first word of the output
+    """
+    words = re.findall(r"\w+", output)
+    if not words:
+        return UNKNOWN_LABEL
+    by_key = {label.casefold(): label for label in labels}
+    return by_key.get(words[0].casefold(), words[0])
+
+
+@dataclass
+class RouteDecision:
+    """
+    The label of a classified text
+
+    Args:
+        label (str): The label
+        confidence (float): The cosine similarity of the text to the nearest example of the label
+        local (bool): Whether the label was decided locally, False if the prompt function decided it
+        seconds (float): The time the decision took
+    """
+
+    label: str
+    confidence: float
+    local: bool
+    seconds: float
+
+
+@dataclass
+class RouterStats:
+    """
+    Counters of a semantic router
+
+    Args:
+        local (int): The decisions made locally
+        fallbacks (int): The decisions made by the prompt function
+        audited (int): The local decisions that were also sent to the prompt function to measure agreement
+        agreed (int): The audited decisions on which the prompt function gave the same label
+        local_seconds (float): The total time of the local decisions
+    """
+
+    local: int = 0
+    fallbacks: int = 0
+    audited: int = 0
+    agreed: int = 0
+    local_seconds: float = 0.0
+
+    @property
+    def fallback_rate(self) -> float:
+        """The share of decisions made by the prompt function."""
+        total = self.local + self.fallbacks
+        return self.fallbacks / total if total else 0.0
+
+    @property
+    def agreement_rate(self) -> float | None:
+        """The share of audited local decisions the prompt function agreed with, None before the first audit."""
+        return self.agreed / self.audited if self.audited else None
+
+    @property
+    def mean_local_ms(self) -> float:
+        """The mean time of a local decision in milliseconds."""
+        return 1000 * self.local_seconds / self.local if self.local else 0.0
+
+
+class SemanticRouter:
+    """
+    A local nearest-neighbor classifier in front of a classification prompt function
+
+    The router embeds labeled examples, the few-shot examples of the prompt template and labeled traffic, and
+    keeps them in memory. A text is labeled locally when its nearest example is similar enough and clearly
+    closer than the nearest example of any other label, otherwise the prompt function decides and its answer
+    is learned as a new example. A sample of the local decisions is checked against the prompt function in the
+    background to measure their agreement.
+
+    Local decisions do not see the other arguments of the function (e.g. the highTopics of Importance), so use
+    one router per set of such arguments. With a local embedding model, or for repeated texts whose embeddings
+    are cached, a local decision takes well under a millisecond.
+
+    Args:
+        kernel (Kernel): The kernel used to invoke the prompt function
+        function (KernelFunction): The classification prompt function, e.g. ClassificationPlugin/Question
+        embedding_service (EmbeddingGeneratorBase): The service used to embed examples and texts
+        threshold (float): The minimum similarity to the nearest example for a local decision
+        margin (float): The minimum similarity difference to the nearest example of another label
+        audit_rate (float): The share of local decisions also sent to the prompt function
+        learn (bool): Whether the answers of the prompt function are added as examples
+        max_cached_embeddings (int): The number of text embeddings kept for repeated texts
+    """
+
+    def __init__(
+        self,
+        kernel: Kernel,
+        function: KernelFunction,
+        embedding_service: EmbeddingGeneratorBase,
+        threshold: float = 0.85,
+        margin: float = 0.03,
+        audit_rate: float = 0.05,
+        learn: bool = True,
+        max_cached_embeddings: int = 1024,
+    ) -> None:
+        self.kernel = kernel
+        self.function = function
+        self.embedding_service = embedding_service
+        self.threshold = threshold
+        self.margin = margin
+        self.audit_rate = audit_rate
+        self.learn = learn
+        self.max_cached_embeddings = max_cached_embeddings
+        self.stats = RouterStats()
+        self.labels: list[str] = []
+        self._texts: list[str] = []
+        self._example_labels: list[int] = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._embeddings: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._audits: set[asyncio.Task] = set()
+
+    async def add_template_examples(self) -> int:
+        """
+        Add the few-shot examples of the prompt template of the function
+
+        Returns:
+            int: The number of examples added
+        """
+        template = self.function.prompt_template.prompt_template_config.template
+        return await self.add_examples(template_examples(template))
+
+    async def add_examples(self, examples: Iterable[tuple[str, str]]) -> int:
+        """
+        Add labeled examples, e.g. labeled traffic
+
+        Args:
+            examples (Iterable[tuple[str, str]]): The (text, label) examples
+
+        Returns:
+            int: The number of examples added, texts already known are skipped
+        """
+        known = set(self._texts)
+        new = []
+        for text, label in examples:
+            if text not in known:
+                known.add(text)
+                new.append((text, label))
+        if not new:
+            return 0
+        vectors = await self._embed([text for text, _ in new])
+        for text, label in new:
+            if label not in self.labels:
+                self.labels.append(label)
+            self._texts.append(text)
+            self._example_labels.append(self.labels.index(label))
+        self._matrix = vectors if not self._matrix.size else np.vstack([self._matrix, vectors])
+        return len(new)
+
+    async def classify(self, text: str, **arguments: str) -> RouteDecision:
+        """
+        Label a text locally, or with the prompt function if the local decision is not confident
+
+        Args:
+            text (str): The text, passed to the function as `input`
+            arguments (str): The other arguments of the function
+
+        Returns:
+            RouteDecision: The label and how it was decided
+        """
+        start = time.perf_counter()
+        label, confidence = self.nearest_label((await self._embed([text]))[0])
+        if label is not None:
+            seconds = time.perf_counter() - start
+            self.stats.local += 1
+            self.stats.local_seconds += seconds
+            if random.random() < self.audit_rate:
+                task = asyncio.create_task(self._audit(text, label, arguments))
+                self._audits.add(task)
+                task.add_done_callback(self._audits.discard)
+            return RouteDecision(label=label, confidence=confidence, local=True, seconds=seconds)
+
+        self.stats.fallbacks += 1
+        llm_label = await self._invoke(text, arguments)
+        if self.learn and llm_label != UNKNOWN_LABEL:
+            await self.add_examples([(text, llm_label)])
+        return RouteDecision(label=llm_label, confidence=confidence, local=False, seconds=time.perf_counter() - start)
+
+    def nearest_label(self, vector: np.ndarray) -> tuple[str | None, float]:
+        """
+        Find the label of the nearest example of a normalized embedding
+
+        Args:
+            vector (np.ndarray): The normalized embedding
+
+        Returns:
+            tuple[str | None, float]: The label, None if the decision is not confident, and the similarity
+        """
+        if not self._matrix.size:
+            return None, 0.0
+        similarities = self._matrix @ vector
+        best = np.full(len(self.labels), -1.0, dtype=np.float32)
+        np.maximum.at(best, np.asarray(self._example_labels), similarities)
+        order = np.argsort(best)[::-1]
+        confidence = float(best[order[0]])
+        runner_up = float(best[order[1]]) if len(order) > 1 else -1.0
+        if confidence < self.threshold or confidence - runner_up < self.margin:
+            return None, confidence
+        return self.labels[int(order[0])], confidence
+
+    async def wait_for_audits(self) -> None:
+        """Wait for the background agreement checks, e.g. before reading the stats."""
+        if self._audits:
+            await asyncio.gather(*self._audits, return_exceptions=True)
+
+    async def _audit(self, text: str, label: str, arguments: dict[str, str]) -> None:
+        llm_label = await self._invoke(text, arguments)
+        self.stats.audited += 1
+        if llm_label == label:
+            self.stats.agreed += 1
+
+    async def _invoke(self, text: str, arguments: dict[str, str]) -> str:
+        result = await self.kernel.invoke(self.function, input=text, **arguments)
+        return canonical_label(str(result), self.labels)
+
+    async def _embed(self, texts: list[str]) -> np.ndarray:
+        """Embed and normalize texts, reusing the embeddings of recently seen texts."""
+        missing = [text for text in dict.fromkeys(texts) if text not in self._embeddings]
+        if missing:
+            embeddings = np.asarray(await self.embedding_service.generate_embeddings(missing), dtype=np.float32)
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True).clip(min=1e-12)
+            for text, embedding in zip(missing, embeddings):
+                self._embeddings[text] = embedding
+        vectors = []
+        for text in texts:
+            self._embeddings.move_to_end(text)
+            vectors.append(self._embeddings[text])
+        while len(self._embeddings) > self.max_cached_embeddings:
+            self._embeddings.popitem(last=False)
+        return np.vstack(vectors)
@@ -0,0 +1,172 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import contextvars
+import json
+import math
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from semantic_kernel.filters.filter_types import FilterTypes
+from semantic_kernel.filters.functions.function_invocation_context import FunctionInvocationContext
+from semantic_kernel.functions.function_result import FunctionResult
+from semantic_kernel.kernel import Kernel
+
+CACHE_POLICY_ATTRIBUTE = "__kernel_function_cache_policy__"
+GLOBAL_PARTITION = "global"
+
+_current_partition: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "invocation_cache_partition", default=None
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    How the results of a kernel function may be reused
+
+    Args:
+        pure (bool): The result only depends on the arguments, so it is shared by all planner runs
+        ttl (float | None): The result is reused until the end of the current ttl window (e.g. ttl=60 until the
+            wall clock minute changes), within one planner run
+    """
+
+    pure: bool = False
+    ttl: float | None = None
+
+
+def cacheable(pure: bool = False, ttl: float | None = None) -> Callable[[F], F]:
+    """
+    Declare a kernel function pure or TTL-cacheable, used together with @kernel_function
+
+    Args:
+        pure (bool): The result only depends on the arguments
+        ttl (float | None): The length in seconds of the window during which the result does not change
+
+    Returns:
+        The decorator, which marks the method and returns it unchanged
+    """
+    if not pure and ttl is None:
+        raise ValueError("A cacheable function must be pure or have a ttl")
+
+    def decorator(func: F) -> F:
+        setattr(func, CACHE_POLICY_ATTRIBUTE, CachePolicy(pure=pure, ttl=ttl))
+        return func
+
+    return decorator
+
+
+class InvocationCache:
+    """
+    A kernel-level cache of the results of pure and TTL-cacheable kernel functions
+
+    The cache is a function invocation filter, so it also serves the function calls made by planners. Results of
+    pure functions are shared by all runs, results of TTL functions are partitioned per planner run (see
+    `run_scope`), so a time read during one plan is reused within it but not by the next question.
+
+    Args:
+        max_entries (int): The maximum number of cached results, the least recently used ones are dropped first
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._policies: dict[tuple[str | None, str], CachePolicy] = {}
+        self._entries: OrderedDict[tuple[str, str | None, str, str], tuple[float, FunctionResult]] = OrderedDict()
+
+    def register(self, kernel: Kernel) -> "InvocationCache":
+        """
+        Add the cache to a kernel as a function invocation filter
+
+        Args:
+            kernel (Kernel): The kernel
+
+        Returns:
+            InvocationCache: The cache itself
+        """
+        kernel.add_filter(FilterTypes.FUNCTION_INVOCATION, self.on_function_invocation)
+        return self
+
+    def declare(self, plugin_name: str, function_name: str, pure: bool = False, ttl: float | None = None) -> None:
+        """
+        Declare a function of a plugin that cannot be decorated (e.g. a core plugin) pure or TTL-cacheable
+
+        Args:
+            plugin_name (str): The plugin name
+            function_name (str): The function name, or "*" for every function of the plugin
+            pure (bool): The result only depends on the arguments
+            ttl (float | None): The length in seconds of the window during which the result does not change
+        """
+        if not pure and ttl is None:
+            raise ValueError("A cacheable function must be pure or have a ttl")
+        self._policies[(plugin_name, function_name)] = CachePolicy(pure=pure, ttl=ttl)
+
+    @contextmanager
+    def run_scope(self) -> Iterator[str]:
+        """
+        Partition the TTL results of one planner run, they are dropped when the scope ends
+
+        Yields:
+            str: The partition id
+        """
+        partition = uuid.uuid4().hex
+        token = _current_partition.set(partition)
+        try:
+            yield partition
+        finally:
+            _current_partition.reset(token)
+            for key in [key for key in self._entries if key[0] == partition]:
+                del self._entries[key]
+
+    async def on_function_invocation(
+        self,
+        context: FunctionInvocationContext,
+        next: Callable[[FunctionInvocationContext], Awaitable[None]],
+    ) -> None:
+        """The function invocation filter serving cached results."""
+        policy = None if context.is_streaming else self._policy(context)
+        if policy is None:
+            await next(context)
+            return
+
+        partition = GLOBAL_PARTITION if policy.pure else (_current_partition.get() or GLOBAL_PARTITION)
+        key = (partition, context.function.plugin_name, context.function.name, self._arguments_key(context))
+        now = time.time()
+        if (entry := self._entries.get(key)) is not None and now < entry[0]:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            context.result = entry[1]
+            return
+
+        self.misses += 1
+        await next(context)
+        if context.result is None or context.result.metadata.get("exception") is not None:
+            return
+        expires_at = math.inf if policy.ttl is None else (math.floor(now / policy.ttl) + 1) * policy.ttl
+        self._entries[key] = (expires_at, context.result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _policy(self, context: FunctionInvocationContext) -> CachePolicy | None:
+        function = context.function
+        method = getattr(function, "method", None)
+        if (policy := getattr(method, CACHE_POLICY_ATTRIBUTE, None)) is not None:
+            return policy
+        return self._policies.get((function.plugin_name, function.name)) or self._policies.get(
+            (function.plugin_name, "*")
+        )
+
+    @staticmethod
+    def _arguments_key(context: FunctionInvocationContext) -> str:
+        """Key the call on the arguments of the function parameters only, not on the ambient arguments."""
+        names = [parameter.name for parameter in context.function.metadata.parameters]
+        values = {name: context.arguments[name] for name in names if name in context.arguments}
+        return json.dumps(values, sort_keys=True, default=str)
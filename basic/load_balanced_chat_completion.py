@@ -0,0 +1,323 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import random
+import time
+from collections.abc import AsyncGenerator, Callable
+from dataclasses import dataclass
+from typing import Any, ClassVar
+
+from pydantic import Field, PrivateAttr
+
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
+from semantic_kernel.contents.chat_history import ChatHistory
+from semantic_kernel.contents.chat_message_content import ChatMessageContent
+from semantic_kernel.contents.streaming_chat_message_content import StreamingChatMessageContent
+from semantic_kernel.exceptions.service_exceptions import ServiceResponseException
+
+# Status codes worth retrying on another deployment, other client errors would fail there too
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+@dataclass
+class DeploymentHealth:
+    """
+    The health of one deployment of a load balanced service
+
+    Args:
+        name (str): The deployment name, the ai_model_id of its service
+        weight (float): The share of traffic relative to the other deployments at equal latency
+        ewma_latency (float | None): The moving average of the seconds to the first response, None before any call
+        in_flight (int): The requests currently running
+        consecutive_failures (int): The failures since the last success
+        open_until (float): The monotonic time until which the circuit is open
+        cooldown (float): The length of the next circuit opening
+        successes (int): The successful requests
+        failures (int): The failed requests, including throttled and timed out ones
+        throttled (int): The requests rejected with 429
+        timeouts (int): The requests that timed out
+        probing (bool): Whether the probe request of a half-open circuit is running
+    """
+
+    name: str
+    weight: float = 1.0
+    ewma_latency: float | None = None
+    in_flight: int = 0
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    cooldown: float = 0.0
+    successes: int = 0
+    failures: int = 0
+    throttled: int = 0
+    timeouts: int = 0
+    probing: bool = False
+
+    @property
+    def state(self) -> str:
+        """The circuit state: "closed", "open" or "half-open" once the cooldown is over."""
+        if not self.open_until:
+            return "closed"
+        return "open" if time.monotonic() < self.open_until else "half-open"
+
+    @property
+    def available(self) -> bool:
+        """Whether a request may be sent, a half-open circuit allows one probe at a time."""
+        state = self.state
+        return state == "closed" or (state == "half-open" and not self.probing)
+
+    def score(self) -> float:
+        """The expected latency of one more request, lower is better; deployments without samples go first."""
+        return (self.ewma_latency or 0.0) * (self.in_flight + 1) / self.weight
+
+
+class LoadBalancedChatCompletion(ChatCompletionClientBase):
+    """
+    A chat completion service that spreads requests over several deployments
+
+    Every request goes to the available deployment with the lowest weighted expected latency, the moving
+    average of its time to first response times the requests it already runs. 429s, timeouts and server
+    errors count against a deployment: a 429 opens its circuit for the Retry-After time, and so do
+    `failure_threshold` consecutive failures, for a cooldown that doubles on every reopening. Once the cooldown
+    is over one probe request is let through, it closes the circuit if it succeeds.
+
+    A failed request is retried on the next deployment. A streamed request is only retried until its first
+    chunk, after that the caller has received text and the error is raised, so a stream is never spliced from
+    two deployments. Function calling is handled once here, around the requests sent to the deployments, so
+    the deployments should be of the same kind (all Azure OpenAI or all OpenAI).
+
+    Args:
+        services (list[ChatCompletionClientBase]): The services of the deployments
+        weights (list[float] | None): The weight of each deployment, 1 by default
+        request_timeout (float | None): The seconds after which a request, or the first chunk of a stream, times out
+        failure_threshold (int): The consecutive failures that open the circuit of a deployment
+        base_cooldown (float): The seconds the circuit is first opened for
+        max_cooldown (float): The maximum seconds the circuit is opened for
+        latency_smoothing (float): The weight of the latest sample in the latency moving average
+    """
+
+    services: list[ChatCompletionClientBase]
+    weights: list[float] | None = None
+    request_timeout: float | None = 60.0
+    failure_threshold: int = 3
+    base_cooldown: float = 5.0
+    max_cooldown: float = 120.0
+    latency_smoothing: float = Field(default=0.2, gt=0.0, le=1.0)
+
+    SUPPORTS_FUNCTION_CALLING: ClassVar[bool] = True
+
+    _health: list[DeploymentHealth] = PrivateAttr(default_factory=list)
+
+    def __init__(self, services: list[ChatCompletionClientBase], **kwargs: Any) -> None:
+        if not services:
+            raise ValueError("A load balanced service needs at least one deployment")
+        kwargs.setdefault("ai_model_id", ",".join(service.ai_model_id for service in services))
+        super().__init__(services=services, **kwargs)
+        weights = self.weights or [1.0] * len(services)
+        if len(weights) != len(services):
+            raise ValueError("There must be one weight per deployment")
+        self._health = [
+            DeploymentHealth(name=service.ai_model_id, weight=weight) for service, weight in zip(services, weights)
+        ]
+
+    @property
+    def health(self) -> list[DeploymentHealth]:
+        """The health of each deployment, in the order of `services`."""
+        return self._health
+
+    def get_prompt_execution_settings_class(self) -> type[PromptExecutionSettings]:
+        return self.services[0].get_prompt_execution_settings_class()
+
+    def _verify_function_choice_settings(self, settings: PromptExecutionSettings) -> None:
+        self.services[0]._verify_function_choice_settings(settings)
+
+    def _update_function_choice_settings_callback(self) -> Callable[..., None]:
+        return self.services[0]._update_function_choice_settings_callback()
+
+    def _reset_function_choice_settings(self, settings: PromptExecutionSettings) -> None:
+        self.services[0]._reset_function_choice_settings(settings)
+
+    async def _inner_get_chat_message_contents(
+        self, chat_history: ChatHistory, settings: PromptExecutionSettings
+    ) -> list[ChatMessageContent]:
+        tried: set[int] = set()
+        last_error: Exception | None = None
+        while (index := self._select(tried, last_error)) is not None:
+            tried.add(index)
+            health = self._health[index]
+            service = self.services[index]
+            start = self._start(index)
+            try:
+                result = await asyncio.wait_for(
+                    service._inner_get_chat_message_contents(chat_history, self._deployment_settings(settings)),
+                    self.request_timeout,
+                )
+            except Exception as exc:
+                if not self._record_failure(index, exc):
+                    raise
+                last_error = exc
+                continue
+            finally:
+                health.in_flight -= 1
+                health.probing = False
+            self._record_success(index, time.monotonic() - start)
+            return result
+        raise self._unavailable(last_error)
+
+    async def _inner_get_streaming_chat_message_contents(
+        self, chat_history: ChatHistory, settings: PromptExecutionSettings, function_invoke_attempt: int = 0
+    ) -> AsyncGenerator[list[StreamingChatMessageContent], Any]:
+        tried: set[int] = set()
+        last_error: Exception | None = None
+        while (index := self._select(tried, last_error)) is not None:
+            tried.add(index)
+            health = self._health[index]
+            service = self.services[index]
+            start = self._start(index)
+            stream = service._inner_get_streaming_chat_message_contents(
+                chat_history, self._deployment_settings(settings), function_invoke_attempt
+            )
+            try:
+                try:
+                    first = await asyncio.wait_for(anext(stream), self.request_timeout)
+                except StopAsyncIteration:
+                    first = None
+                except Exception as exc:
+                    # Nothing was yielded yet, the request can move to the next deployment
+                    if not self._record_failure(index, exc):
+                        raise
+                    last_error = exc
+                    continue
+                self._record_success(index, time.monotonic() - start)
+                health.probing = False
+                if first is not None:
+                    yield first
+                    try:
+                        async for chunks in stream:
+                            yield chunks
+                    except Exception as exc:
+                        self._record_failure(index, exc)
+                        raise
+                return
+            finally:
+                await stream.aclose()
+                health.in_flight -= 1
+                health.probing = False
+        raise self._unavailable(last_error)
+
+    def _select(self, tried: set[int], last_error: Exception | None) -> int | None:
+        """Pick the available deployment with the lowest score, ties are broken at random."""
+        candidates = [index for index in range(len(self.services)) if index not in tried]
+        available = [index for index in candidates if self._health[index].available]
+        if not available:
+            if last_error is not None or not candidates:
+                return None
+            # Every circuit is open: try the deployment that recovers first rather than failing right away
+            return min(candidates, key=lambda index: self._health[index].open_until)
+        scores = {index: self._health[index].score() for index in available}
+        best = min(scores.values())
+        return random.choice([index for index, score in scores.items() if score == best])
+
+    def _start(self, index: int) -> float:
+        health = self._health[index]
+        health.in_flight += 1
+        if health.state == "half-open":
+            health.probing = True
+        return time.monotonic()
+
+    def _deployment_settings(self, settings: PromptExecutionSettings) -> PromptExecutionSettings:
+        """Copy the settings for one deployment, which fills in its own model id and the messages."""
+        deployment_settings = settings.model_copy(deep=True)
+        if hasattr(deployment_settings, "ai_model_id"):
+            deployment_settings.ai_model_id = None
+        return deployment_settings
+
+    def _record_success(self, index: int, latency: float) -> None:
+        health = self._health[index]
+        health.successes += 1
+        health.consecutive_failures = 0
+        health.open_until = 0.0
+        health.cooldown = 0.0
+        self._observe_latency(health, latency)
+
+    def _record_failure(self, index: int, exc: Exception) -> bool:
+        """
+        Update the health of a deployment after a failed request
+
+        Args:
+            index (int): The deployment index
+            exc (Exception): The error of the request
+
+        Returns:
+            bool: Whether the request may be retried on another deployment
+        """
+        status_code, retry_after = _inspect_error(exc)
+        timed_out = _is_timeout(exc)
+        client_error = status_code is not None and status_code < 500 and status_code not in RETRYABLE_STATUS_CODES
+        if client_error and not timed_out:
+            # The request itself is invalid (bad request, content filter...), the deployment is fine
+            return False
+
+        health = self._health[index]
+        health.failures += 1
+        health.consecutive_failures += 1
+        health.timeouts += timed_out
+        if timed_out and self.request_timeout is not None:
+            # Count the timeout as a latency sample, so a slow deployment gets less traffic even while it works
+            self._observe_latency(health, self.request_timeout)
+        was_probing = health.state == "half-open"
+        if status_code == 429:
+            health.throttled += 1
+        if status_code == 429 or was_probing or health.consecutive_failures >= self.failure_threshold:
+            health.cooldown = min(self.max_cooldown, health.cooldown * 2 or self.base_cooldown)
+            health.open_until = time.monotonic() + (retry_after if retry_after is not None else health.cooldown)
+        return True
+
+    def _observe_latency(self, health: DeploymentHealth, latency: float) -> None:
+        if health.ewma_latency is None:
+            health.ewma_latency = latency
+        else:
+            health.ewma_latency += self.latency_smoothing * (latency - health.ewma_latency)
+
+    def _unavailable(self, last_error: Exception | None) -> Exception:
+        if last_error is not None:
+            return last_error
+        return ServiceResponseException("No deployment of the load balanced chat completion service is available")
+
+
+def _is_timeout(exc: BaseException) -> bool:
+    """Whether the error is a timeout, asyncio's or the client's (e.g. openai.APITimeoutError)."""
+    return any("Timeout" in type(error).__name__ for error in _error_chain(exc))
+
+
+def _inspect_error(exc: BaseException) -> tuple[int | None, float | None]:
+    """Find the HTTP status code and the Retry-After seconds of an error or of the errors that caused it."""
+    for error in _error_chain(exc):
+        status_code = getattr(error, "status_code", None)
+        if not isinstance(status_code, int):
+            continue
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        retry_after = None
+        try:
+            if "retry-after-ms" in headers:
+                retry_after = float(headers["retry-after-ms"]) / 1000
+            elif "retry-after" in headers:
+                retry_after = float(headers["retry-after"])
+        except ValueError:
+            pass
+        return status_code, retry_after
+    return None, None
+
+
+def _error_chain(exc: BaseException) -> list[BaseException]:
+    """The error, the errors it wraps (SK service errors pass them as arguments) and their causes."""
+    chain: list[BaseException] = []
+    pending = [exc]
+    while pending:
+        error = pending.pop(0)
+        if error in chain:
+            continue
+        chain.append(error)
+        pending += [arg for arg in error.args if isinstance(arg, BaseException)]
+        pending += [cause for cause in (error.__cause__, error.__context__) if cause is not None]
+    return chain
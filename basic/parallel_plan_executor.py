@@ -0,0 +1,153 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import re
+from copy import copy
+
+from semantic_kernel.exceptions import KernelInvokeException
+from semantic_kernel.functions.function_result import FunctionResult
+from semantic_kernel.functions.kernel_arguments import KernelArguments
+from semantic_kernel.kernel import Kernel
+from semantic_kernel.planners.plan import Plan
+
+VARIABLE_REGEX = re.compile(r"\$(?P<var>\w+)")
+
+
+def _references(value: object) -> list[str]:
+    return [match.group("var") for match in VARIABLE_REGEX.finditer(str(value))] if value else []
+
+
+def build_plan_graph(plan: Plan) -> list[set[int]]:
+    """
+    Build the dependency graph of the steps of a sequential plan
+
+    A step depends on the latest earlier step that outputs a variable it references with `$name`. A step
+    without an explicit `input` parameter implicitly consumes the result of the step before it, as it
+    does when the plan runs sequentially.
+
+    Args:
+        plan (Plan): The plan created by the SequentialPlanner
+
+    Returns:
+        list[set[int]]: The indexes of the steps each step depends on
+    """
+    producers: dict[str, int] = {}
+    graph: list[set[int]] = []
+    for index, step in enumerate(plan._steps):
+        dependencies = {
+            producers[name]
+            for value in step._parameters.values()
+            for name in _references(value)
+            if name in producers
+        }
+        if index > 0 and not step._parameters.get("input"):
+            dependencies.add(index - 1)
+        graph.append(dependencies)
+        for name in step._outputs:
+            producers[name] = index
+    return graph
+
+
+class ParallelPlanExecutor:
+    """
+    Runs the steps of a sequential plan as a dependency graph, so independent steps run concurrently
+
+    Results are merged in step order, so the plan state and the result do not depend on which step
+    finishes first. The result is the one of the last step, like `Plan.invoke`.
+
+    Args:
+        max_concurrency (int): The maximum number of steps running at the same time
+    """
+
+    def __init__(self, max_concurrency: int = 4) -> None:
+        self.max_concurrency = max_concurrency
+
+    async def invoke(self, plan: Plan, kernel: Kernel, arguments: KernelArguments | None = None) -> FunctionResult:
+        """
+        Invoke the plan
+
+        Args:
+            plan (Plan): The plan created by the SequentialPlanner
+            kernel (Kernel): The kernel to use for invocation
+            arguments (KernelArguments | None): The initial arguments, the plan state if not provided
+
+        Returns:
+            FunctionResult: The result of the last step, with the results of all steps in the metadata
+        """
+        arguments = copy(arguments) if arguments else copy(plan._state)
+        steps = plan._steps
+        graph = build_plan_graph(plan)
+        results: list[asyncio.Future[FunctionResult | None]] = [
+            asyncio.get_running_loop().create_future() for _ in steps
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_step(index: int) -> None:
+            dependencies = {dependency: await results[dependency] for dependency in sorted(graph[index])}
+            async with semaphore:
+                step_arguments = self._step_arguments(plan, index, arguments, dependencies)
+                try:
+                    result = await steps[index].invoke(kernel, step_arguments)
+                except Exception as exc:
+                    raise KernelInvokeException(
+                        "Error occurred while running plan step: " + str(exc),
+                        exc,
+                    ) from exc
+            results[index].set_result(result)
+
+        tasks = [asyncio.create_task(run_step(index)) for index in range(len(steps))]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            for future in results:
+                future.cancel()
+
+        partial_results = [future.result() for future in results if future.result() is not None]
+        self._merge_state(plan, [future.result() for future in results])
+        plan._next_step_index = len(steps)
+        result_string = str(partial_results[-1]) if partial_results else ""
+        return FunctionResult(function=plan.metadata, value=result_string, metadata={"results": partial_results})
+
+    @staticmethod
+    def _step_arguments(
+        plan: Plan, index: int, arguments: KernelArguments, dependencies: dict[int, FunctionResult | None]
+    ) -> KernelArguments:
+        """Resolve the arguments of a step from the initial arguments and the outputs of its dependencies."""
+        variables = copy(arguments)
+        for dependency, result in dependencies.items():
+            for name in plan._steps[dependency]._outputs:
+                variables[name] = str(result)
+
+        step = plan._steps[index]
+        step_arguments = copy(arguments)
+        for name, value in step._parameters.items():
+            if value is None or (name in arguments and not _references(value)):
+                continue
+            expanded = str(value)
+            for reference in sorted(set(_references(value)), key=len, reverse=True):
+                if reference in variables:
+                    expanded = expanded.replace(f"${reference}", str(variables[reference]))
+            step_arguments[name] = expanded
+
+        if not step._parameters.get("input"):
+            if index > 0:
+                step_arguments["input"] = str(dependencies.get(index - 1) or "")
+            elif not step_arguments.get("input"):
+                step_arguments["input"] = plan.description
+        return step_arguments
+
+    @staticmethod
+    def _merge_state(plan: Plan, results: list[FunctionResult | None]) -> None:
+        """Update the plan state with the step outputs in step order."""
+        for step, result in zip(plan._steps, results):
+            if result is None:
+                continue
+            plan._state["input"] = str(result)
+            for name in step._outputs:
+                plan._state[name] = str(result)
+            if set(plan._outputs).intersection(step._outputs):
+                plan._state[Plan.DEFAULT_RESULT_KEY] = plan._state.get(Plan.DEFAULT_RESULT_KEY, "").strip() + str(
+                    result
+                )
@@ -0,0 +1,230 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import json
+import os
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+
+from semantic_kernel.connectors.ai.embeddings.embedding_generator_base import EmbeddingGeneratorBase
+from semantic_kernel.exceptions.kernel_exceptions import KernelFunctionNotFoundError, KernelPluginNotFoundError
+from semantic_kernel.functions.kernel_arguments import KernelArguments
+from semantic_kernel.kernel import Kernel
+from semantic_kernel.planners import SequentialPlanner
+from semantic_kernel.planners.plan import Plan
+
+
+def normalize_goal(goal: str) -> str:
+    """
+    Normalize a goal so that goals differing only in case, width, whitespace or trailing punctuation match
+
+    Args:
+        goal (str): The goal
+
+    Returns:
+        str: The normalized goal
+    """
+    goal = unicodedata.normalize("NFKC", goal).casefold()
+    goal = re.sub(r"\s+", " ", goal).strip()
+    return goal.rstrip(" .!?。")
+
+
+def serialize_plan(plan: Plan) -> dict[str, Any] | None:
+    """
+    Serialize a sequential plan into plain JSON values
+
+    Args:
+        plan (Plan): The plan created by the SequentialPlanner
+
+    Returns:
+        dict | None: The serialized plan, or None if a step has no function (a missing function was allowed)
+    """
+    steps = []
+    for step in plan._steps:
+        if step._function is None:
+            return None
+        steps.append({
+            "plugin_name": step.metadata.plugin_name,
+            "function_name": step.metadata.name,
+            "parameter_names": sorted(parameter.name for parameter in step.metadata.parameters),
+            "parameters": {name: _to_jsonable(value) for name, value in step._parameters.items()},
+            "outputs": list(step._outputs),
+        })
+    return {"steps": steps, "outputs": list(plan._outputs)}
+
+
+def deserialize_plan(data: dict[str, Any], goal: str, kernel: Kernel) -> Plan | None:
+    """
+    Rebuild a plan for the current kernel
+
+    Args:
+        data (dict): The serialized plan
+        goal (str): The goal of the new plan
+        kernel (Kernel): The kernel whose functions the plan uses
+
+    Returns:
+        Plan | None: A new plan, or None if a step function is gone or its parameters changed
+    """
+    plan = Plan.from_goal(goal)
+    for step_data in data["steps"]:
+        try:
+            function = kernel.get_function(step_data["plugin_name"], step_data["function_name"])
+        except (KernelFunctionNotFoundError, KernelPluginNotFoundError):
+            return None
+        if sorted(parameter.name for parameter in function.metadata.parameters) != step_data["parameter_names"]:
+            return None
+
+        step = Plan.from_function(function)
+        step._parameters = KernelArguments(**step_data["parameters"])
+        step._outputs = list(step_data["outputs"])
+        plan.add_steps([step])
+    plan._outputs = list(data["outputs"])
+    return plan
+
+
+def _to_jsonable(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class PlanCache:
+    """
+    A cache of sequential plans keyed on the normalized goal, with an optional embedding similarity tier
+
+    Plans are stored serialized and rebuilt on every hit, so a cached plan never carries the state of an
+    earlier invocation, and it is only reused while every step function still exists with the same parameters.
+
+    Args:
+        path (str | None): The JSON file the cache is persisted to, or None to keep it in memory only
+        embedding_service (EmbeddingGeneratorBase | None): The service used to embed goals for the similarity tier
+        similarity_threshold (float): The minimum cosine similarity for a goal to reuse the plan of another goal
+        max_entries (int): The maximum number of cached plans, the least recently used ones are dropped first
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        embedding_service: EmbeddingGeneratorBase | None = None,
+        similarity_threshold: float = 0.92,
+        max_entries: int = 1000,
+    ) -> None:
+        self.path = path
+        self.embedding_service = embedding_service
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as cache_file:
+                self._entries.update(json.load(cache_file))
+
+    async def get(self, goal: str, kernel: Kernel) -> Plan | None:
+        """
+        Get the cached plan for a goal, rebuilt for the kernel
+
+        Args:
+            goal (str): The goal
+            kernel (Kernel): The kernel whose functions the plan uses
+
+        Returns:
+            Plan | None: The plan, or None if no valid plan is cached for the goal
+        """
+        key = normalize_goal(goal)
+        if (entry := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+            if (plan := deserialize_plan(entry["plan"], goal, kernel)) is not None:
+                self.exact_hits += 1
+                return plan
+            self._remove(key)
+
+        if self.embedding_service is not None and self._entries:
+            similar_key = await self._find_similar(goal)
+            if similar_key is not None:
+                entry = self._entries[similar_key]
+                if (plan := deserialize_plan(entry["plan"], goal, kernel)) is not None:
+                    self.similar_hits += 1
+                    return plan
+                self._remove(similar_key)
+
+        self.misses += 1
+        return None
+
+    async def put(self, goal: str, plan: Plan) -> None:
+        """
+        Store the plan created for a goal
+
+        Args:
+            goal (str): The goal
+            plan (Plan): The plan created by the SequentialPlanner
+        """
+        serialized = serialize_plan(plan)
+        if serialized is None:
+            return
+
+        entry: dict[str, Any] = {"goal": goal, "plan": serialized}
+        if self.embedding_service is not None:
+            entry["embedding"] = (await self._embed(goal)).tolist()
+        key = normalize_goal(goal)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._save()
+
+    async def _find_similar(self, goal: str) -> str | None:
+        keys = [key for key, entry in self._entries.items() if "embedding" in entry]
+        if not keys:
+            return None
+        matrix = np.array([self._entries[key]["embedding"] for key in keys], dtype=np.float32)
+        similarities = matrix @ await self._embed(goal)
+        best = int(np.argmax(similarities))
+        return keys[best] if similarities[best] >= self.similarity_threshold else None
+
+    async def _embed(self, goal: str) -> np.ndarray:
+        embedding = np.asarray((await self.embedding_service.generate_embeddings([goal]))[0], dtype=np.float32)
+        return embedding / (np.linalg.norm(embedding) or 1.0)
+
+    def _remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._save()
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(self._entries, cache_file, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+
+class CachedSequentialPlanner(SequentialPlanner):
+    """
+    A SequentialPlanner that reuses the plans of earlier goals from a PlanCache instead of asking the model again
+    """
+
+    def __init__(self, kernel: Kernel, service_id: str, plan_cache: PlanCache | None = None, **kwargs: Any) -> None:
+        """
+        Initialize the cached planner
+
+        Args:
+            kernel (Kernel): The kernel instance to use for planning
+            service_id (str): The service id to use to get the AI service
+            plan_cache (PlanCache | None): The plan cache, a new in-memory cache if not provided
+            kwargs: The other SequentialPlanner arguments (config, prompt)
+        """
+        super().__init__(kernel, service_id, **kwargs)
+        self.plan_cache = plan_cache or PlanCache()
+
+    async def create_plan(self, goal: str) -> Plan:
+        """Get the cached plan for the goal, or create and cache a new one"""
+        plan = await self.plan_cache.get(goal, self._kernel)
+        if plan is None:
+            plan = await super().create_plan(goal)
+            await self.plan_cache.put(goal, plan)
+        return plan
@@ -15,6 +15,10 @@ class ServiceSettings(KernelBaseSettings):
     Args:
         global_llm_service (str | None): The LLM service to use for the samples, either "OpenAI" or "AzureOpenAI"
             If not provided, defaults to "AzureOpenAI".
+        chat_deployments (str | None): Comma separated chat deployment names (Azure OpenAI) or model ids (OpenAI)
+            to load balance over, each optionally followed by ":weight", e.g. "gpt-4o-east:2,gpt-4o-west".
+            If not provided, the single configured chat deployment is used.
     """
 
     global_llm_service: str | None = None
+    chat_deployments: str | None = None
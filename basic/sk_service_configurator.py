@@ -2,6 +2,7 @@
 
 from pydantic import ValidationError
 
+from load_balanced_chat_completion import LoadBalancedChatCompletion
 from service_settings import ServiceSettings
 from semantic_kernel import Kernel
 from semantic_kernel.connectors.ai.open_ai import (
@@ -46,7 +47,10 @@ def add_service(
     service_id = "default"
 
     # Configure AI service used by the kernel. Load settings from the .env file.
-    if settings.global_llm_service == "OpenAI":
+    if use_chat and settings.chat_deployments:
+        # Spread the chat calls over several deployments, behind the same service_id
+        kernel.add_service(_load_balanced_chat_service(service_id, settings))
+    elif settings.global_llm_service == "OpenAI":
         if use_chat:
             # <OpenAIKernelCreation>
             kernel.add_service(OpenAIChatCompletion(service_id=service_id))
@@ -66,3 +70,28 @@ def add_service(
             # </TextCompletionKernelCreation>
 
     return kernel
+
+
+def _load_balanced_chat_service(service_id: str, settings: ServiceSettings) -> LoadBalancedChatCompletion:
+    """
+    Create a chat completion service load balanced over the deployments of the CHAT_DEPLOYMENTS setting
+
+    Args:
+        service_id (str): The service_id of the load balanced service
+        settings (ServiceSettings): The settings
+
+    Returns:
+        LoadBalancedChatCompletion: The service
+    """
+    services = []
+    weights = []
+    for entry in settings.chat_deployments.split(","):
+        name, _, weight = entry.strip().partition(":")
+        if not name:
+            continue
+        if settings.global_llm_service == "OpenAI":
+            services.append(OpenAIChatCompletion(service_id=f"{service_id}-{name}", ai_model_id=name))
+        else:
+            services.append(AzureChatCompletion(service_id=f"{service_id}-{name}", deployment_name=name))
+        weights.append(float(weight) if weight else 1.0)
+    return LoadBalancedChatCompletion(services=services, weights=weights, service_id=service_id)
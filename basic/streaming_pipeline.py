@@ -0,0 +1,172 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import re
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from semantic_kernel.functions.kernel_arguments import KernelArguments
+from semantic_kernel.functions.kernel_function import KernelFunction
+from semantic_kernel.kernel import Kernel
+
+Boundary = Literal["sentence", "paragraph"]
+
+BOUNDARY_PATTERNS: dict[str, re.Pattern[str]] = {
+    # The end of a sentence followed by whitespace, or a line break
+    "sentence": re.compile(r"(?<=[.!?。！？])\s+|\n+"),
+    "paragraph": re.compile(r"\n\s*\n\s*"),
+}
+BOUNDARY_JOINERS = {"sentence": " ", "paragraph": "\n\n"}
+
+_END = object()
+
+
+class Segmenter:
+    """
+    Splits streamed text into complete segments at sentence or paragraph boundaries
+
+    Args:
+        boundary (Boundary): Where to split, "sentence" or "paragraph"
+    """
+
+    def __init__(self, boundary: Boundary = "sentence") -> None:
+        self.pattern = BOUNDARY_PATTERNS[boundary]
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """
+        Add streamed text
+
+        Args:
+            text (str): The next chunk of text
+
+        Returns:
+            list[str]: The segments completed by the chunk
+        """
+        self._buffer += text
+        segments = []
+        start = 0
+        for match in self.pattern.finditer(self._buffer):
+            if match.end() == len(self._buffer):
+                # The boundary may continue in the next chunk, e.g. "\n" followed by "\n"
+                break
+            if segment := self._buffer[start : match.start()].strip():
+                segments.append(segment)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return segments
+
+    def flush(self) -> list[str]:
+        """
+        End the stream
+
+        Returns:
+            list[str]: The remaining text as the last segment, if any
+        """
+        segment, self._buffer = self._buffer.strip(), ""
+        return [segment] if segment else []
+
+
+@dataclass
+class PipelineStage:
+    """
+    One prompt function of a streaming pipeline
+
+    Args:
+        function (KernelFunction): The function, it receives each segment of the previous stage as `input`
+        arguments (dict[str, Any]): The other arguments of the function, e.g. the target language
+        boundary (Boundary): Where the output of this stage is split into segments for the next stage
+    """
+
+    function: KernelFunction
+    arguments: dict[str, Any] = field(default_factory=dict)
+    boundary: Boundary = "sentence"
+
+
+class StreamingPipeline:
+    """
+    Chains prompt functions so that each stage streams into the next one segment by segment
+
+    A stage splits its streamed output at sentence or paragraph boundaries and passes every complete
+    segment on, so the next stage starts as soon as the first segment is complete instead of waiting for
+    the whole output. Stages run concurrently, each one handles its segments in order, and the queues
+    between stages are bounded, so a fast stage waits for a slow one instead of buffering without limit.
+
+    Args:
+        kernel (Kernel): The kernel used to invoke the functions
+        stages (list[PipelineStage]): The stages in order
+        max_buffered_segments (int): The maximum number of segments waiting between two stages
+    """
+
+    def __init__(self, kernel: Kernel, stages: list[PipelineStage], max_buffered_segments: int = 4) -> None:
+        if not stages:
+            raise ValueError("A streaming pipeline needs at least one stage")
+        self.kernel = kernel
+        self.stages = stages
+        self.max_buffered_segments = max_buffered_segments
+
+    async def stream(self, input: str, arguments: KernelArguments | None = None) -> AsyncIterator[str]:
+        """
+        Run the pipeline on an input
+
+        Args:
+            input (str): The input of the first stage
+            arguments (KernelArguments | None): Arguments passed to every stage
+
+        Yields:
+            str: The streamed text of the last stage
+        """
+        queues: list[asyncio.Queue] = [asyncio.Queue()]
+        queues += [asyncio.Queue(maxsize=self.max_buffered_segments) for _ in self.stages[1:]]
+        output: asyncio.Queue = asyncio.Queue(maxsize=self.max_buffered_segments)
+        queues[0].put_nowait(input)
+        queues[0].put_nowait(_END)
+
+        stage_outputs = [*queues[1:], output]
+        tasks = [
+            asyncio.create_task(self._run_stage(index, queues[index], stage_outputs[index], arguments))
+            for index in range(len(self.stages))
+        ]
+        try:
+            while (item := await output.get()) is not _END:
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_stage(
+        self, index: int, inputs: asyncio.Queue, outputs: asyncio.Queue, arguments: KernelArguments | None
+    ) -> None:
+        stage = self.stages[index]
+        is_last = index == len(self.stages) - 1
+        joiner = BOUNDARY_JOINERS[self.stages[index - 1].boundary] if index > 0 else ""
+        segmenter = Segmenter(stage.boundary)
+        try:
+            first = True
+            while (segment := await inputs.get()) is not _END:
+                if isinstance(segment, BaseException):
+                    await outputs.put(segment)
+                    return
+                stage_arguments = KernelArguments(**{**(arguments or {}), **stage.arguments, "input": segment})
+                if is_last and not first and joiner:
+                    await outputs.put(joiner)
+                first = False
+                async for chunks in self.kernel.invoke_stream(stage.function, arguments=stage_arguments):
+                    text = "".join(str(chunk) for chunk in chunks)
+                    if is_last:
+                        if text:
+                            await outputs.put(text)
+                        continue
+                    for completed in segmenter.feed(text):
+                        await outputs.put(completed)
+                # One input segment gives one complete output, do not join it with the next one
+                for completed in segmenter.flush():
+                    await outputs.put(completed)
+        except Exception as exc:
+            await outputs.put(exc)
+            return
+        await outputs.put(_END)
@@ -0,0 +1,46 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import os
+
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.contents import AuthorRole, ChatMessageContent
+from semantic_kernel.functions.kernel_arguments import KernelArguments
+from semantic_kernel.kernel import Kernel
+
+from fast_paths import FastPathRegistry, register_sample_fast_paths
+
+PROMPT_TEMPLATE_SAMPLES = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "prompt_template_samples")
+
+
+class ScriptedChatCompletion(ChatCompletionClientBase):
+    """
+    A chat completion service that always answers "banana"
+    """
+
+    async def _inner_get_chat_message_contents(self, chat_history, settings) -> list[ChatMessageContent]:
+        return [ChatMessageContent(role=AuthorRole.ASSISTANT, content="banana", ai_model_id=self.ai_model_id)]
+
+
+def _invoke_element_at_index(index: str):
+    kernel = Kernel()
+    kernel.add_service(ScriptedChatCompletion(service_id="default", ai_model_id="scripted"))
+    register_sample_fast_paths(FastPathRegistry()).register(kernel)
+    plugin = kernel.add_plugin(parent_directory=PROMPT_TEMPLATE_SAMPLES, plugin_name="MiscPlugin")
+    arguments = KernelArguments(input="apple, banana, cherry", index=index, count="3")
+    return asyncio.run(kernel.invoke(plugin["ElementAtIndex"], arguments))
+
+
+def test_fast_path_hit_has_the_shape_of_a_model_answer():
+    hit = _invoke_element_at_index("1")
+    fallback = _invoke_element_at_index("second")
+
+    assert hit.metadata.get("fast_path") is True
+    assert "fast_path" not in fallback.metadata
+    assert type(hit.value) is type(fallback.value) is list
+    assert len(hit.value) == len(fallback.value) == 1
+    assert type(hit.value[0]) is type(fallback.value[0]) is ChatMessageContent
+    assert hit.value[0].role == fallback.value[0].role == AuthorRole.ASSISTANT
+    # The result_parser idiom of the agent strategies
+    assert hit.value[0].content == fallback.value[0].content == "banana"
+    assert str(hit) == str(fallback) == "banana"
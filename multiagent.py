@@ -2,15 +2,20 @@ import chainlit as cl
 from chainlit import Message, on_message
 
 from semantic_kernel import Kernel
-from semantic_kernel.agents import AgentGroupChat, ChatCompletionAgent
+from semantic_kernel.agents import ChatCompletionAgent
 from semantic_kernel.agents.strategies import TerminationStrategy
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from semantic_kernel.contents import AuthorRole, ChatMessageContent
 
+from agent.chat_completion.speculative_group_chat import SpeculativeAgentGroupChat
+from agent.chat_completion.kernel_profiler import profile_kernel
+from agent.chat_completion.token_budget_reducer import TokenBudgetHistoryReducer
+from agent.chat_completion.compact_chat_history import CompactChatHistory
+
 def _create_kernel_with_chat_completion(service_id: str) -> Kernel:
     kernel = Kernel()
     kernel.add_service(AzureChatCompletion(service_id=service_id))
-    return kernel
+    return profile_kernel(kernel)
 
 
 class ApprovalTerminationStrategy(TerminationStrategy):
@@ -52,7 +57,7 @@ agent_writer = ChatCompletionAgent(
     instructions=COPYWRITER_INSTRUCTIONS,
 )
 
-group_chat = AgentGroupChat(
+group_chat = SpeculativeAgentGroupChat(
     agents=[
         agent_writer,
         agent_reviewer,
@@ -62,6 +67,9 @@ group_chat = AgentGroupChat(
         maximum_iterations=10,
         automatic_reset=True,
     ),
+    history_reducer=TokenBudgetHistoryReducer(max_tokens=2000, service=AzureChatCompletion(service_id="summarizer")),
+    # The group chat transcript lives as long as the app, keep it compact in memory
+    chat_history=CompactChatHistory(),
 )
 
 @cl.on_message